@@ -21,11 +21,19 @@ from sqlmodel import SQLModel
 from app.models.user import User
 from app.models.project import Project
 from app.models.story_content import StoryContent
+from app.models.content_chunk import ContentChunk
+from app.models.segment import Segment
+from app.models.user_stats import UserStats
+from app.models.writing_progress import WritingProgress
 
 
 # Tell Alembic to use SQLModel's metadata for autogeneration
 target_metadata = SQLModel.metadata
 
+# The FTS5 search index and its shadow tables are managed outside the models
+def include_object(object, name, type_, reflected, compare_to):
+    return not (type_ == "table" and name.startswith("project_search"))
+
 # --- MIGRATION FUNCTIONS ---
 
 def run_migrations_offline():
@@ -34,6 +42,7 @@ def run_migrations_offline():
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -50,6 +59,7 @@ def run_migrations_online():
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
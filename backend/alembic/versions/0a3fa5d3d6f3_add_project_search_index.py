@@ -0,0 +1,37 @@
+"""Add project search index
+Revision ID: 0a3fa5d3d6f3
+Revises: dec59ee45760
+Create Date: 2026-10-18 11:26:51.902314
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a3fa5d3d6f3'
+down_revision: Union[str, Sequence[str], None] = 'dec59ee45760'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CREATE_SEARCH_INDEX = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS project_search USING fts5("
+    "title, description, content, tokenize = 'unicode61 remove_diacritics 2')"
+)
+# Text is stored uncompressed at this revision, so SQL can copy it directly;
+# only the newest active version of a project is indexed
+REBUILD_SEARCH_INDEX = (
+    "INSERT INTO project_search (rowid, title, description, content) "
+    "SELECT project.id, project.title, coalesce(project.description, ''), coalesce(storycontent.content, '') "
+    "FROM project LEFT JOIN storycontent ON storycontent.id = ("
+    "SELECT max(active.id) FROM storycontent AS active "
+    "WHERE active.project_id = project.id AND active.is_active = 1)"
+)
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(CREATE_SEARCH_INDEX)
+    op.execute(REBUILD_SEARCH_INDEX)
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS project_search")
@@ -0,0 +1,53 @@
+"""Add hot path indexes
+Revision ID: 2eeea29502a9
+Revises: 0a3fa5d3d6f3
+Create Date: 2026-10-18 12:41:09.530118
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2eeea29502a9'
+down_revision: Union[str, Sequence[str], None] = '0a3fa5d3d6f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Text is stored uncompressed at this revision, so SQL can re-index it directly
+REBUILD_SEARCH_INDEX = (
+    "INSERT INTO project_search (rowid, title, description, content) "
+    "SELECT project.id, project.title, coalesce(project.description, ''), coalesce(storycontent.content, '') "
+    "FROM project LEFT JOIN storycontent "
+    "ON storycontent.project_id = project.id AND storycontent.is_active = 1"
+)
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # The unique index allows one active version per project; keep the newest
+    duplicates = bind.execute(sa.text(
+        "UPDATE storycontent SET is_active = 0 "
+        "WHERE is_active = 1 AND id < ("
+        "SELECT max(newest.id) FROM storycontent AS newest "
+        "WHERE newest.project_id = storycontent.project_id AND newest.is_active = 1)"
+    )).rowcount
+    if duplicates:
+        op.execute("DELETE FROM project_search")
+        op.execute(REBUILD_SEARCH_INDEX)
+
+    op.create_index('ix_storycontent_project_id_version', 'storycontent', ['project_id', 'version'], unique=False)
+    op.create_index(
+        'ux_storycontent_project_id_active', 'storycontent', ['project_id'],
+        unique=True, sqlite_where=sa.text('is_active = 1'),
+    )
+    op.create_index(
+        'ix_project_user_id_sort_key', 'project',
+        ['user_id', sa.text('coalesce(last_edited_at, created_at)'), 'id'], unique=False,
+    )
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_project_user_id_sort_key', table_name='project')
+    op.drop_index('ux_storycontent_project_id_active', table_name='storycontent')
+    op.drop_index('ix_storycontent_project_id_version', table_name='storycontent')
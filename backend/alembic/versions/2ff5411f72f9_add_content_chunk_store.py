@@ -0,0 +1,120 @@
+"""Add content chunk store
+Revision ID: 2ff5411f72f9
+Revises: 24599f0f77ac
+Create Date: 2026-10-18 09:12:40.518213
+"""
+import hashlib
+import zlib
+from typing import List, Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects.sqlite import insert
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2ff5411f72f9'
+down_revision: Union[str, Sequence[str], None] = '24599f0f77ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 100
+
+# The chunk format as of this revision, frozen so later changes to
+# app.core.content_store do not change what this migration writes
+CHUNK_MIN_SIZE = 2 * 1024
+CHUNK_MAX_SIZE = 16 * 1024
+CHUNK_BOUNDARY_MASK = 0x7
+REF_SEPARATOR = ','
+
+def chunk_hash(data: str) -> str:
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+def split_chunks(text: str) -> List[str]:
+    """Split text after lines whose CRC matches the boundary mask, within the size bounds."""
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in text.splitlines(keepends=True):
+        for start in range(0, len(line), CHUNK_MAX_SIZE):
+            piece = line[start:start + CHUNK_MAX_SIZE]
+            if current and size + len(piece) > CHUNK_MAX_SIZE:
+                chunks.append(''.join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece)
+            if size >= CHUNK_MIN_SIZE and not zlib.crc32(piece.encode('utf-8')) & CHUNK_BOUNDARY_MASK:
+                chunks.append(''.join(current))
+                current, size = [], 0
+    if current:
+        chunks.append(''.join(current))
+    return chunks
+
+contentchunk = sa.table(
+    'contentchunk',
+    sa.column('hash', sa.String),
+    sa.column('data', sa.String),
+    sa.column('size', sa.Integer),
+)
+storycontent = sa.table(
+    'storycontent',
+    sa.column('id', sa.Integer),
+    sa.column('content', sa.String),
+    sa.column('chunk_refs', sa.String),
+    sa.column('is_active', sa.Boolean),
+)
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('contentchunk',
+    sa.Column('hash', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('data', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    op.add_column('storycontent', sa.Column('chunk_refs', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+    # Archive every inactive version into the chunk store, a batch at a time
+    bind = op.get_bind()
+    pending = (
+        sa.select(storycontent.c.id, storycontent.c.content)
+        .where(storycontent.c.is_active == sa.false())
+        .where(storycontent.c.content.is_not(None))
+        .where(storycontent.c.chunk_refs.is_(None))
+        .limit(BATCH_SIZE)
+    )
+    while rows := bind.execute(pending).all():
+        for row_id, content in rows:
+            chunks = split_chunks(content)
+            hashes = [chunk_hash(chunk) for chunk in chunks]
+            if chunks:
+                bind.execute(
+                    insert(contentchunk).on_conflict_do_nothing(index_elements=['hash']),
+                    [{'hash': h, 'data': chunk, 'size': len(chunk)} for h, chunk in zip(hashes, chunks)],
+                )
+            bind.execute(
+                storycontent.update()
+                .where(storycontent.c.id == row_id)
+                .values(content=None, chunk_refs=REF_SEPARATOR.join(hashes))
+            )
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    archived = bind.execute(
+        sa.select(storycontent.c.id, storycontent.c.chunk_refs)
+        .where(storycontent.c.chunk_refs.is_not(None))
+    ).all()
+    for row_id, chunk_refs in archived:
+        hashes = chunk_refs.split(REF_SEPARATOR) if chunk_refs else []
+        chunks = dict(bind.execute(
+            sa.select(contentchunk.c.hash, contentchunk.c.data).where(contentchunk.c.hash.in_(set(hashes)))
+        ).all())
+        bind.execute(
+            storycontent.update()
+            .where(storycontent.c.id == row_id)
+            .values(content="".join(chunks[h] for h in hashes))
+        )
+    with op.batch_alter_table('storycontent') as batch_op:
+        batch_op.drop_column('chunk_refs')
+    op.drop_table('contentchunk')
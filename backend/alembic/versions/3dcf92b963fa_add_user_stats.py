@@ -0,0 +1,92 @@
+"""Add user stats
+Revision ID: 3dcf92b963fa
+Revises: 95588314dd04
+Create Date: 2026-10-18 16:05:42.318207
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3dcf92b963fa'
+down_revision: Union[str, Sequence[str], None] = '95588314dd04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+# The tables as they are at this revision, so the backfill never follows the models
+user = sa.table('user', sa.column('id', sa.Integer))
+project = sa.table(
+    'project',
+    sa.column('user_id', sa.Integer),
+    sa.column('status', sa.String),
+    sa.column('word_count', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+    sa.column('last_edited_at', sa.DateTime),
+)
+userstats = sa.table(
+    'userstats',
+    sa.column('user_id', sa.Integer),
+    sa.column('project_count', sa.Integer),
+    sa.column('status_counts', sa.JSON),
+    sa.column('total_words', sa.Integer),
+    sa.column('words_today', sa.Integer),
+    sa.column('words_today_date', sa.Date),
+    sa.column('last_activity_at', sa.DateTime),
+)
+
+def backfill_user_stats(bind) -> None:
+    """One row per user, counting their projects by status and their words."""
+    activity = sa.func.max(
+        sa.func.max(
+            project.c.created_at,
+            sa.func.coalesce(project.c.updated_at, project.c.created_at),
+            sa.func.coalesce(project.c.last_edited_at, project.c.created_at),
+        ),
+        type_=sa.DateTime,
+    )
+    rows = {
+        user_id: {
+            'user_id': user_id, 'project_count': 0, 'status_counts': {}, 'total_words': 0,
+            'words_today': 0, 'words_today_date': None, 'last_activity_at': None,
+        }
+        for user_id in bind.execute(sa.select(user.c.id).order_by(user.c.id)).scalars()
+    }
+    aggregates = sa.select(
+        project.c.user_id, project.c.status, sa.func.count(), sa.func.coalesce(sa.func.sum(project.c.word_count), 0),
+        activity,
+    ).group_by(project.c.user_id, project.c.status)
+    for user_id, status, count, words, last_activity in bind.execute(aggregates):
+        if (row := rows.get(user_id)) is None:
+            continue
+        row['project_count'] += count
+        row['status_counts'][status] = count
+        row['total_words'] += words
+        if last_activity is not None and (row['last_activity_at'] is None or last_activity > row['last_activity_at']):
+            row['last_activity_at'] = last_activity
+    batch = list(rows.values())
+    for start in range(0, len(batch), BATCH_SIZE):
+        bind.execute(userstats.insert(), batch[start:start + BATCH_SIZE])
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'userstats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('project_count', sa.Integer(), nullable=False),
+        sa.Column('status_counts', sa.JSON(), nullable=False),
+        sa.Column('total_words', sa.Integer(), nullable=False),
+        sa.Column('words_today', sa.Integer(), nullable=False),
+        sa.Column('words_today_date', sa.Date(), nullable=True),
+        sa.Column('last_activity_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    backfill_user_stats(op.get_bind())
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('userstats')
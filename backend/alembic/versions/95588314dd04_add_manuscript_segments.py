@@ -0,0 +1,64 @@
+"""Add manuscript segments
+Revision ID: 95588314dd04
+Revises: e3c6b885bc73
+Create Date: 2026-10-18 14:31:07.592935
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '95588314dd04'
+down_revision: Union[str, Sequence[str], None] = 'e3c6b885bc73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'segment',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('parent_id', sa.Integer(), nullable=True),
+        sa.Column('kind', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+        sa.Column('title', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('content', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True),
+        sa.Column('char_count', sa.Integer(), nullable=False),
+        sa.Column('word_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['parent_id'], ['segment.id'], ),
+        sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_segment_project_id_parent_id_position', 'segment',
+        ['project_id', 'parent_id', 'position'], unique=False,
+    )
+    op.add_column(
+        'project',
+        sa.Column('content_stale', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.create_index(
+        'ix_project_content_stale', 'project', ['id'],
+        unique=False, sqlite_where=sa.text('content_stale = 1'),
+    )
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_project_content_stale', table_name='project')
+    # The batch rebuilds the table from its reflection, which leaves out
+    # expression indexes, so this one is put back by hand
+    op.drop_index('ix_project_user_id_sort_key', table_name='project')
+    with op.batch_alter_table('project') as batch_op:
+        batch_op.drop_column('content_stale')
+    op.create_index(
+        'ix_project_user_id_sort_key', 'project',
+        ['user_id', sa.text('coalesce(last_edited_at, created_at)'), 'id'], unique=False,
+    )
+    op.drop_index('ix_segment_project_id_parent_id_position', table_name='segment')
+    op.drop_table('segment')
@@ -0,0 +1,65 @@
+"""Add story content counts
+Revision ID: a918092252eb
+Revises: 2eeea29502a9
+Create Date: 2026-10-18 13:20:44.061392
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a918092252eb'
+down_revision: Union[str, Sequence[str], None] = '2eeea29502a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 100
+# How chunk_refs joined chunk hashes as of this revision
+REF_SEPARATOR = ','
+
+contentchunk = sa.table(
+    'contentchunk',
+    sa.column('hash', sa.String),
+    sa.column('data', sa.String),
+)
+storycontent = sa.table(
+    'storycontent',
+    sa.column('id', sa.Integer),
+    sa.column('content', sa.String),
+    sa.column('chunk_refs', sa.String),
+    sa.column('char_count', sa.Integer),
+    sa.column('word_count', sa.Integer),
+)
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('storycontent', sa.Column('char_count', sa.Integer(), nullable=True))
+    op.add_column('storycontent', sa.Column('word_count', sa.Integer(), nullable=True))
+
+    bind = op.get_bind()
+    pending = (
+        sa.select(storycontent.c.id, storycontent.c.content, storycontent.c.chunk_refs)
+        .where(storycontent.c.char_count.is_(None))
+        .where(storycontent.c.content.is_not(None) | storycontent.c.chunk_refs.is_not(None))
+        .limit(BATCH_SIZE)
+    )
+    while rows := bind.execute(pending).all():
+        for row_id, content, chunk_refs in rows:
+            if chunk_refs is not None:
+                hashes = chunk_refs.split(REF_SEPARATOR) if chunk_refs else []
+                chunks = dict(bind.execute(
+                    sa.select(contentchunk.c.hash, contentchunk.c.data).where(contentchunk.c.hash.in_(set(hashes)))
+                ).all())
+                content = "".join(chunks[h] for h in hashes)
+            bind.execute(
+                storycontent.update()
+                .where(storycontent.c.id == row_id)
+                .values(char_count=len(content), word_count=len(content.split()))
+            )
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('storycontent') as batch_op:
+        batch_op.drop_column('word_count')
+        batch_op.drop_column('char_count')
@@ -0,0 +1,113 @@
+"""Add writing progress
+Revision ID: aba1ea92212f
+Revises: 3dcf92b963fa
+Create Date: 2026-10-18 17:12:09.604811
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects.sqlite import insert
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'aba1ea92212f'
+down_revision: Union[str, Sequence[str], None] = '3dcf92b963fa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+# The tables as they are at this revision, so the backfill never follows the models
+storycontent = sa.table(
+    'storycontent',
+    sa.column('project_id', sa.Integer),
+    sa.column('version', sa.Integer),
+    sa.column('word_count', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+    sa.column('updated_at', sa.DateTime),
+)
+writingprogress = sa.table(
+    'writingprogress',
+    sa.column('project_id', sa.Integer),
+    sa.column('resolution', sa.String),
+    sa.column('bucket', sa.DateTime),
+    sa.column('words_added', sa.Integer),
+    sa.column('words_removed', sa.Integer),
+    sa.column('word_count', sa.Integer),
+    sa.column('changes', sa.Integer),
+)
+
+def record_changes(bind, changes) -> None:
+    """Add (project_id, change, word count after, when) changes to their hour and day buckets."""
+    rows = {}
+    for project_id, change, word_count, when in changes:
+        hour = when.replace(minute=0, second=0, microsecond=0)
+        for resolution, bucket in (('hour', hour), ('day', hour.replace(hour=0))):
+            row = rows.setdefault((project_id, resolution, bucket), {
+                'project_id': project_id, 'resolution': resolution, 'bucket': bucket,
+                'words_added': 0, 'words_removed': 0, 'word_count': word_count, 'changes': 0,
+            })
+            row['words_added'] += max(change, 0)
+            row['words_removed'] += max(-change, 0)
+            row['word_count'] = word_count
+            row['changes'] += 1
+    if not rows:
+        return
+    statement = insert(writingprogress)
+    bind.execute(
+        statement.on_conflict_do_update(
+            index_elements=['project_id', 'resolution', 'bucket'],
+            set_={
+                'words_added': writingprogress.c.words_added + statement.excluded.words_added,
+                'words_removed': writingprogress.c.words_removed + statement.excluded.words_removed,
+                'word_count': statement.excluded.word_count,
+                'changes': writingprogress.c.changes + statement.excluded.changes,
+            },
+        ),
+        list(rows.values()),
+    )
+
+def backfill_progress(bind) -> None:
+    """Seed the series from stored versions, one change per version."""
+    versions = bind.execute(
+        sa.select(
+            storycontent.c.project_id,
+            sa.func.coalesce(storycontent.c.word_count, 0),
+            sa.func.coalesce(storycontent.c.updated_at, storycontent.c.created_at, type_=sa.DateTime),
+        ).order_by(storycontent.c.project_id, storycontent.c.version)
+    )
+    changes = []
+    project_id = previous = None
+    for row_project_id, word_count, when in versions:
+        if row_project_id != project_id:
+            project_id, previous = row_project_id, 0
+        if word_count != previous:
+            changes.append((project_id, word_count - previous, word_count, when))
+            previous = word_count
+        if len(changes) >= BATCH_SIZE:
+            record_changes(bind, changes)
+            changes = []
+    record_changes(bind, changes)
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'writingprogress',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('resolution', sqlmodel.sql.sqltypes.AutoString(length=8), nullable=False),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('words_added', sa.Integer(), nullable=False),
+        sa.Column('words_removed', sa.Integer(), nullable=False),
+        sa.Column('word_count', sa.Integer(), nullable=False),
+        sa.Column('changes', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+        sa.PrimaryKeyConstraint('project_id', 'resolution', 'bucket'),
+        sqlite_with_rowid=False,
+    )
+    # Versions are the only history there is; later saves are recorded as they happen
+    backfill_progress(op.get_bind())
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('writingprogress')
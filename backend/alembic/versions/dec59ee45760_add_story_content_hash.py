@@ -0,0 +1,68 @@
+"""Add story content hash
+Revision ID: dec59ee45760
+Revises: 2ff5411f72f9
+Create Date: 2026-10-18 10:03:27.184655
+"""
+import hashlib
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dec59ee45760'
+down_revision: Union[str, Sequence[str], None] = '2ff5411f72f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 100
+# How chunk_refs joined chunk hashes as of this revision
+REF_SEPARATOR = ','
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the UTF-8 text, as the application computed it at this revision."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+contentchunk = sa.table(
+    'contentchunk',
+    sa.column('hash', sa.String),
+    sa.column('data', sa.String),
+)
+storycontent = sa.table(
+    'storycontent',
+    sa.column('id', sa.Integer),
+    sa.column('content', sa.String),
+    sa.column('chunk_refs', sa.String),
+    sa.column('content_hash', sa.String),
+)
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('storycontent', sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=True))
+
+    bind = op.get_bind()
+    pending = (
+        sa.select(storycontent.c.id, storycontent.c.content, storycontent.c.chunk_refs)
+        .where(storycontent.c.content_hash.is_(None))
+        .where(storycontent.c.content.is_not(None) | storycontent.c.chunk_refs.is_not(None))
+        .limit(BATCH_SIZE)
+    )
+    while rows := bind.execute(pending).all():
+        for row_id, content, chunk_refs in rows:
+            if chunk_refs is not None:
+                hashes = chunk_refs.split(REF_SEPARATOR) if chunk_refs else []
+                chunks = dict(bind.execute(
+                    sa.select(contentchunk.c.hash, contentchunk.c.data).where(contentchunk.c.hash.in_(set(hashes)))
+                ).all())
+                content = "".join(chunks[h] for h in hashes)
+            bind.execute(
+                storycontent.update()
+                .where(storycontent.c.id == row_id)
+                .values(content_hash=content_hash(content))
+            )
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('storycontent') as batch_op:
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,85 @@
+"""Compress stored text
+Revision ID: e3c6b885bc73
+Revises: a918092252eb
+Create Date: 2026-10-18 13:58:12.417630
+"""
+from typing import Sequence, Union
+from alembic import op
+import lzma
+import zlib
+
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3c6b885bc73'
+down_revision: Union[str, Sequence[str], None] = 'a918092252eb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 200
+
+# The storage format as of this revision, frozen so later codec or threshold
+# changes in app.core.compression do not change what this migration writes
+COMPRESSION_THRESHOLD = 1024
+ZLIB_MARKER = b'Z'
+DECOMPRESSORS = {ZLIB_MARKER: zlib.decompress, b'X': lzma.decompress}
+
+def compress_text(text: str) -> Union[str, bytes]:
+    data = text.encode('utf-8')
+    if len(data) < COMPRESSION_THRESHOLD:
+        return text
+    packed = ZLIB_MARKER + zlib.compress(data, 6)
+    return packed if len(packed) < len(data) else text
+
+def decompress_text(value: bytes) -> str:
+    return DECOMPRESSORS[value[:1]](value[1:]).decode('utf-8')
+
+# Untyped text columns: these queries must see exactly what is stored
+contentchunk = sa.table(
+    'contentchunk',
+    sa.column('hash', sa.String),
+    sa.column('data'),
+)
+storycontent = sa.table(
+    'storycontent',
+    sa.column('id', sa.Integer),
+    sa.column('content'),
+    sa.column('is_active', sa.Boolean),
+)
+
+def _recode(bind, key, column, stored_as, recode, *criteria) -> None:
+    """Rewrite every matching value, walking the table in key order in batches."""
+    table = column.table
+    after = None
+    while True:
+        statement = sa.select(key, column).where(sa.func.typeof(column) == stored_as, *criteria)
+        if after is not None:
+            statement = statement.where(key > after)
+        rows = bind.execute(statement.order_by(key).limit(BATCH_SIZE)).all()
+        if not rows:
+            return
+        for row_key, value in rows:
+            bind.execute(table.update().where(key == row_key).values({column.name: recode(value)}))
+        after = rows[-1][0]
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # Values under the threshold would be written back unchanged
+    big_enough = COMPRESSION_THRESHOLD
+    _recode(
+        bind, contentchunk.c.hash, contentchunk.c.data, 'text', compress_text,
+        sa.func.length(sa.cast(contentchunk.c.data, sa.LargeBinary)) >= big_enough,
+    )
+    _recode(
+        bind, storycontent.c.id, storycontent.c.content, 'text', compress_text,
+        storycontent.c.is_active == False,
+        sa.func.length(sa.cast(storycontent.c.content, sa.LargeBinary)) >= big_enough,
+    )
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    _recode(bind, contentchunk.c.hash, contentchunk.c.data, 'blob', decompress_text)
+    _recode(bind, storycontent.c.id, storycontent.c.content, 'blob', decompress_text)
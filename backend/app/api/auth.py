@@ -1,35 +1,65 @@
 # backend/app/api/auth.py
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from app.core.database import get_session
-from app.core.security import hash_password, verify_password, create_access_token
+from typing import Optional
+from sqlmodel import Session
+from app.core.database import get_read_session, get_session, run_in_session
+from app.core.queries import select_user
+from app.core.routing import SessionRoute
+from app.core.security import hash_password_async, verify_and_update_password_async, create_access_token
+from app.core.user_cache import invalidate_user
 from app.core.deps import get_current_user
 from app.models.user import User, UserCreate, UserLogin
 
-router = APIRouter()
+router = APIRouter(route_class=SessionRoute)
+
+def find_user(db: Session, *criteria) -> Optional[User]:
+    return db.exec(select_user(*criteria)).first()
+
+def save_user(db: Session, user: User) -> User:
+    # Users usually come from the read session or the auth cache
+    user = db.merge(user)
+    db.commit()
+    return user
 
 @router.post("/register")
-def register(user_data: UserCreate, db: Session = Depends(get_session)):
-    if db.exec(select(User).where(User.username == user_data.username)).first():
+async def register(
+    user_data: UserCreate,
+    read_db: Session = Depends(get_read_session),
+    db: Session = Depends(get_session),
+):
+    if await run_in_session(read_db, find_user, User.username == user_data.username):
         raise HTTPException(status_code=400, detail="Username already exists")
-    if db.exec(select(User).where(User.email == user_data.email)).first():
+    if await run_in_session(read_db, find_user, User.email == user_data.email):
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     user = User(
         username=user_data.username,
         email=user_data.email,
         password_hash=hashed_password
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    user = await run_in_session(db, save_user, user)
     return {"id": user.id, "username": user.username, "email": user.email, "created_at": user.created_at}
 
 @router.post("/login")
-def login(user_data: UserLogin, db: Session = Depends(get_session)):
-    user = db.exec(select(User).where(User.username == user_data.username)).first()
-    if not user or not verify_password(user_data.password, user.password_hash):
+async def login(
+    user_data: UserLogin,
+    read_db: Session = Depends(get_read_session),
+    db: Session = Depends(get_session),
+):
+    user = await run_in_session(read_db, find_user, User.username == user_data.username)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_and_update_password_async(user_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    # Checked after the password so the response doesn't reveal deactivated accounts to guessers
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="Account is deactivated")
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made
+        user.password_hash = new_hash
+        user = await run_in_session(db, save_user, user)
+        invalidate_user(user.id)
     access_token = create_access_token(subject=str(user.id))
     return {
         "access_token": access_token,
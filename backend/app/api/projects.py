@@ -1,34 +1,66 @@
 # backend/app/api/projects.py
-from datetime import timezone
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select
+import base64
+import binascii
+import json
+from datetime import date, time, timedelta, timezone
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import delete
+from sqlalchemy.orm import defer
+from sqlmodel import Session
 from datetime import datetime
 
-from ..core.database import get_session
+from ..core.autosave import autosave_buffer
+from ..core.content_store import chunk_refs_of, read_text, set_content, sweep_chunks
+from ..core.concurrency import run_blocking
+from ..core.database import get_read_session, get_session, read_engine, run_in_session
 from ..core.deps import get_current_user
+from ..core.etags import if_none_match, not_modified, representation_etag, set_etag
+from ..core.progress import (
+    DAY,
+    DEFAULT_RANGE_DAYS,
+    HOUR,
+    INTERVALS,
+    MAX_RANGE_DAYS,
+    progress_range,
+    rollup,
+    streaks,
+    writing_days,
+)
+from ..core.queries import (
+    select_active_content,
+    select_owned_project,
+    select_project_count,
+    select_project_page,
+    select_stale_projects,
+)
+from ..core.routing import SessionRoute
+from ..core.search_index import build_match_query, matching_project_ids
+from ..core.text_analytics import analyse_text_async, cached_analysis
 from ..models.user import User
 from ..models.project import Project
+from ..models.segment import Segment
 from ..models.story_content import StoryContent
+from ..models.writing_progress import WritingProgress
 from ..schemas.project import (
+    ProgressHistoryResponse,
     ProjectCreate,
     ProjectUpdate,
     ProjectResponse,
     ProjectListResponse,
     ProjectWithContent,
+    StoryContentVersionInfo,
+    TextStatsResponse,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=SessionRoute)
 
 def get_user_project(
     project_id: int,
     current_user: User,
     db: Session
 ) -> Project:
-    statement = select(Project).where(
-        (Project.id == project_id) & (Project.user_id == current_user.id)
-    )
-    if project := db.exec(statement).first():
+    if project := db.exec(select_owned_project(project_id, current_user.id)).first():
         return project
     else:
         raise HTTPException(
@@ -36,50 +68,94 @@ def get_user_project(
             detail="Project not found or access denied"
         )
 
-def update_word_count(project: Project, db: Session):
-    statement = select(StoryContent).where(
-        (StoryContent.project_id == project.id) & (StoryContent.is_active == True)
-    )
-    active_content = db.exec(statement).first()
-    if active_content and active_content.content:
-        word_count = len(active_content.content.split())
-        project.word_count = word_count
-        project.last_edited_at = datetime.now(timezone.utc)
-        db.add(project)
-        db.commit()
+def get_flushed_project(project_id: int, current_user: User, db: Session) -> Project:
+    """The user's project once its pending autosaves are written.
+
+    Ownership is checked before the flush so no one can write out another
+    user's autosaves; the project is reloaded if the flush changed it.
+    """
+    project = get_user_project(project_id, current_user, db)
+    if autosave_buffer.flush([project_id]):
         db.refresh(project)
+    return project
+
+def _check_project_owner(project_id: int, current_user: User) -> None:
+    with Session(read_engine) as db:
+        get_user_project(project_id, current_user, db)
+
+def settle_autosaves(project_id: int, current_user: User, discard: bool = False) -> None:
+    """Write out, or drop, a project's pending autosaves before a write route's transaction.
+
+    Ownership is checked on a read connection: the flush needs the writer
+    connection, which the route's own session holds from its first query.
+    """
+    if not autosave_buffer.pending(project_id):
+        return
+    run_blocking(_check_project_owner, project_id, current_user)
+    if discard:
+        autosave_buffer.discard(project_id)
+    else:
+        autosave_buffer.flush([project_id])
+
+def rebuild_stale_manuscripts(current_user: User, db: Session) -> None:
+    """Rebuild the single text of the user's stale segmented projects, before a search reads it."""
+    stale = db.exec(select_stale_projects(Project.id).where(Project.user_id == current_user.id)).all()
+    if stale:
+        autosave_buffer.flush(stale)
+
+def encode_project_cursor(project: Project) -> str:
+    sort_value = project.last_edited_at or project.created_at
+    raw = json.dumps([sort_value.replace(tzinfo=None).isoformat(), project.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_project_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, project_id = json.loads(raw)
+        return datetime.fromisoformat(sort_value), int(project_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
 
 @router.get("/", response_model=ProjectListResponse)
 def list_projects(
     skip: int = Query(0, ge=0, description="Number of projects to skip"),
     limit: int = Query(10, ge=1, le=100, description="Number of projects to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces skip"),
+    include_total: bool = Query(True, description="Count matching projects for total and pages"),
     status: Optional[str] = Query(None, description="Filter by project status"),
     genre: Optional[str] = Query(None, description="Filter by genre"),
-    search: Optional[str] = Query(None, description="Search in title and description"),
+    search: Optional[str] = Query(None, description="Full-text search in title, description and content"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_read_session)
 ):
-    statement = select(Project).where(Project.user_id == current_user.id)
+    filters = []
     if status:
-        statement = statement.where(Project.status == status)
+        filters.append(Project.status == status)
     if genre:
-        statement = statement.where(Project.genre == genre)
-    if search:
-        statement = statement.where(
-            (Project.title.ilike(f"%{search}%")) |
-            (Project.description.ilike(f"%{search}%"))
-        )
-    projects = db.exec(statement).all()
-    total = len(projects)
-    page_projects = projects[skip:skip+limit]
-    pages = (total + limit - 1) // limit if total > 0 else 1
+        filters.append(Project.genre == genre)
+    if search and (match_query := build_match_query(search)):
+        rebuild_stale_manuscripts(current_user, db)
+        filters.append(Project.id.in_(matching_project_ids(match_query)))
+    after = decode_project_cursor(cursor) if cursor else None
+    # One extra row tells us whether another page exists without counting
+    projects = db.exec(
+        select_project_page(current_user.id, *filters, after=after, offset=skip, limit=limit + 1)
+    ).all()
+    page_projects = projects[:limit]
+    next_cursor = encode_project_cursor(page_projects[-1]) if len(projects) > limit else None
+
+    total = pages = None
+    if include_total:
+        total = db.exec(select_project_count(current_user.id, *filters)).one()
+        pages = (total + limit - 1) // limit if total > 0 else 1
 
     return ProjectListResponse(
         projects=page_projects,
         total=total,
-        page=(skip // limit) + 1,
+        page=None if cursor else (skip // limit) + 1,
         size=len(page_projects),
-        pages=pages
+        pages=pages,
+        next_cursor=next_cursor,
     )
 
 @router.post("/", response_model=ProjectResponse)
@@ -93,35 +169,46 @@ def create_project(
         user_id=current_user.id
     )
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    db.flush()
 
     initial_content = StoryContent(
         project_id=db_project.id,
-        content="",
         version=1,
         is_active=True,
         save_reason="initial_creation"
     )
+    set_content(initial_content, "")
     db.add(initial_content)
     db.commit()
-    db.refresh(initial_content)
 
     return db_project
 
 @router.get("/{project_id}", response_model=ProjectWithContent)
 def get_project(
     project_id: int,
+    response: Response,
+    include_content: bool = Query(True, description="Include the manuscript text; content_info is always returned"),
+    if_none_match_header: Optional[str] = Header(None, alias="If-None-Match"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_read_session)
 ):
-    project = get_user_project(project_id, current_user, db)
-    statement = select(StoryContent).where(
-        (StoryContent.project_id == project_id) & (StoryContent.is_active == True)
-    )
+    project = get_flushed_project(project_id, current_user, db)
+    statement = select_active_content(project_id)
+    if not include_content:
+        statement = statement.options(defer(StoryContent.content))
     active_content = db.exec(statement).first()
     response_data = ProjectWithContent.model_validate(project)
-    response_data.content = active_content
+    if active_content:
+        response_data.content_info = StoryContentVersionInfo.model_validate(active_content)
+        if include_content:
+            response_data.content = active_content
+    # content_info carries the content hash, so it stands in for the text
+    etag = representation_etag(
+        response_data.model_dump_json(exclude={"content"}), str(include_content)
+    )
+    if if_none_match(if_none_match_header, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     return response_data
 
 @router.put("/{project_id}", response_model=ProjectResponse)
@@ -139,7 +226,6 @@ def update_project(
     project.updated_at = datetime.now(timezone.utc)
     db.add(project)
     db.commit()
-    db.refresh(project)
     return project
 
 @router.delete("/{project_id}")
@@ -148,7 +234,15 @@ def delete_project(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_session)
 ):
+    settle_autosaves(project_id, current_user, discard=True)
     project = get_user_project(project_id, current_user, db)
+    # Versions and segments go with the project rather than being orphaned,
+    # and so do the stored chunks no other version shares
+    chunk_hashes = chunk_refs_of(db, project_id)
+    db.exec(delete(Segment).where(Segment.project_id == project_id))
+    db.exec(delete(StoryContent).where(StoryContent.project_id == project_id))
+    sweep_chunks(db, chunk_hashes)
+    db.exec(delete(WritingProgress).where(WritingProgress.project_id == project_id))
     db.delete(project)
     db.commit()
     return {"message": "Project deleted successfully"}
@@ -157,13 +251,10 @@ def delete_project(
 def get_project_stats(
     project_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_read_session)
 ):
-    project = get_user_project(project_id, current_user, db)
-    statement = select(StoryContent).where(
-        (StoryContent.project_id == project_id) & (StoryContent.is_active == True)
-    )
-    active_content = db.exec(statement).first()
+    project = get_flushed_project(project_id, current_user, db)
+    active_content = db.exec(select_active_content(project_id)).first()
 
     stats = {
         "project_id": project_id,
@@ -175,8 +266,9 @@ def get_project_stats(
             else 0
         ),
         "progress_percentage": 0,
+        # created_at is stored as naive UTC
         "days_since_creation": (
-            datetime.now(timezone.utc) - project.created_at
+            datetime.utcnow() - project.created_at
         ).days,
         "last_edited": (
             project.last_edited_at.isoformat()
@@ -189,3 +281,77 @@ def get_project_stats(
         stats["progress_percentage"] = min(100, (project.word_count / project.target_word_count) * 100)
 
     return stats
+
+@router.get("/{project_id}/stats/history", response_model=ProgressHistoryResponse)
+def get_project_progress(
+    project_id: int,
+    interval: str = Query(DAY, pattern=f"^({'|'.join(INTERVALS)})$", description="hour, day, week or month"),
+    start: Optional[date] = Query(None, description="First day of the range (UTC)"),
+    end: Optional[date] = Query(None, description="Last day of the range (UTC), inclusive; defaults to today"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_session)
+):
+    """Words added and removed per interval, with totals and writing streaks"""
+    get_flushed_project(project_id, current_user, db)
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS[interval] - 1)
+    if start > end:
+        raise HTTPException(status_code=422, detail="start must not be after end")
+    if (end - start).days + 1 > MAX_RANGE_DAYS[interval]:
+        raise HTTPException(
+            status_code=422,
+            detail=f"A {interval} range may cover at most {MAX_RANGE_DAYS[interval]} days",
+        )
+    range_start = datetime.combine(start, time.min)
+    range_end = datetime.combine(end + timedelta(days=1), time.min)
+    points = rollup(
+        progress_range(db, project_id, HOUR if interval == HOUR else DAY, range_start, range_end), interval
+    )
+    days = writing_days(db, project_id, range_end)
+    current_streak, longest_streak = streaks(days, end)
+    words_added = sum(point["words_added"] for point in points)
+    words_removed = sum(point["words_removed"] for point in points)
+    return ProgressHistoryResponse(
+        project_id=project_id,
+        interval=interval,
+        start=start,
+        end=end,
+        points=points,
+        words_added=words_added,
+        words_removed=words_removed,
+        net_words=words_added - words_removed,
+        writing_days=sum(1 for day in days if day >= start),
+        current_streak=current_streak,
+        longest_streak=longest_streak,
+    )
+
+def active_content_hash(db: Session, project_id: int, current_user: User) -> Optional[str]:
+    get_flushed_project(project_id, current_user, db)
+    return db.exec(select_active_content(project_id, StoryContent.content_hash)).first()
+
+def active_text(db: Session, project_id: int) -> Tuple[Optional[str], str]:
+    active_content = db.exec(select_active_content(project_id)).first()
+    if active_content is None:
+        return None, ""
+    return active_content.content_hash, read_text(db, active_content) or ""
+
+@router.get("/{project_id}/stats/text", response_model=TextStatsResponse)
+async def get_project_text_stats(
+    project_id: int,
+    top: int = Query(20, ge=1, le=100, description="Number of most frequent words to return"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_session)
+):
+    """Sentence lengths, readability, word frequencies and dialogue share of the manuscript"""
+    content_hash = await run_in_session(db, active_content_hash, project_id, current_user)
+    # Analyses are keyed by content hash, so an unchanged manuscript skips reading the text
+    analysis = cached_analysis(content_hash) if content_hash else None
+    if analysis is None:
+        # The hash read with the text is the one the analysis is cached under
+        content_hash, text = await run_in_session(db, active_text, project_id)
+        analysis = await analyse_text_async(text, content_hash)
+    return TextStatsResponse(
+        project_id=project_id,
+        content_hash=content_hash,
+        **{**analysis, "top_words": analysis["top_words"][:top]},
+    )
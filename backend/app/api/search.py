@@ -0,0 +1,34 @@
+# backend/app/api/search.py
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+
+from ..core.database import get_read_session
+from ..core.deps import get_current_user
+from ..core.routing import SessionRoute
+from ..core.search_index import build_match_query, search_projects
+from ..models.user import User
+from ..schemas.search import SearchResponse
+from .projects import rebuild_stale_manuscripts
+
+router = APIRouter(route_class=SessionRoute)
+
+@router.get("/", response_model=SearchResponse)
+def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for"),
+    skip: int = Query(0, ge=0, description="Number of results to skip"),
+    limit: int = Query(10, ge=1, le=100, description="Number of results to return"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_session)
+):
+    match_query = build_match_query(q)
+    if match_query is None:
+        return SearchResponse(results=[], total=0, page=1, size=0, pages=1)
+    rebuild_stale_manuscripts(current_user, db)
+    results, total = search_projects(db, current_user.id, match_query, limit, skip)
+    return SearchResponse(
+        results=results,
+        total=total,
+        page=(skip // limit) + 1,
+        size=len(results),
+        pages=(total + limit - 1) // limit if total > 0 else 1,
+    )
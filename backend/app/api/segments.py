@@ -0,0 +1,229 @@
+# backend/app/api/segments.py
+from datetime import timezone
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy import update
+from sqlmodel import Session, select
+from datetime import datetime
+
+from ..core.autosave import autosave_buffer
+from ..core.database import get_read_session, get_session
+from ..core.deps import get_current_user
+from ..core.etags import check_if_match, if_none_match, not_modified, segment_etag, set_etag
+from ..core.queries import select_active_content
+from ..core.routing import SessionRoute
+from ..core.segments import (
+    has_segments,
+    mark_stale,
+    next_position,
+    ordered_segments,
+    set_segment_content,
+)
+from ..models.user import User
+from ..models.project import Project
+from ..models.segment import Segment
+from ..schemas.project import (
+    SegmentCreate,
+    SegmentInfo,
+    SegmentOrder,
+    SegmentResponse,
+    SegmentUpdate,
+)
+from .projects import get_user_project, settle_autosaves
+
+router = APIRouter(route_class=SessionRoute)
+
+def get_project_segment(project_id: int, segment_id: int, db: Session) -> Segment:
+    statement = select(Segment).where(
+        (Segment.id == segment_id) & (Segment.project_id == project_id)
+    )
+    if segment := db.exec(statement).first():
+        return segment
+    raise HTTPException(status_code=404, detail="Segment not found")
+
+def check_parent(project_id: int, kind: str, parent_id: Optional[int], db: Session) -> None:
+    if parent_id is None:
+        return
+    if kind != "scene":
+        raise HTTPException(status_code=422, detail="Only scenes can belong to a chapter")
+    parent = db.exec(select(Segment).where(
+        (Segment.id == parent_id) & (Segment.project_id == project_id)
+    )).first()
+    if parent is None or parent.kind != "chapter":
+        raise HTTPException(status_code=422, detail="parent_id must be a chapter of this project")
+
+def seed_from_manuscript(project: Project, db: Session) -> None:
+    """Keep a project's existing text as its first chapter when it is first segmented."""
+    active_content = db.exec(select_active_content(project.id)).first()
+    text = active_content.content if active_content else None
+    project.word_count = 0
+    if text:
+        seed = Segment(project_id=project.id, kind="chapter", position=0)
+        set_segment_content(seed, text)
+        project.word_count = seed.word_count
+        db.add(seed)
+
+def segment_response(segment: Segment, project: Optional[Project] = None) -> SegmentResponse:
+    return SegmentResponse.model_validate(segment).model_copy(
+        update={"project_word_count": project.word_count if project else None}
+    )
+
+@router.get("/{project_id}/segments", response_model=List[SegmentInfo])
+def list_segments(
+    project_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_session)
+):
+    get_user_project(project_id, current_user, db)
+    return [SegmentInfo.model_validate(row._mapping) for row in ordered_segments(db, project_id)]
+
+@router.post("/{project_id}/segments", response_model=SegmentResponse)
+def create_segment(
+    project_id: int,
+    segment_data: SegmentCreate,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session)
+):
+    settle_autosaves(project_id, current_user)
+    project = get_user_project(project_id, current_user, db)
+    check_parent(project_id, segment_data.kind, segment_data.parent_id, db)
+    if not has_segments(db, project_id):
+        seed_from_manuscript(project, db)
+        db.flush()
+    position = next_position(db, project_id, segment_data.parent_id)
+    if segment_data.position is not None and segment_data.position < position:
+        position = segment_data.position
+        db.exec(
+            update(Segment)
+            .where(
+                (Segment.project_id == project_id)
+                & (Segment.parent_id == segment_data.parent_id)
+                & (Segment.position >= position)
+            )
+            .values(position=Segment.position + 1)
+        )
+    segment = Segment(
+        project_id=project_id,
+        parent_id=segment_data.parent_id,
+        kind=segment_data.kind,
+        title=segment_data.title,
+        position=position,
+    )
+    set_segment_content(segment, segment_data.content)
+    db.add(segment)
+    project.word_count += segment.word_count
+    mark_stale(project)
+    db.add(project)
+    db.commit()
+    autosave_buffer.mark_stale(project_id)
+    set_etag(response, segment_etag(segment))
+    return segment_response(segment, project)
+
+@router.put("/{project_id}/segments/order", response_model=List[SegmentInfo])
+def reorder_segments(
+    project_id: int,
+    order: SegmentOrder,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session)
+):
+    project = get_user_project(project_id, current_user, db)
+    siblings = db.exec(select(Segment).where(
+        (Segment.project_id == project_id) & (Segment.parent_id == order.parent_id)
+    )).all()
+    by_id = {segment.id: segment for segment in siblings}
+    if len(order.segment_ids) != len(by_id) or set(order.segment_ids) != set(by_id):
+        raise HTTPException(status_code=422, detail="segment_ids must list every child of the parent exactly once")
+    moved = False
+    for position, segment_id in enumerate(order.segment_ids):
+        segment = by_id[segment_id]
+        if segment.position != position:
+            segment.position = position
+            db.add(segment)
+            moved = True
+    if moved:
+        mark_stale(project)
+        db.add(project)
+        db.commit()
+        autosave_buffer.mark_stale(project_id)
+    return [SegmentInfo.model_validate(row._mapping) for row in ordered_segments(db, project_id)]
+
+@router.get("/{project_id}/segments/{segment_id}", response_model=SegmentResponse)
+def get_segment(
+    project_id: int,
+    segment_id: int,
+    response: Response,
+    if_none_match_header: Optional[str] = Header(None, alias="If-None-Match"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_session)
+):
+    get_user_project(project_id, current_user, db)
+    segment = get_project_segment(project_id, segment_id, db)
+    etag = segment_etag(segment)
+    if if_none_match(if_none_match_header, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return segment_response(segment)
+
+@router.put("/{project_id}/segments/{segment_id}", response_model=SegmentResponse)
+def save_segment(
+    project_id: int,
+    segment_id: int,
+    segment_data: SegmentUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, alias="If-Match"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session)
+):
+    project = get_user_project(project_id, current_user, db)
+    segment = get_project_segment(project_id, segment_id, db)
+    check_if_match(if_match, segment_etag(segment))
+    changed = False
+    if segment_data.content is not None and segment_data.content != segment.content:
+        previous_words = segment.word_count
+        set_segment_content(segment, segment_data.content)
+        project.word_count = max(0, project.word_count + segment.word_count - previous_words)
+        changed = True
+    if segment_data.title is not None:
+        segment.title = segment_data.title
+    if segment_data.parent_id is not None or segment_data.move_to_top_level:
+        parent_id = None if segment_data.move_to_top_level else segment_data.parent_id
+        check_parent(project_id, segment.kind, parent_id, db)
+        if parent_id != segment.parent_id:
+            segment.parent_id = parent_id
+            segment.position = next_position(db, project_id, parent_id)
+            changed = True
+    segment.updated_at = datetime.now(timezone.utc)
+    db.add(segment)
+    if changed:
+        mark_stale(project)
+        db.add(project)
+    db.commit()
+    if changed:
+        autosave_buffer.mark_stale(project_id)
+    set_etag(response, segment_etag(segment))
+    return segment_response(segment, project)
+
+@router.delete("/{project_id}/segments/{segment_id}")
+def delete_segment(
+    project_id: int,
+    segment_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session)
+):
+    """Delete a segment; deleting a chapter deletes its scenes too."""
+    project = get_user_project(project_id, current_user, db)
+    segment = get_project_segment(project_id, segment_id, db)
+    scenes = db.exec(select(Segment).where(
+        (Segment.project_id == project_id) & (Segment.parent_id == segment.id)
+    )).all()
+    removed_words = segment.word_count + sum(scene.word_count for scene in scenes)
+    for scene in scenes:
+        db.delete(scene)
+    db.delete(segment)
+    project.word_count = max(0, project.word_count - removed_words)
+    mark_stale(project)
+    db.add(project)
+    db.commit()
+    autosave_buffer.mark_stale(project_id)
+    return {"message": "Segment deleted successfully", "segments_deleted": len(scenes) + 1}
@@ -1,94 +1,133 @@
 # backend/app/api/stories.py
+import tempfile
 from datetime import timezone
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, BackgroundTasks, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import defer
 from sqlmodel import Session, select, func
 from datetime import datetime
 
-from ..core.database import get_session
+from ..core.autosave import autosave_buffer
+from ..core.backup import import_backup, iter_backup_records, stream_ndjson, stream_zip
+from ..core.concurrency import run_blocking
+from ..core.config import settings
+from ..core.content_store import archive_version, chunk_hash, has_content, read_text, read_texts, set_content
+from ..core.database import get_read_session, get_session, read_engine
 from ..core.deps import get_current_user
+from ..core.etags import (
+    check_if_match,
+    content_etag,
+    if_none_match,
+    not_modified,
+    representation_etag,
+    set_etag,
+    story_content_etag,
+)
+from ..core.queries import select_active_content, select_content_version, select_version_infos
+from ..core.routing import SessionRoute
+from ..core.segments import has_segments
+from ..core.text_diff import STREAM_MIN_CHARS, UNITS, cache_diff, cached_diff, diff_texts, hunk_chars, stream_json
+from ..core.text_patch import apply_edits
 from ..models.user import User
 from ..models.project import Project
 from ..models.story_content import StoryContent
 from ..schemas.project import (
-    StoryContentCreate,
+    ContentDiffResponse,
     StoryContentUpdate,
+    StoryContentPatch,
+    StoryContentPatchResponse,
     StoryContentResponse,
+    StoryContentSaveResponse,
+    StoryContentVersionInfo,
 )
-from .projects import get_user_project, update_word_count
+from .projects import get_flushed_project, get_user_project, settle_autosaves
 
-router = APIRouter()
+router = APIRouter(route_class=SessionRoute)
 
-async def auto_save_content(
-    project_id: int, 
-    content: str, 
-    user_id: int, 
-    db: Session
-):
-    try:
-        statement = select(StoryContent).where(
-            (StoryContent.project_id == project_id) &
-            (StoryContent.is_active == True)
+def reject_if_segmented(project_id: int, db: Session) -> None:
+    """Segmented manuscripts are written one segment at a time."""
+    if has_segments(db, project_id):
+        raise HTTPException(
+            status_code=409,
+            detail="Project is split into segments; save its chapters and scenes instead",
         )
-        if active_content := db.exec(statement).first():
-            active_content.content = content
-            active_content.auto_saved = True
-            active_content.save_reason = "auto_save"
-            active_content.updated_at = datetime.now(timezone.utc)
-            if project := db.exec(
-                select(Project).where(Project.id == project_id)
-            ).first():
-                word_count = len(content.split()) if content else 0
-                project.word_count = word_count
-                project.last_edited_at = datetime.now(timezone.utc)
-                db.add(project)
-            db.add(active_content)
-            db.commit()
-            db.refresh(active_content)
-    except Exception as e:
-        db.rollback()
-        print(f"Auto-save failed for project {project_id}: {e}")
+
+def _unchanged_content(
+    project_id: int, current_user: User, text: str, if_match: Optional[str]
+) -> Optional[StoryContent]:
+    """The active content if saving ``text`` would leave it as it is.
+
+    Decided on a read connection, so saving the stored text again neither
+    waits for the writer nor holds it; other saves are checked again under it.
+    """
+    with Session(read_engine) as db:
+        get_user_project(project_id, current_user, db)
+        reject_if_segmented(project_id, db)
+        active_content = db.exec(select_active_content(project_id)).first()
+    if active_content is None or not has_content(active_content, text):
+        return None
+    check_if_match(if_match, story_content_etag(active_content))
+    return active_content
+
+def _unchanged_response(response: Response, active_content: StoryContent) -> StoryContentSaveResponse:
+    # Nothing to write; the stored row and its timestamps stay as they are
+    set_etag(response, story_content_etag(active_content))
+    return StoryContentSaveResponse.model_validate(active_content).model_copy(update={"changed": False})
 
 @router.get("/{project_id}/content", response_model=StoryContentResponse)
 def get_story_content(
     project_id: int,
+    response: Response,
+    if_none_match_header: Optional[str] = Header(None, alias="If-None-Match"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_read_session)
 ):
-    get_user_project(project_id, current_user, db)
-    statement = select(StoryContent).where(
-        (StoryContent.project_id == project_id) &
-        (StoryContent.is_active == True)
-    )
-    if content := db.exec(statement).first():
-        return content
-    else:
+    get_flushed_project(project_id, current_user, db)
+    statement = select_active_content(project_id)
+    if not (content := db.exec(statement).first()):
         raise HTTPException(status_code=404, detail="Story content not found")
+    etag = story_content_etag(content)
+    if if_none_match(if_none_match_header, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return content
 
-@router.put("/{project_id}/content", response_model=StoryContentResponse)
+@router.put("/{project_id}/content", response_model=StoryContentSaveResponse)
 def save_story_content(
     project_id: int,
     content_data: StoryContentUpdate,
     background_tasks: BackgroundTasks,
+    response: Response,
+    if_match: Optional[str] = Header(None, alias="If-Match"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_session)
 ):
+    # A conditional save is checked against the tab's own pending autosaves
+    settle_autosaves(project_id, current_user, discard=content_data.content is not None and if_match is None)
+    if content_data.content is not None and (
+        unchanged := run_blocking(_unchanged_content, project_id, current_user, content_data.content, if_match)
+    ):
+        return _unchanged_response(response, unchanged)
     project = get_user_project(project_id, current_user, db)
-    statement = select(StoryContent).where(
-        (StoryContent.project_id == project_id) &
-        (StoryContent.is_active == True)
-    )
+    if content_data.content is not None:
+        reject_if_segmented(project_id, db)
+    statement = select_active_content(project_id)
     active_content = db.exec(statement).first()
+    check_if_match(if_match, story_content_etag(active_content) if active_content else None)
+    # The text may have changed back since it was compared on the read connection
+    if active_content and content_data.content is not None and has_content(active_content, content_data.content):
+        return _unchanged_response(response, active_content)
     if not active_content:
         active_content = StoryContent(
             project_id=project_id,
-            content=content_data.content or "",
             version=1,
             is_active=True
         )
+        set_content(active_content, content_data.content or "")
     else:
         if content_data.content is not None:
-            active_content.content = content_data.content
+            set_content(active_content, content_data.content)
         if content_data.auto_saved is not None:
             active_content.auto_saved = content_data.auto_saved
         if content_data.save_reason is not None:
@@ -96,33 +135,94 @@ def save_story_content(
         active_content.updated_at = datetime.now(timezone.utc)
     db.add(active_content)
     if content_data.content is not None:
-        word_count = len(content_data.content.split()) if content_data.content else 0
-        project.word_count = word_count
+        # Counted by set_content
+        project.word_count = active_content.word_count
         project.last_edited_at = datetime.now(timezone.utc)
         project.updated_at = datetime.now(timezone.utc)
         db.add(project)
     db.commit()
-    db.refresh(active_content)
+    set_etag(response, story_content_etag(active_content))
     return active_content
 
+@router.patch("/{project_id}/content", response_model=StoryContentPatchResponse)
+def patch_story_content(
+    project_id: int,
+    patch: StoryContentPatch,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session)
+):
+    settle_autosaves(project_id, current_user)
+    project = get_user_project(project_id, current_user, db)
+    reject_if_segmented(project_id, db)
+    statement = select_active_content(project_id)
+    active_content = db.exec(statement).first()
+    if not active_content:
+        raise HTTPException(status_code=404, detail="Story content not found")
+    current_text = active_content.content or ""
+    current_hash = active_content.content_hash or chunk_hash(current_text)
+    if patch.base_hash != current_hash:
+        raise HTTPException(status_code=409, detail="Content has changed since base_hash")
+    try:
+        content, word_delta = apply_edits(current_text, patch.edits)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    if content == current_text:
+        set_etag(response, story_content_etag(active_content))
+        return StoryContentPatchResponse(
+            project_id=project_id,
+            version=active_content.version,
+            content_hash=current_hash,
+            word_count=project.word_count,
+            updated_at=active_content.updated_at or active_content.created_at,
+            changed=False,
+        )
+    # Rows from before word counts were stored are counted once here
+    word_count = active_content.word_count + word_delta if active_content.word_count is not None else None
+    set_content(active_content, content, word_count)
+    active_content.auto_saved = patch.auto_saved
+    active_content.save_reason = patch.save_reason
+    active_content.updated_at = datetime.now(timezone.utc)
+    db.add(active_content)
+    project.word_count = active_content.word_count
+    project.last_edited_at = datetime.now(timezone.utc)
+    project.updated_at = datetime.now(timezone.utc)
+    db.add(project)
+    db.commit()
+    set_etag(response, story_content_etag(active_content))
+    return StoryContentPatchResponse(
+        project_id=project_id,
+        version=active_content.version,
+        content_hash=active_content.content_hash,
+        word_count=project.word_count,
+        updated_at=active_content.updated_at,
+    )
+
 @router.post("/{project_id}/auto-save")
 def auto_save_story_content(
     project_id: int,
     content_data: StoryContentUpdate,
-    background_tasks: BackgroundTasks,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_read_session)
 ):
     get_user_project(project_id, current_user, db)
+    changed = False
     if content_data.content is not None:
-        background_tasks.add_task(
-            auto_save_content,
-            project_id,
-            content_data.content,
-            current_user.id,
-            db
-        )
-    return {"message": "Auto-save initiated"}
+        reject_if_segmented(project_id, db)
+        # Checked before reading the stored hash, so a write still in flight
+        # can't make the stored text look current
+        idle = not autosave_buffer.busy(project_id)
+        active = db.exec(
+            select_active_content(project_id, StoryContent.version, StoryContent.content_hash)
+        ).first()
+        content_hash = chunk_hash(content_data.content)
+        if not (idle and active is not None and active.content_hash == content_hash):
+            changed = autosave_buffer.submit(project_id, content_data.content)
+        # The tag the content will have once flushed, for a later If-Match
+        if active is not None:
+            set_etag(response, content_etag(active.version, content_hash))
+    return {"message": "Auto-save initiated" if changed else "No changes to save", "changed": changed}
 
 @router.post("/{project_id}/content/version", response_model=StoryContentResponse)
 def create_content_version(
@@ -130,43 +230,112 @@ def create_content_version(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_session)
 ):
+    settle_autosaves(project_id, current_user)
     get_user_project(project_id, current_user, db)
-    statement = select(StoryContent).where(
-        (StoryContent.project_id == project_id) &
-        (StoryContent.is_active == True)
-    )
+    statement = select_active_content(project_id)
     current_content = db.exec(statement).first()
     if not current_content:
         raise HTTPException(status_code=404, detail="No content to version")
+    content = current_content.content
     current_content.is_active = False
+    archive_version(db, current_content)
     max_version_statement = select(func.max(StoryContent.version)).where(
         StoryContent.project_id == project_id
     )
     max_version = db.exec(max_version_statement).one() or 0
     new_version = StoryContent(
         project_id=project_id,
-        content=current_content.content,
         content_type=current_content.content_type,
         version=(max_version + 1) if isinstance(max_version, int) else 1,
         is_active=True,
         save_reason="version_save"
     )
+    set_content(new_version, content)
     db.add(new_version)
     db.commit()
-    db.refresh(new_version)
     return new_version
 
-@router.get("/{project_id}/content/versions", response_model=List[StoryContentResponse])
+@router.get("/{project_id}/content/versions", response_model=List[StoryContentVersionInfo])
 def get_content_versions(
     project_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_read_session)
 ):
-    get_user_project(project_id, current_user, db)
-    statement = select(StoryContent).where(
-        StoryContent.project_id == project_id
-    ).order_by(StoryContent.version.desc())
-    return db.exec(statement).all()
+    get_flushed_project(project_id, current_user, db)
+    return [
+        StoryContentVersionInfo.model_validate(row._mapping)
+        for row in db.exec(select_version_infos(project_id))
+    ]
+
+@router.get("/{project_id}/content/versions/{version}", response_model=StoryContentResponse)
+def get_content_version(
+    project_id: int,
+    version: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_session)
+):
+    get_flushed_project(project_id, current_user, db)
+    statement = select_content_version(project_id, version)
+    content = db.exec(statement).first()
+    if not content:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return StoryContentResponse.model_validate(content).model_copy(update={"content": read_text(db, content)})
+
+def find_version(db: Session, project_id: int, version: Optional[int]) -> StoryContent:
+    """A version's row without its text, or the active one when ``version`` is None"""
+    statement = (
+        select_content_version(project_id, version) if version is not None else select_active_content(project_id)
+    ).options(defer(StoryContent.content))
+    if content := db.exec(statement).first():
+        return content
+    raise HTTPException(status_code=404, detail="Version not found")
+
+@router.get("/{project_id}/content/diff", response_model=ContentDiffResponse)
+def diff_content_versions(
+    project_id: int,
+    response: Response,
+    from_version: int = Query(..., alias="from", description="Version to diff from"),
+    to_version: Optional[int] = Query(None, alias="to", description="Version to diff to; defaults to the active one"),
+    unit: str = Query("word", pattern=f"^({'|'.join(UNITS)})$", description="word or paragraph"),
+    if_none_match_header: Optional[str] = Header(None, alias="If-None-Match"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_session)
+):
+    """Changes between two versions as hunks, so comparing drafts needs neither text.
+
+    Large diffs are streamed.
+    """
+    get_flushed_project(project_id, current_user, db)
+    old, new = find_version(db, project_id, from_version), find_version(db, project_id, to_version)
+    old_hash, new_hash = old.content_hash, new.content_hash
+    diff = etag = None
+    if old_hash and new_hash:
+        # The hashes fix the hunks, so neither the ETag nor a cached diff needs the text
+        etag = representation_etag(old_hash, new_hash, unit, str(old.version), str(new.version))
+        if if_none_match(if_none_match_header, etag):
+            return not_modified(etag)
+        diff = cached_diff(old_hash, new_hash, unit)
+    if diff is None:
+        texts = read_texts(db, [old, new])
+        old_text, new_text = texts[old.id] or "", texts[new.id] or ""
+        old_hash, new_hash = old_hash or chunk_hash(old_text), new_hash or chunk_hash(new_text)
+        diff = run_blocking(diff_texts, old_text, new_text, unit)
+        cache_diff(old_hash, new_hash, unit, diff)
+    result = {
+        "project_id": project_id,
+        "from_version": old.version,
+        "to_version": new.version,
+        "from_hash": old_hash,
+        "to_hash": new_hash,
+        **diff,
+    }
+    etag = etag or representation_etag(old_hash, new_hash, unit, str(old.version), str(new.version))
+    if hunk_chars(diff) >= STREAM_MIN_CHARS:
+        streamed = StreamingResponse(stream_json(result, "hunks"), media_type="application/json")
+        set_etag(streamed, etag)
+        return streamed
+    set_etag(response, etag)
+    return result
 
 @router.post("/{project_id}/content/restore/{version}")
 def restore_content_version(
@@ -175,46 +344,107 @@ def restore_content_version(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_session)
 ):
+    settle_autosaves(project_id, current_user)
     project = get_user_project(project_id, current_user, db)
-    statement_restore = select(StoryContent).where(
-        (StoryContent.project_id == project_id) &
-        (StoryContent.version == version)
-    )
+    reject_if_segmented(project_id, db)
+    statement_restore = select_content_version(project_id, version)
     version_to_restore = db.exec(statement_restore).first()
     if not version_to_restore:
         raise HTTPException(status_code=404, detail="Version not found")
-    statement_active = select(StoryContent).where(
-        (StoryContent.project_id == project_id) &
-        (StoryContent.is_active == True)
-    )
+    content = read_text(db, version_to_restore)
+    statement_active = select_active_content(project_id)
     if current_active := db.exec(statement_active).first():
         current_active.is_active = False
-        db.add(current_active)
+        archive_version(db, current_active)
+    max_version = db.exec(
+        select(func.max(StoryContent.version)).where(StoryContent.project_id == project_id)
+    ).one() or 0
     restored_content = StoryContent(
         project_id=project_id,
-        content=version_to_restore.content,
         content_type=version_to_restore.content_type,
-        version=1,
+        version=max_version + 1,
         is_active=True,
         save_reason="version_restore"
     )
+    set_content(restored_content, content)
     db.add(restored_content)
-    update_word_count(project, db)
+    # Counted by set_content; committed in the same unit of work as the restore
+    now = datetime.now(timezone.utc)
+    project.word_count = restored_content.word_count
+    project.last_edited_at = now
+    project.updated_at = now
+    db.add(project)
     db.commit()
-    db.refresh(restored_content)
     return {"message": f"Version {version} restored successfully"}
 
+BACKUP_FORMAT_PATTERN = "^(ndjson|zip)$"
+
+def streaming_backup(project_ids: List[int], format: str, filename: str) -> StreamingResponse:
+    autosave_buffer.flush(project_ids)
+    records = iter_backup_records(project_ids)
+    if format == "zip":
+        body, media_type = stream_zip(records), "application/zip"
+    else:
+        body, media_type = stream_ndjson(records), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
+
+@router.get("/backup")
+def backup_all_content(
+    format: str = Query("ndjson", pattern=BACKUP_FORMAT_PATTERN, description="ndjson or zip"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_session)
+):
+    project_ids = db.exec(
+        select(Project.id).where(Project.user_id == current_user.id).order_by(Project.id)
+    ).all()
+    return streaming_backup(project_ids, format, f"{current_user.username}-backup")
+
+# Uploads larger than this are spooled to a temporary file
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+def import_progress(upload, user_id: int):
+    with upload:
+        yield from stream_ndjson(import_backup(upload, user_id))
+
+@router.post("/import")
+async def import_content(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+):
+    """Import an NDJSON, zip or JSON backup sent as the raw request body.
+
+    The response streams one NDJSON progress record per imported project.
+    """
+    upload = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > settings.IMPORT_MAX_BYTES:
+            upload.close()
+            raise HTTPException(status_code=413, detail="Backup is too large")
+        upload.write(chunk)
+    upload.seek(0)
+    return StreamingResponse(import_progress(upload, current_user.id), media_type="application/x-ndjson")
+
 @router.get("/{project_id}/content/backup")
 def backup_content(
     project_id: int,
+    format: str = Query("json", pattern="^(json|ndjson|zip)$", description="json, ndjson or zip"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_read_session)
 ):
-    project = get_user_project(project_id, current_user, db)
+    project = get_flushed_project(project_id, current_user, db)
+    if format != "json":
+        return streaming_backup([project_id], format, f"project-{project_id}-backup")
     statement_versions = select(StoryContent).where(
         StoryContent.project_id == project_id
     ).order_by(StoryContent.version.desc())
     versions = db.exec(statement_versions).all()
+    texts = read_texts(db, versions)
     return {
         "project": {
             "id": project.id,
@@ -228,7 +458,7 @@ def backup_content(
         "content_versions": [
             {
                 "version": content.version,
-                "content": content.content,
+                "content": texts[content.id],
                 "content_type": content.content_type,
                 "is_active": content.is_active,
                 "created_at": content.created_at.isoformat(),
@@ -1,12 +1,18 @@
 # backend/app/api/users.py
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from app.core.database import get_session
+from sqlmodel import Session
+from app.api.auth import find_user, save_user
+from app.core.database import get_read_session, get_session, run_in_session
+from app.core.queries import select_dashboard_stats
+from app.core.routing import SessionRoute
 from app.core.deps import get_current_user
 from app.models.user import User, UserRead, UserUpdate
-from app.core.security import hash_password
+from app.models.user_stats import UserStats
+from app.core.security import hash_password_async
+from app.core.user_cache import invalidate_user
 
-router = APIRouter()
+router = APIRouter(route_class=SessionRoute)
 
 @router.get("/profile", response_model=UserRead)
 def get_user_profile(current_user: User = Depends(get_current_user)):
@@ -20,35 +26,54 @@ def get_user_profile(current_user: User = Depends(get_current_user)):
     )
 
 @router.put("/profile")
-def update_user_profile(
+async def update_user_profile(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
+    read_db: Session = Depends(get_read_session),
     db: Session = Depends(get_session)
 ):
     """Update current user's profile"""
     if user_update.email:
-        if existing_email := db.exec(
-            select(User).where(
-                User.email == user_update.email, User.id != current_user.id
-            )
-        ).first():
+        if existing_email := await run_in_session(
+            read_db, find_user, User.email == user_update.email, User.id != current_user.id
+        ):
             raise HTTPException(status_code=400, detail="Email already taken")
         current_user.email = user_update.email
 
     if user_update.password:
         if len(user_update.password) < 8:
             raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
-        current_user.password_hash = hash_password(user_update.password)
+        current_user.password_hash = await hash_password_async(user_update.password)
 
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    await run_in_session(db, save_user, current_user)
+    # Cached snapshots must not outlive a profile change
+    invalidate_user(current_user.id)
 
     return {"message": "Profile updated successfully"}
 
+@router.post("/deactivate")
+async def deactivate_user(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session)
+):
+    """Deactivate the current user's account; its tokens stop working at once"""
+    current_user.is_active = False
+    await run_in_session(db, save_user, current_user)
+    invalidate_user(current_user.id)
+    return {"message": "Account deactivated"}
+
 @router.get("/dashboard")
-def get_user_dashboard(current_user: User = Depends(get_current_user)):
-    """Get user dashboard data"""
+def get_user_dashboard(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_session)
+):
+    """Get user dashboard data
+
+    Reads the aggregates kept by app.core.user_stats; pending autosaves show
+    up once the buffer flushes them.
+    """
+    stats = db.exec(select_dashboard_stats(current_user.id)).first() or UserStats(user_id=current_user.id)
+    words_today = stats.words_today if stats.words_today_date == datetime.utcnow().date() else 0
     return {
         "message": f"Welcome to your dashboard, {current_user.username}!",
         "user": {
@@ -58,8 +83,11 @@ def get_user_dashboard(current_user: User = Depends(get_current_user)):
             "member_since": current_user.created_at
         },
         "stats": {
-            "projects": 0,  # Will be implemented in Phase 2
+            "projects": stats.project_count,
+            "projects_by_status": stats.status_counts,
             "characters": 0,  # Will be implemented in Phase 2
-            "word_count": 0   # Will be implemented in Phase 2
+            "word_count": stats.total_words,
+            "words_today": words_today,
+            "last_activity_at": stats.last_activity_at,
         }
     }
@@ -0,0 +1,146 @@
+# backend/app/cli.py
+"""Maintenance commands, run from the backend folder: python -m app.cli <command>"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.core.backup import import_backup
+from app.core.config import settings
+from app.core.content_store import sweep_chunks
+from app.core.database import create_db_and_tables, engine
+from app.core.progress import prune_hourly_progress
+from app.core.query_plans import check_query_plans, explain, hot_queries
+from app.core.user_stats import rebuild_user_stats
+from app.models.user import User
+
+
+def import_backup_command(args) -> int:
+    create_db_and_tables()
+    with Session(engine) as db:
+        user = db.exec(select(User).where(User.username == args.username)).first()
+    if user is None:
+        print(f"Unknown user {args.username!r}", file=sys.stderr)
+        return 1
+    with open(args.path, "rb") as backup_file:
+        for event in import_backup(backup_file, user.id):
+            print(json.dumps(event, ensure_ascii=False), flush=True)
+            if event["type"] == "error":
+                return 1
+    return 0
+
+
+def check_query_plans_command(args) -> int:
+    if args.database:
+        plan_engine = engine
+    else:
+        # The schema as the models declare it, without touching any data
+        plan_engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(plan_engine)
+    with plan_engine.connect() as connection:
+        failures = check_query_plans(connection)
+        for name, query in hot_queries.items():
+            status = "FAIL" if name in failures else "ok"
+            print(f"{status:4} {name}")
+            if args.verbose or name in failures:
+                for detail in explain(connection, query.build()):
+                    print(f"       {detail}")
+    if failures:
+        print(f"{len(failures)} of {len(hot_queries)} hot queries regressed", file=sys.stderr)
+        return 1
+    return 0
+
+
+def rebuild_user_stats_command(args) -> int:
+    create_db_and_tables()
+    with engine.begin() as connection:
+        if args.username:
+            user_ids = connection.execute(select(User.id).where(User.username.in_(args.username))).scalars().all()
+            if len(user_ids) != len(set(args.username)):
+                print("Unknown user in " + ", ".join(args.username), file=sys.stderr)
+                return 1
+            rebuilt = rebuild_user_stats(connection, user_ids)
+        else:
+            rebuilt = rebuild_user_stats(connection)
+    print(f"Rebuilt dashboard stats for {rebuilt} users")
+    return 0
+
+
+def prune_progress_command(args) -> int:
+    create_db_and_tables()
+    before = datetime.utcnow() - timedelta(days=args.keep_days)
+    with engine.begin() as connection:
+        pruned = prune_hourly_progress(connection, before)
+    print(f"Pruned {pruned} hourly progress rows older than {args.keep_days} days")
+    return 0
+
+
+def sweep_chunks_command(args) -> int:
+    create_db_and_tables()
+    # The writer's transaction keeps saves from reusing a chunk while it goes
+    with Session(engine) as db:
+        swept = sweep_chunks(db)
+        db.commit()
+    print(f"Deleted {swept} unreferenced content chunks")
+    return 0
+
+
+def deactivate_user_command(args) -> int:
+    create_db_and_tables()
+    with Session(engine) as db:
+        user = db.exec(select(User).where(User.username == args.username)).first()
+        if user is None:
+            print(f"Unknown user {args.username!r}", file=sys.stderr)
+            return 1
+        user.is_active = args.reactivate
+        db.add(user)
+        db.commit()
+    # Running servers cache users; they see the change when their snapshot expires
+    state = "Reactivated" if args.reactivate else "Deactivated"
+    print(f"{state} {args.username}; running servers apply it within {settings.AUTH_CACHE_TTL:g} seconds")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import-backup", help="Import an NDJSON, zip or JSON backup for a user")
+    importer.add_argument("path", help="Backup file to import")
+    importer.add_argument("--username", required=True, help="User who will own the imported projects")
+    importer.set_defaults(handler=import_backup_command)
+
+    plans = commands.add_parser("check-query-plans", help="Fail if a hot query no longer uses an index")
+    plans.add_argument("--database", action="store_true", help="Check the configured database instead of a fresh schema")
+    plans.add_argument("--verbose", action="store_true", help="Print every query plan")
+    plans.set_defaults(handler=check_query_plans_command)
+
+    stats = commands.add_parser("rebuild-user-stats", help="Recompute dashboard aggregates from the projects")
+    stats.add_argument("--username", action="append", help="Only this user; may be repeated")
+    stats.set_defaults(handler=rebuild_user_stats_command)
+
+    prune = commands.add_parser("prune-progress", help="Delete old hourly writing progress; daily rows are kept")
+    prune.add_argument(
+        "--keep-days", type=int, default=settings.PROGRESS_HOURLY_RETENTION_DAYS,
+        help="Hourly rows to keep, in days (default: PROGRESS_HOURLY_RETENTION_DAYS)",
+    )
+    prune.set_defaults(handler=prune_progress_command)
+
+    sweep = commands.add_parser("sweep-chunks", help="Delete stored content chunks no version refers to")
+    sweep.set_defaults(handler=sweep_chunks_command)
+
+    deactivate = commands.add_parser(
+        "deactivate-user", help="Stop a user from logging in or using their tokens (within AUTH_CACHE_TTL seconds)"
+    )
+    deactivate.add_argument("username", help="User to deactivate")
+    deactivate.add_argument("--reactivate", action="store_true", help="Let the user back in instead")
+    deactivate.set_defaults(handler=deactivate_user_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
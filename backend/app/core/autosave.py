@@ -0,0 +1,290 @@
+# backend/app/core/autosave.py
+"""Write-behind buffer that coalesces autosaves per project.
+
+Autosave requests only record the latest text for their project. A background
+thread writes everything pending in one transaction every
+``AUTOSAVE_FLUSH_INTERVAL`` seconds, or sooner once the buffer grows past its
+size limits, using its own sessions rather than the request's.
+
+Text that matches what is pending or stored is not written again, so idle
+editor tabs that keep autosaving the same manuscript cost no writes.
+
+When a batch fails, its autosaves are retried one by one so a single bad
+project cannot hold the others back. An autosave that fails
+``AUTOSAVE_MAX_ATTEMPTS`` flushes in a row is dropped and logged.
+
+Flushes for particular projects, which routes that read a project's single
+text make first, also rebuild that text if the project's segments changed
+since it was last built (see ``app.core.segments``). The periodic flushes
+leave it stale, so editing one scene never costs rewriting the whole book
+every few seconds.
+"""
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from .config import settings
+from .content_store import has_content, set_content
+from .concurrency import run_blocking
+from .database import engine
+from .metrics import autosave_flush_duration, autosave_writes, manuscript_rebuilds
+from .queries import select_active_contents, select_stale_projects
+from .segments import rebuild_manuscripts
+from ..models.project import Project
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 200
+
+
+class AutosaveBuffer:
+    def __init__(
+        self,
+        bind: Engine,
+        flush_interval: float,
+        max_pending: int,
+        max_pending_bytes: int,
+        max_attempts: int,
+    ):
+        self._bind = bind
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._max_pending_bytes = max_pending_bytes
+        self._max_attempts = max_attempts
+        self._pending: Dict[int, str] = {}
+        self._pending_bytes = 0
+        # Projects whose taken autosaves are still being written
+        self._writing: Set[int] = set()
+        # Failed writes in a row per project, while it is being retried
+        self._failures: Dict[int, int] = {}
+        # Segmented projects whose single text needs rebuilding
+        self._stale: Set[int] = set()
+        self._lock = threading.Lock()
+        # Serialises writers so an older flush can never land after a newer one
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        # Pick up manuscripts left stale by a previous process
+        with Session(self._bind) as db:
+            stale = db.exec(select_stale_projects(Project.id)).all()
+        with self._lock:
+            self._stale.update(stale)
+        self._thread = threading.Thread(target=self._run, name="autosave-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher thread and write out everything still pending."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def submit(self, project_id: int, content: str) -> bool:
+        """Record the latest text for a project; False if it was already pending."""
+        with self._lock:
+            previous = self._pending.get(project_id)
+            if previous == content:
+                return False
+            if previous is not None:
+                self._pending_bytes -= len(previous)
+            self._pending[project_id] = content
+            self._pending_bytes += len(content)
+            full = (
+                len(self._pending) >= self._max_pending
+                or self._pending_bytes >= self._max_pending_bytes
+            )
+        if full:
+            self._wake.set()
+        return True
+
+    def busy(self, project_id: int) -> bool:
+        """Whether an autosave for the project is pending or being written.
+
+        While it is not, the stored text is the latest one.
+        """
+        with self._lock:
+            return project_id in self._pending or project_id in self._writing
+
+    def pending(self, project_id: int) -> bool:
+        """Whether a flush of the project would have anything to write or rebuild."""
+        with self._lock:
+            return project_id in self._pending or project_id in self._writing or project_id in self._stale
+
+    def mark_stale(self, project_id: int) -> None:
+        """Note that a project's segments changed after its text was last built."""
+        with self._lock:
+            self._stale.add(project_id)
+
+    def discard(self, project_id: int) -> None:
+        """Drop a pending autosave that a newer explicit save supersedes."""
+        run_blocking(self._discard, project_id)
+
+    def flush(self, project_ids: Optional[Iterable[int]] = None) -> bool:
+        """Write pending autosaves now, for the given projects or for all of them.
+
+        Stale manuscripts are rebuilt only for the given projects. Returns
+        whether anything was written or rebuilt.
+        """
+        if project_ids is not None:
+            project_ids = set(project_ids)
+            # Nothing to wait for, so no need to queue behind other flushes
+            if not any(map(self.pending, project_ids)):
+                return False
+        return run_blocking(self._flush, project_ids)
+
+    def _discard(self, project_id: int) -> None:
+        with self._flush_lock:
+            self._done(self._take([project_id]))
+
+    def _flush(self, project_ids: Optional[Iterable[int]]) -> bool:
+        with self._flush_lock:
+            items = self._take(project_ids)
+            try:
+                for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                    batch = items[start:start + FLUSH_BATCH_SIZE]
+                    if not self._write(batch) and len(batch) > 1:
+                        for item in batch:
+                            self._write([item])
+            finally:
+                self._done(items)
+            # Rebuilt only for readers of the single text, never on the timer
+            stale = self._take_stale(project_ids) if project_ids is not None else []
+            if stale:
+                self._rebuild(stale)
+        return bool(items or stale)
+
+    def _take(self, project_ids: Optional[Iterable[int]]) -> List[Tuple[int, str]]:
+        with self._lock:
+            if project_ids is None:
+                items = list(self._pending.items())
+                self._pending.clear()
+            else:
+                items = [
+                    (project_id, self._pending.pop(project_id))
+                    for project_id in set(project_ids)
+                    if project_id in self._pending
+                ]
+            self._pending_bytes -= sum(len(content) for _, content in items)
+            self._writing.update(project_id for project_id, _ in items)
+        return items
+
+    def _done(self, items: List[Tuple[int, str]]) -> None:
+        with self._lock:
+            self._writing.difference_update(project_id for project_id, _ in items)
+
+    def _take_stale(self, project_ids: Iterable[int]) -> List[int]:
+        with self._lock:
+            stale = [project_id for project_id in set(project_ids) if project_id in self._stale]
+            self._stale.difference_update(stale)
+        return stale
+
+    def _rebuild(self, project_ids: List[int]) -> None:
+        with Session(self._bind) as db:
+            try:
+                rebuilt = rebuild_manuscripts(db, project_ids)
+                db.commit()
+                manuscript_rebuilds.inc(len(rebuilt), result="success")
+            except Exception:
+                db.rollback()
+                manuscript_rebuilds.inc(len(project_ids), result="failure")
+                logger.exception("Rebuilding manuscripts failed for projects %s", project_ids)
+                with self._lock:
+                    self._stale.update(project_ids)
+
+    def _write(self, items: List[Tuple[int, str]]) -> bool:
+        """Write autosaves in one transaction; False if it failed."""
+        project_ids = [project_id for project_id, _ in items]
+        with autosave_flush_duration.time(), Session(self._bind) as db:
+            try:
+                active_contents = {
+                    content.project_id: content
+                    for content in db.exec(select_active_contents(project_ids))
+                }
+                projects = {
+                    project.id: project
+                    for project in db.exec(select(Project).where(Project.id.in_(project_ids)))
+                }
+                now = datetime.now(timezone.utc)
+                unchanged = 0
+                for project_id, content in items:
+                    active_content = active_contents.get(project_id)
+                    if active_content is None:
+                        continue
+                    if has_content(active_content, content):
+                        unchanged += 1
+                        continue
+                    set_content(active_content, content)
+                    active_content.auto_saved = True
+                    active_content.save_reason = "auto_save"
+                    active_content.updated_at = now
+                    db.add(active_content)
+                    if project := projects.get(project_id):
+                        project.word_count = active_content.word_count
+                        project.last_edited_at = now
+                        db.add(project)
+                db.commit()
+            except Exception:
+                db.rollback()
+                if len(items) > 1:
+                    # Retried one by one straight away by the caller
+                    logger.warning("Auto-save batch failed for projects %s", project_ids, exc_info=True)
+                else:
+                    autosave_writes.inc(result="failure")
+                    logger.exception("Auto-save failed for project %s", project_ids[0])
+                    self._retry(items[0])
+                return False
+        autosave_writes.inc(len(items) - unchanged, result="success")
+        autosave_writes.inc(unchanged, result="unchanged")
+        with self._lock:
+            for project_id in project_ids:
+                self._failures.pop(project_id, None)
+        return True
+
+    def _retry(self, item: Tuple[int, str]) -> None:
+        """Put a failed autosave back for the next flush, or drop it after too many attempts.
+
+        A newer autosave that arrived meanwhile replaces it either way.
+        """
+        project_id, content = item
+        with self._lock:
+            attempts = self._failures.get(project_id, 0) + 1
+            if attempts >= self._max_attempts:
+                self._failures.pop(project_id, None)
+            else:
+                self._failures[project_id] = attempts
+                if project_id not in self._pending:
+                    self._pending[project_id] = content
+                    self._pending_bytes += len(content)
+        if attempts >= self._max_attempts:
+            autosave_writes.inc(result="dropped")
+            logger.error("Dropped the auto-save for project %s after %d failed attempts", project_id, attempts)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Auto-save flush failed")
+
+
+autosave_buffer = AutosaveBuffer(
+    engine,
+    flush_interval=settings.AUTOSAVE_FLUSH_INTERVAL,
+    max_pending=settings.AUTOSAVE_MAX_PENDING,
+    max_pending_bytes=settings.AUTOSAVE_MAX_PENDING_BYTES,
+    max_attempts=settings.AUTOSAVE_MAX_ATTEMPTS,
+)
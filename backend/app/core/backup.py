@@ -0,0 +1,421 @@
+# backend/app/core/backup.py
+"""Streaming backup export and import.
+
+Backups are a sequence of JSON records: a ``backup`` header, then for each
+project a ``project`` record followed by one ``content_version`` record per
+stored version. They are produced either as NDJSON or as a zip archive where
+each version's text is its own file and the records live in ``backup.ndjson``.
+
+Versions are read in small keyset batches on a dedicated session, so memory
+stays flat however many versions a project has and no read transaction is held
+open while the client is downloading.
+
+Imports accept those formats plus the original single-project JSON backup.
+Records are parsed and validated one at a time and versions are written with
+executemany inserts, committing every few hundred rows.
+"""
+import io
+import json
+import logging
+import zipfile
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from .concurrency import run_cpu_bound
+from .config import settings
+from .content_store import chunk_hash, count_words, read_texts, set_content, store_text
+from .database import engine, read_engine
+from .queries import select_version_batch
+from ..models.project import Project
+from ..models.story_content import StoryContent
+from ..schemas.backup import BackupContentVersion, BackupProject
+
+logger = logging.getLogger(__name__)
+
+BACKUP_FORMAT_VERSION = 1
+EXPORT_BATCH_SIZE = 20
+IMPORT_BATCH_SIZE = 100
+IMPORT_COMMIT_ROWS = 500
+# Zip members are decompressed in pieces of this size so the cap is checked as they grow
+ZIP_READ_SIZE = 1024 * 1024
+CONTENT_FILE_EXTENSIONS = {"markdown": "md", "html": "html", "plain": "txt"}
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _header_record() -> dict:
+    return {
+        "type": "backup",
+        "format_version": BACKUP_FORMAT_VERSION,
+        "backup_created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _project_record(project: Project) -> dict:
+    return {
+        "type": "project",
+        "id": project.id,
+        "title": project.title,
+        "description": project.description,
+        "genre": project.genre,
+        "status": project.status,
+        "is_private": project.is_private,
+        "target_word_count": project.target_word_count,
+        "word_count": project.word_count,
+        "created_at": _iso(project.created_at),
+        "updated_at": _iso(project.updated_at),
+        "last_edited_at": _iso(project.last_edited_at),
+    }
+
+
+def _version_record(content: StoryContent, text: Optional[str]) -> dict:
+    return {
+        "type": "content_version",
+        "project_id": content.project_id,
+        "version": content.version,
+        "content": text,
+        "content_type": content.content_type,
+        "is_active": content.is_active,
+        "auto_saved": content.auto_saved,
+        "save_reason": content.save_reason,
+        "created_at": _iso(content.created_at),
+        "updated_at": _iso(content.updated_at),
+    }
+
+
+def _iter_versions(db: Session, project_id: int) -> Iterator[dict]:
+    after = None
+    while True:
+        batch = db.exec(select_version_batch(project_id, after, EXPORT_BATCH_SIZE)).all()
+        if not batch:
+            return
+        texts = read_texts(db, batch)
+        for content in batch:
+            yield _version_record(content, texts[content.id])
+        after = (batch[-1].version, batch[-1].id)
+        # Drop the batch from the identity map before fetching the next one
+        db.expunge_all()
+
+
+def iter_backup_records(project_ids: Iterable[int]) -> Iterator[dict]:
+    yield _header_record()
+    with Session(read_engine) as db:
+        for project_id in project_ids:
+            project = db.get(Project, project_id)
+            if project is None:
+                continue
+            yield _project_record(project)
+            yield from _iter_versions(db, project_id)
+
+
+def stream_ndjson(records: Iterable[dict]) -> Iterator[bytes]:
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only sink that hands zipfile output back to the caller in pieces."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def content_file_name(record: dict, suffix: str = "") -> str:
+    extension = CONTENT_FILE_EXTENSIONS.get(record["content_type"], "txt")
+    return f"projects/{record['project_id']}/versions/{record['version']}{suffix}.{extension}"
+
+
+def stream_zip(records: Iterable[dict]) -> Iterator[bytes]:
+    """Zip archive with one file per version and all records in backup.ndjson.
+
+    Version texts are written as they are read; only the (small) records are
+    kept until the end, when backup.ndjson is appended.
+    """
+    sink = _ZipStream()
+    entries: List[dict] = []
+    names = set()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for record in records:
+            if record["type"] == "content_version":
+                text = record.pop("content")
+                if text is not None:
+                    name = content_file_name(record)
+                    # Older restores could reuse a version number
+                    if name in names:
+                        name = content_file_name(record, suffix=f"-{len(entries)}")
+                    names.add(name)
+                    with archive.open(name, mode="w") as entry:
+                        entry.write(text.encode("utf-8"))
+                    record["content_file"] = name
+            entries.append(record)
+            if data := sink.drain():
+                yield data
+        with archive.open("backup.ndjson", mode="w") as entry:
+            for record in entries:
+                entry.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+    yield sink.drain()
+
+
+class BackupFormatError(ValueError):
+    """Raised when a backup cannot be parsed."""
+
+
+def _iter_ndjson(lines: Iterable[str], first_line: int = 1) -> Iterator[dict]:
+    for number, line in enumerate(lines, start=first_line):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise BackupFormatError(f"Line {number}: {e.msg}") from e
+        if not isinstance(record, dict):
+            raise BackupFormatError(f"Line {number}: expected a JSON object")
+        yield record
+
+
+def _iter_zip(fileobj: BinaryIO) -> Iterator[dict]:
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as e:
+        raise BackupFormatError("Corrupt zip backup") from e
+    with archive:
+        try:
+            index = archive.open("backup.ndjson")
+        except KeyError as e:
+            raise BackupFormatError("Zip backup has no backup.ndjson") from e
+        with index:
+            for record in _iter_ndjson(io.TextIOWrapper(index, encoding="utf-8")):
+                if content_file := record.get("content_file"):
+                    record["content"] = _read_member(archive, content_file).decode("utf-8")
+                yield record
+
+
+def _read_member(archive: zipfile.ZipFile, name: str) -> bytes:
+    """A zip member's bytes, refusing more than ``IMPORT_MAX_ENTRY_BYTES`` once decompressed."""
+    limit = settings.IMPORT_MAX_ENTRY_BYTES
+    try:
+        info = archive.getinfo(name)
+    except KeyError as e:
+        raise BackupFormatError(f"Zip backup is missing {name}") from e
+    too_large = BackupFormatError(f"{name} is larger than {limit} bytes uncompressed")
+    # The declared size turns most oversized members away before any inflating
+    if info.file_size > limit:
+        raise too_large
+    pieces: List[bytes] = []
+    size = 0
+    with archive.open(info) as member:
+        while piece := member.read(ZIP_READ_SIZE):
+            size += len(piece)
+            if size > limit:
+                raise too_large
+            pieces.append(piece)
+    return b"".join(pieces)
+
+
+def _iter_legacy(document) -> Iterator[dict]:
+    """Records from the original single-project JSON backup."""
+    if not isinstance(document, dict) or not isinstance(document.get("project"), dict):
+        raise BackupFormatError("Unrecognised backup format")
+    yield {"type": "project", **document["project"]}
+    for version in document.get("content_versions") or []:
+        yield {"type": "content_version", **version}
+
+
+def read_backup_records(fileobj: BinaryIO) -> Iterator[dict]:
+    """Yield the raw records of an NDJSON, zip or legacy JSON backup."""
+    if fileobj.read(4) == b"PK\x03\x04":
+        fileobj.seek(0)
+        yield from _iter_zip(fileobj)
+        return
+    fileobj.seek(0)
+    text = io.TextIOWrapper(fileobj, encoding="utf-8")
+    try:
+        header = json.loads(text.readline())
+    except json.JSONDecodeError:
+        header = None
+    if isinstance(header, dict) and header.get("type") == "backup":
+        yield header
+        yield from _iter_ndjson(text, first_line=2)
+        return
+    text.seek(0)
+    try:
+        document = json.load(text)
+    except json.JSONDecodeError as e:
+        raise BackupFormatError("Backup is neither NDJSON, zip nor JSON") from e
+    yield from _iter_legacy(document)
+
+
+class _ProjectImport:
+    """Collects one imported project's versions and writes them in batches.
+
+    Archived versions go straight into the chunk store and are inserted with
+    executemany. The active version is written through the ORM at the end so
+    the search index picks it up.
+    """
+
+    def __init__(self, db: Session, project: Project):
+        self.db = db
+        self.project = project
+        self.rows: List[dict] = []
+        self.version_count = 0
+        self.active: Optional[BackupContentVersion] = None
+        self.latest: Optional[BackupContentVersion] = None
+
+    def add(self, version: BackupContentVersion) -> None:
+        self.version_count += 1
+        if version.is_active and self.active is None:
+            self.active = version
+            return
+        if self.latest is None or version.version > self.latest.version:
+            self.latest = version
+        text = version.content
+        self.rows.append({
+            "project_id": self.project.id,
+            "content": None,
+            "content_hash": chunk_hash(text) if text is not None else None,
+            "char_count": len(text) if text is not None else None,
+            "word_count": run_cpu_bound(count_words, text) if text is not None else None,
+            "chunk_refs": store_text(self.db, text) if text is not None else None,
+            "content_type": version.content_type,
+            "version": version.version,
+            "is_active": False,
+            "auto_saved": version.auto_saved,
+            "save_reason": version.save_reason,
+            "created_at": version.created_at or datetime.utcnow(),
+            "updated_at": version.updated_at,
+        })
+        if len(self.rows) >= IMPORT_BATCH_SIZE:
+            self.write_rows()
+
+    def write_rows(self) -> None:
+        if self.rows:
+            self.db.exec(insert(StoryContent), params=self.rows)
+            self.rows = []
+
+    def finish(self) -> None:
+        self.write_rows()
+        if self.active is not None:
+            source, version = self.active, self.active.version
+        else:
+            # No active version in the backup: continue from the newest one
+            source = self.latest
+            version = self.latest.version + 1 if self.latest else 1
+        active_content = StoryContent(
+            project_id=self.project.id,
+            version=version,
+            is_active=True,
+            content_type=source.content_type if source else "markdown",
+            auto_saved=source.auto_saved if self.active else False,
+            save_reason=source.save_reason if self.active else "backup_import",
+            created_at=(source.created_at if self.active else None) or datetime.utcnow(),
+            updated_at=source.updated_at if self.active else None,
+        )
+        text = (source.content if source else None) or ""
+        set_content(active_content, text)
+        self.project.word_count = active_content.word_count
+        self.db.add(active_content)
+        self.db.add(self.project)
+        self.db.flush()
+
+
+def import_backup(fileobj: BinaryIO, user_id: int) -> Iterator[dict]:
+    """Import a backup for ``user_id``, yielding a progress record per project.
+
+    A failure rolls back only the projects written since the last commit; the
+    final ``complete`` or ``error`` record says how many were kept. Progress
+    records are held back until their projects are committed, so a client
+    reading slowly never keeps the write transaction open.
+    """
+    projects_imported = versions_imported = 0
+    uncommitted_projects = uncommitted_versions = 0
+    current: Optional[_ProjectImport] = None
+    progress: List[dict] = []
+
+    with Session(engine) as db:
+        def commit() -> None:
+            nonlocal projects_imported, versions_imported, uncommitted_projects, uncommitted_versions
+            db.commit()
+            projects_imported += uncommitted_projects
+            versions_imported += uncommitted_versions
+            uncommitted_projects = uncommitted_versions = 0
+
+        def finish_project() -> bool:
+            """Write out the current project; True if that committed the batch."""
+            nonlocal uncommitted_projects, uncommitted_versions
+            current.finish()
+            uncommitted_projects += 1
+            uncommitted_versions += current.version_count
+            progress.append({
+                "type": "progress",
+                "project_id": current.project.id,
+                "title": current.project.title,
+                "versions": current.version_count,
+                "projects_processed": projects_imported + uncommitted_projects,
+            })
+            if uncommitted_versions >= IMPORT_COMMIT_ROWS:
+                commit()
+                return True
+            return False
+
+        try:
+            for record in read_backup_records(fileobj):
+                kind = record.get("type")
+                if kind == "backup":
+                    if record.get("format_version", BACKUP_FORMAT_VERSION) > BACKUP_FORMAT_VERSION:
+                        raise BackupFormatError("Backup was written by a newer version of the app")
+                elif kind == "project":
+                    if current is not None and finish_project():
+                        yield from progress
+                        progress.clear()
+                    project = Project(
+                        **BackupProject.model_validate(record).model_dump(exclude_none=True),
+                        user_id=user_id,
+                    )
+                    db.add(project)
+                    db.flush()
+                    current = _ProjectImport(db, project)
+                elif kind == "content_version":
+                    if current is None:
+                        raise BackupFormatError("Content version found before any project")
+                    current.add(BackupContentVersion.model_validate(record))
+                else:
+                    raise BackupFormatError(f"Unknown record type {kind!r}")
+            if current is not None:
+                finish_project()
+            commit()
+        except (BackupFormatError, ValidationError) as e:
+            db.rollback()
+            yield {"type": "error", "detail": str(e),
+                   "projects_imported": projects_imported, "versions_imported": versions_imported}
+            return
+        except Exception:
+            db.rollback()
+            logger.exception("Backup import failed for user %s", user_id)
+            yield {"type": "error", "detail": "Import failed",
+                   "projects_imported": projects_imported, "versions_imported": versions_imported}
+            return
+
+    yield from progress
+    yield {
+        "type": "complete",
+        "projects_imported": projects_imported,
+        "versions_imported": versions_imported,
+    }
@@ -0,0 +1,63 @@
+# backend/app/core/compression.py
+"""Transparent compression for stored manuscript text.
+
+Text shorter than ``CONTENT_COMPRESSION_THRESHOLD`` bytes, or that does not
+shrink, is stored as plain TEXT. Anything else is stored as a BLOB whose first
+byte names the codec, so rows written with different codecs can coexist and
+the codec can be changed at any time. Reads decompress based on that marker.
+Long texts are (de)compressed in the threadpool under ``ASYNC_DATABASE``,
+since binding and loading run on the event loop there.
+"""
+import lzma
+import zlib
+from typing import Optional, Union
+
+from sqlalchemy.types import String, TypeDecorator
+
+from .concurrency import run_cpu_bound
+from .config import settings
+
+CODECS = {
+    "zlib": (b"Z", lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (b"X", lzma.compress, lzma.decompress),
+}
+_DECOMPRESSORS = {marker: decompress for marker, _, decompress in CODECS.values()}
+
+
+def compress_text(text: str) -> Union[str, bytes]:
+    data = text.encode("utf-8")
+    if len(data) < settings.CONTENT_COMPRESSION_THRESHOLD:
+        return text
+    marker, compress, _ = CODECS[settings.CONTENT_COMPRESSION_CODEC]
+    packed = marker + compress(data)
+    return packed if len(packed) < len(data) else text
+
+
+def decompress_text(value: Union[str, bytes]) -> str:
+    if isinstance(value, str):
+        return value
+    marker, payload = value[:1], value[1:]
+    try:
+        decompress = _DECOMPRESSORS[marker]
+    except KeyError:
+        raise ValueError(f"Unknown compression marker {marker!r}") from None
+    return decompress(payload).decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """String column that compresses large values on write and inflates them on read.
+
+    The columns predate compression and were created as VARCHAR, which SQLite
+    stores like TEXT; the impl matches so autogenerate sees no change. SQL
+    functions see the compressed BLOB, so anything that needs the text
+    (search indexing, backfills) must read it through this type.
+    """
+
+    impl = String
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[Union[str, bytes]]:
+        return None if value is None else run_cpu_bound(compress_text, value)
+
+    def process_result_value(self, value: Optional[Union[str, bytes]], dialect) -> Optional[str]:
+        return None if value is None else run_cpu_bound(decompress_text, value)
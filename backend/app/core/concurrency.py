@@ -0,0 +1,38 @@
+# backend/app/core/concurrency.py
+"""Keeping slow sync work off the event loop.
+
+With ``ASYNC_DATABASE`` enabled, sync handler bodies run on the event loop
+in a greenlet, through ``AsyncSession.run_sync``, instead of in a threadpool
+thread. Anything slow they do, from waiting on a lock to hashing a whole
+manuscript, then stalls every other request. ``run_blocking`` hands such a
+call to the threadpool there and makes a plain call everywhere else.
+``run_cpu_bound`` does the same for work on a text, but only for texts long
+enough that the hand-off is cheaper than the work.
+"""
+from typing import Any, Callable, Sized, TypeVar
+
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+
+T = TypeVar("T")
+
+
+def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call lock-taking sync code from inside a handler body.
+
+    Under ``AsyncSession.run_sync`` the body runs on the event loop, where
+    waiting on a lock held by another request's session would stall that
+    session too; there the call is handed to the threadpool and awaited.
+    """
+    if in_greenlet():
+        return await_only(run_in_threadpool(fn, *args, **kwargs))
+    return fn(*args, **kwargs)
+
+
+def run_cpu_bound(fn: Callable[..., T], text: Sized, *args: Any) -> T:
+    """Call ``fn(text, *args)``, in the threadpool when ``text`` is long enough to stall the event loop."""
+    if len(text) >= settings.CPU_OFFLOAD_MIN_CHARS:
+        return run_blocking(fn, text, *args)
+    return fn(text, *args)
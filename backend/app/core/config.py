@@ -12,6 +12,53 @@ class Settings:
     DATABASE_URL: str = config("DATABASE_URL", default=str(DATABASE_URL))
     SECRET_KEY: str = config("SECRET_KEY", default="5!pc^6CRTb^kcfV%")
     CORS_ORIGINS: str = config("CORS_ORIGINS", default="http://localhost:5173")
+    DATABASE_READ_POOL_SIZE: int = config("DATABASE_READ_POOL_SIZE", default=5, cast=int)
+    DATABASE_POOL_TIMEOUT: float = config("DATABASE_POOL_TIMEOUT", default=30.0, cast=float)
+    SQLITE_JOURNAL_MODE: str = config("SQLITE_JOURNAL_MODE", default="WAL")
+    SQLITE_SYNCHRONOUS: str = config("SQLITE_SYNCHRONOUS", default="NORMAL")
+    SQLITE_MMAP_SIZE: int = config("SQLITE_MMAP_SIZE", default=256 * 1024 * 1024, cast=int)
+    # Negative values are KiB, positive values are pages
+    SQLITE_CACHE_SIZE: int = config("SQLITE_CACHE_SIZE", default=-64 * 1024, cast=int)
+    SQLITE_BUSY_TIMEOUT: int = config("SQLITE_BUSY_TIMEOUT", default=5000, cast=int)  # milliseconds
+    # Serve requests from an aiosqlite engine instead of the threadpool
+    ASYNC_DATABASE: bool = config("ASYNC_DATABASE", default=False, cast=bool)
+    AUTOSAVE_FLUSH_INTERVAL: float = config("AUTOSAVE_FLUSH_INTERVAL", default=2.0, cast=float)
+    AUTOSAVE_MAX_PENDING: int = config("AUTOSAVE_MAX_PENDING", default=100, cast=int)
+    AUTOSAVE_MAX_PENDING_BYTES: int = config("AUTOSAVE_MAX_PENDING_BYTES", default=8 * 1024 * 1024, cast=int)
+    AUTOSAVE_MAX_ATTEMPTS: int = config("AUTOSAVE_MAX_ATTEMPTS", default=5, cast=int)
+    AUTH_CACHE_SIZE: int = config("AUTH_CACHE_SIZE", default=1024, cast=int)
+    AUTH_CACHE_TTL: float = config("AUTH_CACHE_TTL", default=60.0, cast=float)
+    BCRYPT_ROUNDS: int = config("BCRYPT_ROUNDS", default=12, cast=int)
+    PASSWORD_HASH_WORKERS: int = config("PASSWORD_HASH_WORKERS", default=2, cast=int)
+    PASSWORD_HASH_QUEUE_SIZE: int = config("PASSWORD_HASH_QUEUE_SIZE", default=32, cast=int)
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = config("PASSWORD_HASH_QUEUE_TIMEOUT", default=10.0, cast=float)
+    # Stored text at least this many bytes long is compressed with the codec
+    CONTENT_COMPRESSION_THRESHOLD: int = config("CONTENT_COMPRESSION_THRESHOLD", default=1024, cast=int)
+    CONTENT_COMPRESSION_CODEC: str = config("CONTENT_COMPRESSION_CODEC", default="zlib")
+    # With ASYNC_DATABASE, hashing, chunking and compressing texts at least this
+    # many characters long runs in the threadpool instead of on the event loop
+    CPU_OFFLOAD_MIN_CHARS: int = config("CPU_OFFLOAD_MIN_CHARS", default=64 * 1024, cast=int)
+    # Statement logging; DEBUG on app.core.query_tracking logs every statement
+    SLOW_QUERY_THRESHOLD_MS: float = config("SLOW_QUERY_THRESHOLD_MS", default=100.0, cast=float)  # 0 disables
+    N_PLUS_ONE_THRESHOLD: int = config("N_PLUS_ONE_THRESHOLD", default=5, cast=int)  # repeats per request
+    REQUEST_QUERY_BUDGET: int = config("REQUEST_QUERY_BUDGET", default=25, cast=int)  # statements per request
+    # prune-progress keeps this many days of hourly writing progress
+    PROGRESS_HOURLY_RETENTION_DAYS: int = config("PROGRESS_HOURLY_RETENTION_DAYS", default=90, cast=int)
+    # Analyses kept by content hash; texts this long or longer go to the process pool
+    TEXT_ANALYTICS_CACHE_SIZE: int = config("TEXT_ANALYTICS_CACHE_SIZE", default=256, cast=int)
+    TEXT_ANALYTICS_POOL_MIN_CHARS: int = config("TEXT_ANALYTICS_POOL_MIN_CHARS", default=100_000, cast=int)
+    TEXT_ANALYTICS_WORKERS: int = config("TEXT_ANALYTICS_WORKERS", default=2, cast=int)
+    TEXT_ANALYTICS_QUEUE_SIZE: int = config("TEXT_ANALYTICS_QUEUE_SIZE", default=8, cast=int)
+    # Version diffs kept by content hashes, and the time a diff may take before it settles for non-minimal hunks
+    DIFF_CACHE_SIZE: int = config("DIFF_CACHE_SIZE", default=128, cast=int)
+    DIFF_TIMEOUT: float = config("DIFF_TIMEOUT", default=2.0, cast=float)
+    IMPORT_MAX_BYTES: int = config("IMPORT_MAX_BYTES", default=512 * 1024 * 1024, cast=int)
+    IMPORT_MAX_ENTRY_BYTES: int = config("IMPORT_MAX_ENTRY_BYTES", default=64 * 1024 * 1024, cast=int)
+    # Responses of these types (prefixes) at least this many bytes long are compressed
+    HTTP_COMPRESSION_MIN_SIZE: int = config("HTTP_COMPRESSION_MIN_SIZE", default=1024, cast=int)
+    HTTP_COMPRESSION_TYPES: str = config(
+        "HTTP_COMPRESSION_TYPES", default="application/json,application/x-ndjson,text/"
+    )
 
 
 settings = Settings()
@@ -0,0 +1,192 @@
+# backend/app/core/content_store.py
+"""Content-addressed chunk storage for archived manuscript versions.
+
+The active StoryContent row keeps its full text in ``content`` so autosaves stay
+cheap. When a version is superseded it is archived: the text is split into
+content-defined chunks, every chunk is stored once in ``ContentChunk`` under its
+SHA-256, and the row keeps only the ordered list of chunk hashes. Snapshots of a
+mostly unchanged manuscript therefore only add the chunks that actually changed.
+
+Chunks are shared by every version that contains them, so they are only
+deleted by a sweep that finds no version referring to them any more.
+"""
+import hashlib
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, select
+
+from .concurrency import run_cpu_bound
+from ..models.content_chunk import ContentChunk
+from ..models.story_content import StoryContent
+
+CHUNK_MIN_SIZE = 2 * 1024
+CHUNK_MAX_SIZE = 16 * 1024
+# Once past the minimum size, roughly one line in eight closes a chunk
+CHUNK_BOUNDARY_MASK = 0x7
+REF_SEPARATOR = ","
+# Keeps IN (...) lists well under SQLite's bound-parameter limit
+LOOKUP_BATCH_SIZE = 500
+# Versions whose refs are read per round trip while sweeping
+SWEEP_BATCH_SIZE = 1000
+
+
+def _sha256(data: str) -> str:
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def chunk_hash(data: str) -> str:
+    return run_cpu_bound(_sha256, data)
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def split_chunks(text: str) -> List[str]:
+    """Split text into chunks whose boundaries depend only on nearby lines.
+
+    A chunk ends after a line whose CRC matches the boundary mask, so an edit
+    only changes the chunks around it and the rest still deduplicate.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in text.splitlines(keepends=True):
+        for start in range(0, len(line), CHUNK_MAX_SIZE):
+            piece = line[start:start + CHUNK_MAX_SIZE]
+            if current and size + len(piece) > CHUNK_MAX_SIZE:
+                chunks.append("".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece)
+            if size >= CHUNK_MIN_SIZE and not zlib.crc32(piece.encode("utf-8")) & CHUNK_BOUNDARY_MASK:
+                chunks.append("".join(current))
+                current, size = [], 0
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _batches(items: List[str]) -> Iterable[List[str]]:
+    for start in range(0, len(items), LOOKUP_BATCH_SIZE):
+        yield items[start:start + LOOKUP_BATCH_SIZE]
+
+
+def _hashed_chunks(text: str) -> Tuple[List[str], Dict[str, str]]:
+    """The hashes of ``text``'s chunks in order, and each distinct chunk by hash."""
+    chunks = split_chunks(text)
+    hashes = [_sha256(chunk) for chunk in chunks]
+    return hashes, dict(zip(hashes, chunks))
+
+
+def store_text(db: Session, text: str) -> str:
+    """Store the chunks of ``text`` that are not stored yet and return its refs."""
+    hashes, unique = run_cpu_bound(_hashed_chunks, text)
+    missing = set(unique)
+    for batch in _batches(list(unique)):
+        missing.difference_update(
+            db.exec(select(ContentChunk.hash).where(ContentChunk.hash.in_(batch))).all()
+        )
+    if missing:
+        db.exec(
+            insert(ContentChunk).on_conflict_do_nothing(index_elements=["hash"]),
+            params=[{"hash": h, "data": unique[h], "size": len(unique[h])} for h in missing],
+        )
+    return REF_SEPARATOR.join(hashes)
+
+
+def _split_refs(chunk_refs: str) -> List[str]:
+    return chunk_refs.split(REF_SEPARATOR) if chunk_refs else []
+
+
+def load_chunks(db: Session, hashes: Iterable[str]) -> Dict[str, str]:
+    wanted = list(set(hashes))
+    found: Dict[str, str] = {}
+    for batch in _batches(wanted):
+        found.update(
+            db.exec(select(ContentChunk.hash, ContentChunk.data).where(ContentChunk.hash.in_(batch))).all()
+        )
+    if len(found) != len(wanted):
+        raise LookupError("Story content references missing chunks")
+    return found
+
+
+def read_texts(db: Session, rows: Iterable[StoryContent]) -> Dict[int, Optional[str]]:
+    """Return the full text of each row keyed by id, loading shared chunks once."""
+    rows = list(rows)
+    refs = {row.id: _split_refs(row.chunk_refs) for row in rows if row.chunk_refs is not None}
+    chunks = load_chunks(db, (h for hashes in refs.values() for h in hashes)) if refs else {}
+    return {
+        row.id: "".join(chunks[h] for h in refs[row.id]) if row.id in refs else row.content
+        for row in rows
+    }
+
+
+def read_text(db: Session, row: StoryContent) -> Optional[str]:
+    return read_texts(db, [row])[row.id]
+
+
+def set_content(row: StoryContent, text: Optional[str], word_count: Optional[int] = None) -> None:
+    """Replace a row's text, keeping its hash and counts in step with it.
+
+    Callers that already know the new word count, such as a patch that
+    counted only the words it touched, pass it to skip counting the text.
+    """
+    row.content = text
+    if text is None:
+        row.content_hash = row.char_count = row.word_count = None
+    else:
+        row.content_hash = chunk_hash(text)
+        row.char_count = len(text)
+        row.word_count = run_cpu_bound(count_words, text) if word_count is None else word_count
+
+
+def has_content(row: StoryContent, text: str) -> bool:
+    """Whether the row already stores ``text``, judged by hash without reading it."""
+    return row.content_hash is not None and row.content_hash == chunk_hash(text)
+
+
+def archive_version(db: Session, row: StoryContent) -> None:
+    """Move a superseded version's text into the chunk store."""
+    if row.chunk_refs is not None or row.content is None:
+        return
+    row.chunk_refs = store_text(db, row.content)
+    row.content = None
+    db.add(row)
+
+
+def chunk_refs_of(db: Session, project_id: int) -> Set[str]:
+    """Hashes of the chunks a project's archived versions refer to."""
+    refs = db.exec(
+        select(StoryContent.chunk_refs).where(
+            (StoryContent.project_id == project_id) & (StoryContent.chunk_refs != None)
+        )
+    )
+    return {h for chunk_refs in refs for h in _split_refs(chunk_refs)}
+
+
+def sweep_chunks(db: Session, candidates: Optional[Iterable[str]] = None) -> int:
+    """Delete stored chunks that no version refers to, out of ``candidates`` or all of them.
+
+    Every archived version's refs are read, so call it inside a write
+    transaction: a save reusing a chunk meanwhile would otherwise be left
+    pointing at a deleted one. Returns how many chunks were deleted.
+    """
+    unused = set(db.exec(select(ContentChunk.hash)).all() if candidates is None else candidates)
+    if unused:
+        refs = db.exec(
+            select(StoryContent.chunk_refs)
+            .where(StoryContent.chunk_refs != None)
+            .execution_options(yield_per=SWEEP_BATCH_SIZE)
+        )
+        for chunk_refs in refs:
+            unused.difference_update(_split_refs(chunk_refs))
+            if not unused:
+                break
+    for batch in _batches(list(unused)):
+        db.exec(delete(ContentChunk).where(ContentChunk.hash.in_(batch)))
+    return len(unused)
+
@@ -1,15 +1,109 @@
 # backend/app/core/database.py
 
+from typing import Any, Callable, TypeVar, Union
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
 from app.core.config import settings
-from sqlmodel import create_engine
+from app.core.search_index import create_search_index
+from app.core.sqlite_profile import AsyncWriterPool, WriterPool, configure_sqlite_engine
+# Register the after_flush hooks that keep dashboard aggregates and progress history current
+import app.core.progress  # noqa: F401
+import app.core.user_stats  # noqa: F401
+
+T = TypeVar("T")
 
 DATABASE_URL = settings.DATABASE_URL
-engine = create_engine(DATABASE_URL, echo=True)
+
+def async_database_url(url: str) -> str:
+    """Point a sync SQLite URL at the aiosqlite driver."""
+    parsed = make_url(url)
+    if parsed.drivername == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+def is_file_database(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+# One writer connection serialises mutations; a pool of query_only readers
+# serves GET routes alongside it under WAL. In-memory databases can't be
+# shared between connections, so they keep a single default engine.
+SPLIT_READ_WRITE = is_file_database(DATABASE_URL)
+
+def _engine_options(read_only: bool, pool_class) -> dict:
+    if not SPLIT_READ_WRITE:
+        return {}
+    if read_only:
+        return {
+            "poolclass": pool_class,
+            "pool_size": settings.DATABASE_READ_POOL_SIZE,
+            "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        }
+    return {
+        "poolclass": pool_class,
+        "pool_size": 1,
+        "max_overflow": 0,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+    }
+
+engine = create_engine(DATABASE_URL, **_engine_options(False, WriterPool))
+configure_sqlite_engine(engine)
+if SPLIT_READ_WRITE:
+    read_engine = create_engine(DATABASE_URL, **_engine_options(True, QueuePool))
+    configure_sqlite_engine(read_engine, read_only=True)
+else:
+    read_engine = engine
+
+# Only built when enabled so the sync path works without aiosqlite installed
+async_engine = async_read_engine = None
+if settings.ASYNC_DATABASE:
+    async_engine = create_async_engine(async_database_url(DATABASE_URL), **_engine_options(False, AsyncWriterPool))
+    configure_sqlite_engine(async_engine.sync_engine)
+    if SPLIT_READ_WRITE:
+        async_read_engine = create_async_engine(async_database_url(DATABASE_URL), **_engine_options(True, AsyncAdaptedQueuePool))
+        configure_sqlite_engine(async_read_engine.sync_engine, read_only=True)
+    else:
+        async_read_engine = async_engine
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        create_search_index(connection)
 
 def get_session():
-    with Session(engine) as session:
+    # Responses are built from the objects as written; reloading them after
+    # commit would open another transaction on the single writer connection
+    # and hold it until the request is torn down
+    with Session(engine, expire_on_commit=False) as session:
         yield session
+
+def get_read_session():
+    """Session on the read-only pool, for routes that never write through it."""
+    with Session(read_engine) as session:
+        yield session
+
+async def get_async_session():
+    # Objects are serialised after the handler returns, outside the greenlet
+    # that can lazy-load them, so they must not expire on commit
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+async def get_async_read_session():
+    async with AsyncSession(async_read_engine, expire_on_commit=False) as session:
+        yield session
+
+async def run_in_session(db: Union[Session, AsyncSession], fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call ``fn(session, *args, **kwargs)`` without blocking the event loop.
+
+    Sync sessions run it in the threadpool; async sessions run it on their
+    sync facade, so the driver I/O is awaited instead of holding a thread.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
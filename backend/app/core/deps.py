@@ -2,9 +2,17 @@
 from fastapi import Depends, HTTPException, status, Request
 from jose import jwt, JWTError
 from app.models.user import User
-from app.core.database import get_session
+from typing import Optional
+from app.core.database import get_async_read_session, get_read_session
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.security import SECRET_KEY, ALGORITHM
+from app.core.user_cache import (
+    cache_token_subject,
+    cache_user,
+    get_cached_token_subject,
+    get_cached_user,
+)
 
 def get_token_from_header(request: Request):
     auth: str = request.headers.get("Authorization")
@@ -12,20 +20,53 @@ def get_token_from_header(request: Request):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     return auth[7:]
 
-def get_current_user(token: str = Depends(get_token_from_header), db: Session = Depends(get_session)):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError as e:
-        raise credentials_exception from e
-    user = db.exec(select(User).where(User.id == int(user_id))).first()
-    if user is None:
-        raise credentials_exception
+
+def _token_subject(token: str) -> int:
+    user_id = get_cached_token_subject(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            subject: str = payload.get("sub")
+            if subject is None:
+                raise _credentials_exception()
+            user_id = int(subject)
+        except (JWTError, ValueError) as e:
+            raise _credentials_exception() from e
+        cache_token_subject(token, user_id, payload.get("exp"))
+    return user_id
+
+def _active_user(user: Optional[User]) -> User:
+    if user is None or not user.is_active:
+        raise _credentials_exception()
     return user
+
+def get_current_user(token: str = Depends(get_token_from_header), db: Session = Depends(get_read_session)):
+    user_id = _token_subject(token)
+    user = get_cached_user(user_id)
+    if user is None:
+        user = db.exec(select(User).where(User.id == user_id)).first()
+        if user is not None:
+            # Detached like a cached user, so writer sessions can take it
+            db.expunge(user)
+            cache_user(user)
+    return _active_user(user)
+
+async def get_current_user_async(
+    token: str = Depends(get_token_from_header),
+    db: AsyncSession = Depends(get_async_read_session),
+):
+    """``get_current_user`` for the async engine; replaces it when ASYNC_DATABASE is on."""
+    user_id = _token_subject(token)
+    user = get_cached_user(user_id)
+    if user is None:
+        user = (await db.exec(select(User).where(User.id == user_id))).first()
+        if user is not None:
+            db.expunge(user)
+            cache_user(user)
+    return _active_user(user)
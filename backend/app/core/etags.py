@@ -0,0 +1,91 @@
+# backend/app/core/etags.py
+"""Entity tags and conditional request checks.
+
+Manuscript ETags come from the stored ``content_hash`` and the version number,
+so they can be computed without reading or re-hashing the text.
+
+A gzip or zstd encoded response is a different representation, so the
+compression middleware adds the coding to its ETag (see ``coded_etag``). The
+conditional checks below drop that suffix before comparing, so a tag taken
+from either form still names the same stored entity.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import HTTPException, Response
+
+from .content_store import chunk_hash
+from ..models.story_content import StoryContent
+
+# Responses depend on the caller's token; browsers must revalidate them
+CACHE_CONTROL = "private, no-cache"
+# Content codings whose responses carry a suffixed ETag
+CODINGS = ("gzip", "zstd")
+
+
+def content_etag(version: int, content_hash: str) -> str:
+    return f'"{version}-{content_hash}"'
+
+
+def story_content_etag(content: StoryContent) -> str:
+    return content_etag(content.version, content.content_hash or chunk_hash(content.content or ""))
+
+
+def segment_etag(segment) -> str:
+    return f'"s{segment.id}-{segment.content_hash}"'
+
+
+def representation_etag(*parts: str) -> str:
+    """ETag for a small representation, from the parts that determine it."""
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def coded_etag(etag: str, coding: str) -> str:
+    """The ETag of a representation sent with ``Content-Encoding: coding``."""
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{coding}"'
+
+
+def _uncoded(tag: str) -> str:
+    for coding in CODINGS:
+        suffix = f'-{coding}"'
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)] + '"'
+    return tag
+
+
+def _listed_tags(header: str):
+    return [_uncoded(tag.strip()) for tag in header.split(",") if tag.strip()]
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """True when the client's copy is current (weak comparison, RFC 9110)."""
+    if not header:
+        return False
+    tags = _listed_tags(header)
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+
+def check_if_match(header: Optional[str], etag: Optional[str]) -> None:
+    """Raise 412 unless the current entity matches If-Match (strong comparison)."""
+    if header is None:
+        return
+    tags = _listed_tags(header)
+    if etag is not None and ("*" in tags or etag in tags):
+        return
+    raise HTTPException(
+        status_code=412,
+        detail="Content has changed since it was loaded",
+        headers={"ETag": etag} if etag else None,
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
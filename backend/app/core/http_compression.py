@@ -0,0 +1,270 @@
+# backend/app/core/http_compression.py
+"""ASGI middleware compressing responses and inflating compressed request bodies.
+
+Responses whose type is on the allow-list are compressed with zstd when the
+client accepts it and the ``zstandard`` package is installed, otherwise with
+gzip. Bodies known to be smaller than the threshold are sent as they are.
+Streamed responses are compressed as they stream, flushed after every piece
+so progress records still arrive promptly.
+
+Request bodies sent with ``Content-Encoding: gzip`` (or zstd) are inflated
+in the threadpool into a spooled temporary file, which is then replayed to the
+route in pieces. More than ``max_request_bytes`` of output is refused with
+413, so a small compressed body cannot expand without bound.
+
+An encoded response is a different representation from the identity one, so
+its ETag gets the coding as a suffix (``"…-gzip"``). The conditional checks in
+``etags`` strip that suffix, so If-Match and If-None-Match accept either form.
+"""
+import io
+import tempfile
+import zlib
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .etags import coded_etag
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+# Bodies are inflated, and replayed, in pieces of this size so the limit is checked as it grows
+INFLATE_STEP = 64 * 1024
+# Inflated bodies larger than this are spooled to disk
+INFLATE_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+class _Encoder:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.compress(data)
+        if final:
+            return out + self._compressor.flush()
+        if self.encoding == "zstd":
+            return out + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def _inflated_pieces(encoding: str, body: bytes) -> Iterator[bytes]:
+    if encoding == "zstd":
+        # decompressobj() has no output bound, so a small frame could expand
+        # without limit in one call; a stream reader's reads are bounded
+        reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(body))
+        while piece := reader.read(INFLATE_STEP):
+            yield piece
+        return
+
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    pending = body
+    while pending:
+        yield decompressor.decompress(pending, INFLATE_STEP)
+        pending = decompressor.unconsumed_tail
+    if not decompressor.eof:
+        raise zlib.error("truncated gzip body")
+
+
+def _inflate(encoding: str, body: bytes, limit: int) -> Optional[BinaryIO]:
+    """Decompress a request body into a file, or return None once it grows past ``limit``."""
+    inflated = tempfile.SpooledTemporaryFile(max_size=INFLATE_SPOOL_BYTES)
+    try:
+        size = 0
+        for piece in _inflated_pieces(encoding, body):
+            size += len(piece)
+            if size > limit:
+                inflated.close()
+                return None
+            inflated.write(piece)
+    except BaseException:
+        inflated.close()
+        raise
+    inflated.seek(0)
+    return inflated
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        content_types: Tuple[str, ...],
+        max_request_bytes: int,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = content_types
+        self.max_request_bytes = max_request_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+
+        request_encoding = headers.get("content-encoding", "").strip().lower()
+        if not request_encoding or request_encoding == "identity":
+            await self._respond(scope, receive, send, headers)
+            return
+        if request_encoding not in self.request_encodings():
+            await PlainTextResponse("Unsupported Content-Encoding", status_code=415)(scope, receive, send)
+            return
+        body = await self._read_body(receive)
+        try:
+            inflated = None if body is None else await run_in_threadpool(
+                _inflate, request_encoding, body, self.max_request_bytes
+            )
+        except (zlib.error, ValueError, getattr(zstandard, "ZstdError", ValueError)):
+            await PlainTextResponse("Malformed compressed body", status_code=400)(scope, receive, send)
+            return
+        if inflated is None:
+            await PlainTextResponse("Request body is too large", status_code=413)(scope, receive, send)
+            return
+        with inflated:
+            length = inflated.seek(0, io.SEEK_END)
+            inflated.seek(0)
+            await self._respond(self._inflated_scope(scope, length), self._replay(inflated), send, headers)
+
+    async def _respond(self, scope: Scope, receive: Receive, send: Send, headers: Headers) -> None:
+        encoding = self.response_encoding(headers.get("accept-encoding", ""))
+        if encoding is None or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        await _CompressingResponder(self, encoding, send).run(scope, receive)
+
+    @staticmethod
+    def request_encodings() -> Tuple[str, ...]:
+        return ("gzip", "zstd") if zstandard else ("gzip",)
+
+    @staticmethod
+    def response_encoding(accept_encoding: str) -> Optional[str]:
+        accepted = {}
+        for item in accept_encoding.split(","):
+            name, _, params = item.strip().partition(";")
+            quality = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            if name:
+                accepted[name.strip().lower()] = quality
+        if zstandard and accepted.get("zstd", 0) > 0:
+            return "zstd"
+        if accepted.get("gzip", 0) > 0:
+            return "gzip"
+        return None
+
+    async def _read_body(self, receive: Receive) -> Optional[bytes]:
+        # Compressed bodies are never larger than what they inflate to
+        chunks: List[bytes] = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_request_bytes:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    def _inflated_scope(scope: Scope, length: int) -> Scope:
+        scope = dict(scope)
+        headers = MutableHeaders(scope=scope)
+        del headers["content-encoding"]
+        headers["content-length"] = str(length)
+        return scope
+
+    @staticmethod
+    def _replay(body: BinaryIO) -> Receive:
+        done = False
+
+        async def receive() -> Message:
+            nonlocal done
+            if done:
+                return {"type": "http.disconnect"}
+            # The spooled file may have rolled over to disk
+            piece = await run_in_threadpool(body.read, INFLATE_STEP)
+            done = len(piece) < INFLATE_STEP
+            return {"type": "http.request", "body": piece, "more_body": not done}
+
+        return receive
+
+    def compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return any(content_type.startswith(allowed) for allowed in self.content_types)
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                message["status"] < 200
+                or message["status"] in (204, 304)
+                or not self.middleware.compressible(headers)
+            )
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                await self.send(self.start)
+                await self.send(message)
+                self.passthrough = True
+                return
+            self.encoder = _Encoder(self.encoding)
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "etag" in headers:
+                headers["ETag"] = coded_etag(headers["etag"], self.encoding)
+            del headers["content-length"]
+            if not more_body:
+                compressed = self.encoder.compress(body, final=True)
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send(self.start)
+        await self.send({
+            "type": "http.response.body",
+            "body": self.encoder.compress(body, final=not more_body),
+            "more_body": more_body,
+        })
@@ -0,0 +1,31 @@
+# backend/app/core/new_projects.py
+"""Which projects the current transaction inserted.
+
+A backup import inserts each project before it has read the project's text,
+and sets the word count in a later flush of the same transaction. The
+``after_flush`` hooks ask ``is_new_project`` to tell that first count from
+words written; it moves totals but not the day's writing.
+"""
+from sqlalchemy import event
+from sqlmodel import Session
+
+from ..models.project import Project
+
+_INFO_KEY = "new_project_ids"
+
+
+@event.listens_for(Session, "after_flush")
+def _remember_new_projects(session: Session, flush_context) -> None:
+    new_ids = {obj.id for obj in session.new if isinstance(obj, Project)}
+    if new_ids:
+        session.info.setdefault(_INFO_KEY, set()).update(new_ids)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_new_projects(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_INFO_KEY, None)
+
+
+def is_new_project(session: Session, project: Project) -> bool:
+    return project.id in session.info.get(_INFO_KEY, ())
@@ -0,0 +1,154 @@
+# backend/app/core/progress.py
+"""Writing-progress time series, pre-aggregated per hour and per day.
+
+An ``after_flush`` hook records every change to an existing project's word
+count into two ``WritingProgress`` buckets, the hour and the day it happened
+in (UTC), in the same transaction as the change. An imported project's first
+count is not a change. The daily rows are the rollup of the hourly ones;
+weeks and months are summed from days when read.
+Hourly rows older than ``PROGRESS_HOURLY_RETENTION_DAYS`` can be pruned with
+``python -m app.cli prune-progress``; the daily rows are kept.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, event, inspect
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Connection
+from sqlmodel import Session
+
+from .new_projects import is_new_project
+from .queries import select_progress_buckets, select_writing_days
+from ..models.project import Project
+from ..models.writing_progress import WritingProgress
+
+progress = WritingProgress.__table__
+HOUR = "hour"
+DAY = "day"
+# Read intervals; weeks start on Monday
+INTERVALS = (HOUR, DAY, "week", "month")
+# Days covered when a request gives no start, and the most one may ask for
+DEFAULT_RANGE_DAYS = {HOUR: 2, DAY: 30, "week": 182, "month": 365}
+MAX_RANGE_DAYS = {HOUR: 31, DAY: 3660, "week": 3660, "month": 3660}
+
+# (project_id, word-count change, word count afterwards, when)
+Change = Tuple[int, int, int, datetime]
+
+
+def bucket_start(when: datetime, resolution: str) -> datetime:
+    when = when.replace(minute=0, second=0, microsecond=0)
+    return when.replace(hour=0) if resolution == DAY else when
+
+
+def _bucket_rows(changes: Iterable[Change]) -> List[dict]:
+    rows: Dict[Tuple[int, str, datetime], dict] = {}
+    for project_id, change, word_count, when in changes:
+        for resolution in (HOUR, DAY):
+            key = (project_id, resolution, bucket_start(when, resolution))
+            row = rows.setdefault(key, {
+                "project_id": project_id, "resolution": resolution, "bucket": key[2],
+                "words_added": 0, "words_removed": 0, "word_count": word_count, "changes": 0,
+            })
+            row["words_added"] += max(change, 0)
+            row["words_removed"] += max(-change, 0)
+            row["word_count"] = word_count
+            row["changes"] += 1
+    return list(rows.values())
+
+
+def record_progress(connection: Connection, changes: Iterable[Change]) -> None:
+    """Add word-count changes to their hourly and daily buckets."""
+    rows = _bucket_rows(changes)
+    if not rows:
+        return
+    statement = insert(progress)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[progress.c.project_id, progress.c.resolution, progress.c.bucket],
+            set_={
+                "words_added": progress.c.words_added + statement.excluded.words_added,
+                "words_removed": progress.c.words_removed + statement.excluded.words_removed,
+                "word_count": statement.excluded.word_count,
+                "changes": progress.c.changes + statement.excluded.changes,
+            },
+        ),
+        rows,
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _record_word_count_changes(session: Session, flush_context) -> None:
+    now = datetime.utcnow()
+    changes = []
+    for obj in session.dirty:
+        if not isinstance(obj, Project):
+            continue
+        # An imported project's first count is not writing
+        if is_new_project(session, obj):
+            continue
+        history = inspect(obj).attrs.word_count.history
+        # Without the old value there is no delta to record
+        if history.has_changes() and history.deleted:
+            word_count = obj.word_count or 0
+            changes.append((obj.id, word_count - (history.deleted[0] or 0), word_count, now))
+    if changes:
+        record_progress(session.connection(), changes)
+
+
+def prune_hourly_progress(connection: Connection, before: datetime) -> int:
+    """Delete hourly buckets that start before ``before``; returns how many."""
+    result = connection.execute(
+        delete(progress).where((progress.c.resolution == HOUR) & (progress.c.bucket < before))
+    )
+    return result.rowcount
+
+
+def progress_range(db: Session, project_id: int, resolution: str, start: datetime, end: datetime):
+    """Buckets of one resolution with start <= bucket < end, oldest first."""
+    return db.exec(select_progress_buckets(project_id, resolution, start, end)).all()
+
+
+def writing_days(db: Session, project_id: int, end: datetime) -> List[date]:
+    """Days before ``end`` on which words were added, oldest first."""
+    return [bucket.date() for bucket in db.exec(select_writing_days(project_id, end)).all()]
+
+
+def interval_start(bucket: datetime, interval: str) -> datetime:
+    if interval == "week":
+        return bucket - timedelta(days=bucket.weekday())
+    if interval == "month":
+        return bucket.replace(day=1)
+    return bucket
+
+
+def rollup(rows: Sequence[WritingProgress], interval: str) -> List[dict]:
+    """Sum buckets into points of ``interval``; each keeps its last word count."""
+    points: Dict[datetime, dict] = {}
+    for row in rows:
+        start = interval_start(row.bucket, interval)
+        point = points.setdefault(start, {
+            "start": start, "words_added": 0, "words_removed": 0, "word_count": row.word_count, "changes": 0,
+        })
+        point["words_added"] += row.words_added
+        point["words_removed"] += row.words_removed
+        point["word_count"] = row.word_count
+        point["changes"] += row.changes
+    for point in points.values():
+        point["net_words"] = point["words_added"] - point["words_removed"]
+    return list(points.values())
+
+
+def streaks(days: Sequence[date], today: date) -> Tuple[int, int]:
+    """The current and the longest run of consecutive writing days.
+
+    The current run still counts on a day with no writing yet if it reached
+    yesterday.
+    """
+    longest = run = 0
+    previous: Optional[date] = None
+    for day in days:
+        run = run + 1 if previous is not None and (day - previous).days == 1 else 1
+        longest = max(longest, run)
+        previous = day
+    current = run if previous is not None and (today - previous).days <= 1 else 0
+    return current, longest
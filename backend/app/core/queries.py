@@ -0,0 +1,173 @@
+# backend/app/core/queries.py
+"""Statement builders for the hot lookups.
+
+Routes and core modules build these statements here rather than inline, and
+each builder is registered with ``hot_query`` along with sample arguments, so
+``app.core.query_plans`` explains exactly the statements that run on the hot
+paths.
+"""
+from datetime import datetime
+from typing import Any, Iterable, Optional, Tuple
+
+from sqlalchemy import func, tuple_
+from sqlmodel import select
+
+from .query_plans import hot_query
+from ..models.project import PROJECT_SORT_KEY, Project
+from ..models.segment import Segment
+from ..models.story_content import StoryContent
+from ..models.user import User
+from ..models.user_stats import UserStats
+from ..models.writing_progress import WritingProgress
+
+# Everything StoryContentVersionInfo needs, so listings never read the text
+VERSION_INFO_COLUMNS = (
+    StoryContent.id,
+    StoryContent.project_id,
+    StoryContent.version,
+    StoryContent.content_type,
+    StoryContent.content_hash,
+    StoryContent.char_count,
+    StoryContent.word_count,
+    StoryContent.is_active,
+    StoryContent.auto_saved,
+    StoryContent.save_reason,
+    StoryContent.created_at,
+    StoryContent.updated_at,
+)
+# Columns needed to place segments in outline order without their text
+OUTLINE_COLUMNS = (Segment.id, Segment.parent_id, Segment.position)
+# A segment's metadata, for outlines that leave the text out
+SEGMENT_INFO_COLUMNS = OUTLINE_COLUMNS + (
+    Segment.project_id,
+    Segment.kind,
+    Segment.title,
+    Segment.content_hash,
+    Segment.char_count,
+    Segment.word_count,
+    Segment.created_at,
+    Segment.updated_at,
+)
+
+
+@hot_query("users.by_username", User.username == "writer")
+@hot_query("users.by_email", User.email == "writer@example.com")
+def select_user(*criteria):
+    return select(User).where(*criteria)
+
+
+@hot_query("user_stats.dashboard", 1)
+def select_dashboard_stats(user_id: int):
+    return select(UserStats).where(UserStats.user_id == user_id)
+
+
+@hot_query("projects.owned", 1, 1)
+def select_owned_project(project_id: int, user_id: int):
+    return select(Project).where((Project.id == project_id) & (Project.user_id == user_id))
+
+
+@hot_query("projects.list", 1, offset=20, limit=11)
+@hot_query("projects.list_cursor", 1, after=("2026-01-01 00:00:00", 50), limit=11)
+def select_project_page(
+    user_id: int,
+    *filters,
+    after: Optional[Tuple[Any, int]] = None,
+    offset: int = 0,
+    limit: int,
+):
+    """A page of a user's projects, most recently edited first.
+
+    Pages follow the (sort key, id) pair in ``after`` when given, so deep
+    pages cost no more than the first; otherwise they skip ``offset`` rows.
+    """
+    statement = select(Project).where(Project.user_id == user_id, *filters).order_by(
+        PROJECT_SORT_KEY.desc(), Project.id.desc()
+    )
+    if after is not None:
+        statement = statement.where(tuple_(PROJECT_SORT_KEY, Project.id) < tuple_(*after))
+    else:
+        statement = statement.offset(offset)
+    return statement.limit(limit)
+
+
+@hot_query("projects.count", 1)
+def select_project_count(user_id: int, *filters):
+    return select(func.count()).select_from(Project).where(Project.user_id == user_id, *filters)
+
+
+# The partial index holds only stale projects, so scanning it reads nothing else
+@hot_query("projects.content_stale", Project.id, allowed_scans=("SCAN project USING INDEX ix_project_content_stale",))
+def select_stale_projects(*columns):
+    return select(*(columns or (Project,))).where(Project.content_stale == True)
+
+
+@hot_query("content.active", 1)
+def select_active_content(project_id: int, *columns):
+    return select(*(columns or (StoryContent,))).where(
+        (StoryContent.project_id == project_id) & (StoryContent.is_active == True)
+    )
+
+
+@hot_query("content.active_many", [1, 2, 3])
+def select_active_contents(project_ids: Iterable[int]):
+    return select(StoryContent).where(
+        StoryContent.project_id.in_(list(project_ids)) & (StoryContent.is_active == True)
+    )
+
+
+@hot_query("content.versions", 1)
+def select_version_infos(project_id: int):
+    return select(*VERSION_INFO_COLUMNS).where(
+        StoryContent.project_id == project_id
+    ).order_by(StoryContent.version.desc())
+
+
+@hot_query("content.version", 1, 2)
+def select_content_version(project_id: int, version: int):
+    return select(StoryContent).where(
+        (StoryContent.project_id == project_id) & (StoryContent.version == version)
+    )
+
+
+@hot_query("content.backup_batch", 1, (5, 50), 20)
+def select_version_batch(project_id: int, after: Optional[Tuple[int, int]], limit: int):
+    """Up to ``limit`` versions, newest first, following the (version, id) pair ``after``."""
+    statement = select(StoryContent).where(StoryContent.project_id == project_id)
+    if after is not None:
+        statement = statement.where(tuple_(StoryContent.version, StoryContent.id) < tuple_(*after))
+    return statement.order_by(StoryContent.version.desc(), StoryContent.id.desc()).limit(limit)
+
+
+@hot_query("segments.outline", 1)
+def select_segment_outline(project_id: int):
+    return select(*SEGMENT_INFO_COLUMNS).where(Segment.project_id == project_id)
+
+
+@hot_query("segments.last_sibling", 1, None)
+def select_last_sibling_position(project_id: int, parent_id: Optional[int]):
+    return (
+        select(Segment.position)
+        .where((Segment.project_id == project_id) & (Segment.parent_id == parent_id))
+        .order_by(Segment.position.desc())
+        .limit(1)
+    )
+
+
+@hot_query("progress.range", 1, "day", datetime(2026, 1, 1), datetime(2027, 1, 1))
+def select_progress_buckets(project_id: int, resolution: str, start: datetime, end: datetime):
+    return select(WritingProgress).where(
+        (WritingProgress.project_id == project_id)
+        & (WritingProgress.resolution == resolution)
+        & (WritingProgress.bucket >= start)
+        & (WritingProgress.bucket < end)
+    ).order_by(WritingProgress.bucket)
+
+
+@hot_query("progress.writing_days", 1, datetime(2027, 1, 1))
+def select_writing_days(project_id: int, end: datetime):
+    return select(WritingProgress.bucket).where(
+        (WritingProgress.project_id == project_id)
+        & (WritingProgress.resolution == "day")
+        & (WritingProgress.bucket < end)
+        & (WritingProgress.words_added > 0)
+    ).order_by(WritingProgress.bucket)
@@ -0,0 +1,76 @@
+# backend/app/core/query_plans.py
+"""Query-plan regression guard for the hot lookups.
+
+The statement builders of the hot paths (``app.core.queries``) are
+registered with sample arguments. ``check_query_plans`` runs ``EXPLAIN QUERY
+PLAN`` on each against a live schema and reports any that scan a table or an
+index, unless that exact scan is whitelisted for the query, or that sort in a
+temporary B-tree when their order should come from an index. Run it with
+``python -m app.cli check-query-plans``; it exits non-zero on a regression.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Executable
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    build: Callable[[], Executable]
+    allow_temp_sort: bool = False
+    # Plan lines starting with SCAN that this query is known to need
+    allowed_scans: Tuple[str, ...] = ()
+
+
+hot_queries: Dict[str, HotQuery] = {}
+
+
+def hot_query(
+    name: str,
+    *sample_args: Any,
+    allow_temp_sort: bool = False,
+    allowed_scans: Tuple[str, ...] = (),
+    **sample_kwargs: Any,
+):
+    """Register a statement builder under ``name``, to be explained with the sample arguments."""
+    def register(builder: Callable[..., Executable]) -> Callable[..., Executable]:
+        hot_queries[name] = HotQuery(
+            name, lambda: builder(*sample_args, **sample_kwargs), allow_temp_sort, allowed_scans
+        )
+        return builder
+    return register
+
+
+def explain(connection: Connection, statement: Executable) -> List[str]:
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    positional = tuple(params[name] for name in compiled.positiontup or ())
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled.string}", positional).all()
+    return [row[-1] for row in rows]
+
+
+def plan_problems(plan: List[str], allow_temp_sort: bool = False, allowed_scans: Tuple[str, ...] = ()) -> List[str]:
+    problems = []
+    for detail in plan:
+        # "SCAN t USING [COVERING] INDEX i" still reads the whole index, not
+        # just the rows asked for; only a SEARCH seeks to them
+        if detail.startswith("SCAN ") and detail not in allowed_scans:
+            problems.append(f"scan: {detail}")
+        elif detail.startswith("USE TEMP B-TREE") and not allow_temp_sort:
+            problems.append(f"sort without an index: {detail}")
+    return problems
+
+
+def check_query_plans(connection: Connection) -> Dict[str, List[str]]:
+    """Return the plan problems of every hot query that has any."""
+    failures = {}
+    for query in hot_queries.values():
+        if problems := plan_problems(explain(connection, query.build()), query.allow_temp_sort, query.allowed_scans):
+            failures[query.name] = problems
+    return failures
+
+
+# The builders register themselves on import
+from . import queries  # noqa: E402,F401
@@ -0,0 +1,185 @@
+# backend/app/core/query_tracking.py
+"""Attributes SQL statements to the request that issued them.
+
+``QueryTrackingMiddleware`` opens a ``QueryLog`` for every HTTP request in a
+context variable, which the threadpool and the async session's greenlets both
+inherit. Engine-wide cursor hooks then:
+
+* time every statement and feed the ``db_statement*`` metrics,
+* log statements slower than ``SLOW_QUERY_THRESHOLD_MS`` with their
+  ``EXPLAIN QUERY PLAN``,
+* count identical statements per request and log likely N+1 patterns once
+  one runs ``N_PLUS_ONE_THRESHOLD`` times,
+* log requests that exceed ``REQUEST_QUERY_BUDGET`` statements.
+
+Every statement is also logged at DEBUG level on this module's logger, which
+replaces engine ``echo``. Tests can bound an endpoint with
+``assert_max_queries``.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+from .metrics import db_statement_duration, db_statements, statement_operation
+
+logger = logging.getLogger(__name__)
+
+# Statements that EXPLAIN QUERY PLAN can describe
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+# Issued by the engine rather than the handler; not counted against a request
+TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA")
+
+
+@dataclass
+class QueryLog:
+    """Statements issued on behalf of one request (or one tracked block)."""
+    name: str
+    # The request's scope, which gains the matched route once routing is done
+    scope: Optional[Scope] = field(default=None, repr=False)
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    reported: set = field(default_factory=set)
+
+    @property
+    def label(self) -> str:
+        route = getattr(self.scope.get("route"), "path", None) if self.scope else None
+        return f"{self.scope['method']} {route}" if route else self.name
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+        repeats = self.statements[statement]
+        threshold = settings.N_PLUS_ONE_THRESHOLD
+        if threshold and repeats >= threshold and statement not in self.reported:
+            self.reported.add(statement)
+            logger.warning("Possible N+1 in %s: statement ran %d times: %s", self.label, repeats, statement)
+
+    def repeated(self, minimum: int = 2) -> List[tuple]:
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= minimum]
+
+
+_current_log: ContextVar[Optional[QueryLog]] = ContextVar("query_log", default=None)
+# Blocks inside assert_max_queries also collect logs of requests served meanwhile
+_observers: List[List[QueryLog]] = []
+_observers_lock = threading.Lock()
+
+
+def current_query_log() -> Optional[QueryLog]:
+    return _current_log.get()
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    if statement_operation(statement) not in EXPLAINABLE:
+        return ""
+    if isinstance(parameters, list):
+        parameters = parameters[0] if parameters else ()
+    # A separate cursor, so the original statement's results stay unread
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+        return "; ".join(str(row[-1]) for row in cursor.fetchall())
+    except Exception as e:  # the plan is diagnostic only
+        return f"unavailable ({e})"
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _finish_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    seconds = time.perf_counter() - conn.info["query_started"].pop()
+    operation = statement_operation(statement)
+    db_statements.inc(operation=operation)
+    db_statement_duration.observe(seconds, operation=operation)
+    log = _current_log.get()
+    if log is not None and operation not in TRANSACTION_CONTROL:
+        log.record(statement, seconds)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%.2f ms [%s] %s %r", seconds * 1000, log.label if log else "-", statement, parameters)
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold and seconds * 1000 >= threshold:
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s\n  params: %r\n  plan: %s",
+            seconds * 1000, log.label if log else "background", statement, parameters,
+            _explain(conn, statement, parameters),
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_statement(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def _finish_log(log: QueryLog) -> None:
+    budget = settings.REQUEST_QUERY_BUDGET
+    if budget and log.count > budget:
+        logger.warning(
+            "%s ran %d statements (budget %d) in %.1f ms", log.label, log.count, budget, log.seconds * 1000
+        )
+    with _observers_lock:
+        for observed in _observers:
+            observed.append(log)
+
+
+@contextmanager
+def track_queries(name: str, scope: Optional[Scope] = None) -> Iterator[QueryLog]:
+    """Attribute statements run in this context (and threads it starts) to one log."""
+    log = QueryLog(name, scope)
+    token = _current_log.set(log)
+    try:
+        yield log
+    finally:
+        _current_log.reset(token)
+        _finish_log(log)
+
+
+@contextmanager
+def assert_max_queries(maximum: int) -> Iterator[List[QueryLog]]:
+    """Fail if the block, or any request served while it runs, exceeds ``maximum`` statements.
+
+    Statements run directly in the block count together; each request made
+    through a test client is checked on its own.
+    """
+    observed: List[QueryLog] = []
+    with _observers_lock:
+        _observers.append(observed)
+    try:
+        with track_queries("assert_max_queries") as direct:
+            yield observed
+    finally:
+        with _observers_lock:
+            _observers.remove(observed)
+    for log in [direct] + [log for log in observed if log is not direct]:
+        if log.count > maximum:
+            detail = "\n".join(f"  {n}x {statement}" for statement, n in log.statements.most_common())
+            raise AssertionError(f"{log.label} ran {log.count} statements, expected at most {maximum}:\n{detail}")
+
+
+class QueryTrackingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries(f"{scope['method']} {scope['path']}", scope):
+            await self.app(scope, receive, send)
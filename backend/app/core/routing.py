@@ -0,0 +1,47 @@
+# backend/app/core/routing.py
+"""Route class that lets sync handlers run on either database session.
+
+Handlers stay plain ``def`` functions written against ``Session``. Routes
+built with ``SessionRoute`` wrap every sync handler that depends on
+``get_session`` or ``get_read_session`` in a coroutine that hands the handler
+body to ``run_in_session``. With the sync engine that is the threadpool, as before.
+With ``ASYNC_DATABASE`` enabled, both are overridden to yield an
+``AsyncSession`` and the body runs on its sync facade without a thread.
+"""
+import functools
+import inspect
+from typing import Any, Callable, Optional
+
+from fastapi import params
+from fastapi.routing import APIRoute
+
+from .database import get_read_session, get_session, run_in_session
+
+SESSION_DEPENDENCIES = (get_session, get_read_session)
+
+
+def _session_parameter(endpoint: Callable[..., Any]) -> Optional[str]:
+    for name, parameter in inspect.signature(endpoint).parameters.items():
+        if isinstance(parameter.default, params.Depends) and parameter.default.dependency in SESSION_DEPENDENCIES:
+            return name
+    return None
+
+
+def with_session(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    if inspect.iscoroutinefunction(endpoint):
+        return endpoint
+    session_name = _session_parameter(endpoint)
+    if session_name is None:
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def run_endpoint(**kwargs: Any) -> Any:
+        db = kwargs.pop(session_name)
+        return await run_in_session(db, lambda session: endpoint(**kwargs, **{session_name: session}))
+
+    return run_endpoint
+
+
+class SessionRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, with_session(endpoint), **kwargs)
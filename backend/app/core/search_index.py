@@ -0,0 +1,158 @@
+# backend/app/core/search_index.py
+"""SQLite FTS5 index over project titles, descriptions and active manuscripts.
+
+``project_search`` holds one row per project with ``rowid = project.id``. It is
+kept in step by an ``after_flush`` hook, so every write path that goes through a
+Session (requests, the autosave buffer, imports) updates it in the same
+transaction as the data it indexes.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Integer, column, event, inspect, literal_column, table, text
+from sqlalchemy.engine import Connection
+from sqlmodel import Session, select
+
+from ..models.project import Project
+from ..models.story_content import StoryContent
+
+SEARCH_TABLE = "project_search"
+# bm25 column weights for title, description and content
+BM25_WEIGHTS = (10.0, 4.0, 1.0)
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+SNIPPET_TOKENS = 16
+REBUILD_BATCH_SIZE = 500
+
+project_search = table(SEARCH_TABLE, column("rowid", Integer))
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def create_search_index(connection: Connection) -> None:
+    connection.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "title, description, content, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+
+def rebuild_search_index(connection: Connection) -> None:
+    """Re-index every project from scratch."""
+    connection.exec_driver_sql(f"DELETE FROM {SEARCH_TABLE}")
+    # Content is read through its column type, which decompresses it
+    rows = connection.execute(
+        select(Project.id, Project.title, Project.description, StoryContent.content).outerjoin(
+            StoryContent,
+            (StoryContent.project_id == Project.id) & (StoryContent.is_active == True),
+        )
+    )
+    insert = text(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, title, description, content) "
+        "VALUES (:id, :title, :description, :content)"
+    )
+    for batch in rows.partitions(REBUILD_BATCH_SIZE):
+        connection.execute(insert, [
+            {"id": id, "title": title, "description": description or "", "content": content or ""}
+            for id, title, description, content in batch
+        ])
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word required, the last as a prefix.
+
+    Words are quoted so user input can never be parsed as FTS5 syntax.
+    """
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def match_clause(match_query: str):
+    return literal_column(SEARCH_TABLE).op("MATCH")(match_query)
+
+
+def matching_project_ids(match_query: str):
+    return select(project_search.c.rowid).where(match_clause(match_query))
+
+
+def search_projects(
+    db: Session,
+    user_id: int,
+    match_query: str,
+    limit: int,
+    offset: int,
+) -> Tuple[List[dict], int]:
+    """Return one page of ranked hits for a user plus the total number of hits."""
+    params = {"match": match_query, "user_id": user_id}
+    where = (
+        f"FROM {SEARCH_TABLE} JOIN project ON project.id = {SEARCH_TABLE}.rowid "
+        f"WHERE {SEARCH_TABLE} MATCH :match AND project.user_id = :user_id"
+    )
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    rows = db.exec(
+        text(
+            f"SELECT project.id AS project_id, project.title, project.status, project.genre, "
+            f"bm25({SEARCH_TABLE}, {weights}) AS score, "
+            f"highlight({SEARCH_TABLE}, 0, :open, :close) AS title_highlight, "
+            f"snippet({SEARCH_TABLE}, -1, :open, :close, '…', {SNIPPET_TOKENS}) AS snippet "
+            f"{where} ORDER BY score LIMIT :limit OFFSET :offset"
+        ),
+        params={**params, "open": HIGHLIGHT_OPEN, "close": HIGHLIGHT_CLOSE, "limit": limit, "offset": offset},
+    ).mappings().all()
+    total = db.exec(text(f"SELECT count(*) {where}"), params=params).scalar_one()
+    return [dict(row) for row in rows], total
+
+
+def _index_project(connection: Connection, project: Project) -> None:
+    params = {"id": project.id, "title": project.title, "description": project.description or ""}
+    updated = connection.execute(
+        text(f"UPDATE {SEARCH_TABLE} SET title = :title, description = :description WHERE rowid = :id"),
+        params,
+    )
+    if not updated.rowcount:
+        connection.execute(
+            text(f"INSERT INTO {SEARCH_TABLE} (rowid, title, description, content) VALUES (:id, :title, :description, '')"),
+            params,
+        )
+
+
+def _index_content(connection: Connection, content: StoryContent) -> None:
+    params = {"id": content.project_id, "content": content.content or ""}
+    updated = connection.execute(
+        text(f"UPDATE {SEARCH_TABLE} SET content = :content WHERE rowid = :id"), params
+    )
+    if not updated.rowcount:
+        connection.execute(
+            text(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, title, description, content) "
+                "SELECT id, title, coalesce(description, ''), :content FROM project WHERE id = :id"
+            ),
+            params,
+        )
+
+
+def _changed(obj, *attributes: str) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_index(session: Session, flush_context) -> None:
+    connection = session.connection()
+    for obj in session.new:
+        if isinstance(obj, Project):
+            _index_project(connection, obj)
+    for obj in session.dirty:
+        if isinstance(obj, Project) and _changed(obj, "title", "description"):
+            _index_project(connection, obj)
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, StoryContent) and obj.is_active and (
+            obj in session.new or _changed(obj, "content", "is_active")
+        ):
+            _index_content(connection, obj)
+    for obj in session.deleted:
+        if isinstance(obj, Project):
+            connection.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :id"), {"id": obj.id})
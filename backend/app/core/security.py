@@ -1,14 +1,28 @@
 # backend/app/core/security.py
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from fastapi import HTTPException
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
+from app.core.config import settings
+from app.core.metrics import password_hash_duration, password_hash_rejections
 
 # JWT configuration
 SECRET_KEY = "your-secret"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 24 * 60  # 24 hours
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min and max to the configured cost makes verify_and_update rehash
+# any stored hash whose cost differs, in either direction
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -16,6 +30,50 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+# bcrypt runs in its own small process pool so login bursts neither block the
+# event loop nor take threadpool threads away from the editor endpoints
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_slots: Optional[asyncio.Semaphore] = None
+
+def _get_hash_pool() -> Tuple[ProcessPoolExecutor, asyncio.Semaphore]:
+    global _hash_pool, _hash_slots
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        _hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE)
+    return _hash_pool, _hash_slots
+
+async def _run_in_hash_pool(func, *args):
+    pool, slots = _get_hash_pool()
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError as e:
+        password_hash_rejections.inc()
+        raise HTTPException(status_code=503, detail="Too many authentication requests, try again shortly") from e
+    try:
+        with password_hash_duration.time(operation=func.__name__):
+            return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+    finally:
+        slots.release()
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_pool(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash if its cost is outdated."""
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+def shutdown_hash_pool():
+    global _hash_pool, _hash_slots
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=True, cancel_futures=True)
+        _hash_pool = _hash_slots = None
+
 def create_access_token(subject: str, expires_delta: int = ACCESS_TOKEN_EXPIRE_MINUTES):
     expire = datetime.now(timezone.utc) + timedelta(minutes=expires_delta)
     to_encode = {"exp": expire, "sub": subject}
@@ -0,0 +1,107 @@
+# backend/app/core/segments.py
+"""Chapter and scene segments of a manuscript.
+
+Once a project has segments they are the source of truth for its text: a save
+rewrites one segment and adjusts ``Project.word_count`` by that segment's
+change, so its cost depends on the scene rather than the book. The project's
+active StoryContent is then only a cache, rebuilt by concatenating the
+segments in outline order. Segment writes just set ``Project.content_stale``.
+Every route that reads the single text first flushes the autosave buffer for
+its projects, and only those flushes rebuild a stale manuscript. Searches do
+the same for the user's stale projects.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlmodel import Session, select
+
+from .concurrency import run_cpu_bound
+from .content_store import chunk_hash, count_words, has_content, set_content
+from .queries import (
+    select_active_content,
+    select_last_sibling_position,
+    select_segment_outline,
+    select_stale_projects,
+)
+from ..models.project import Project
+from ..models.segment import Segment
+from ..models.story_content import StoryContent
+
+SEGMENT_KINDS = ("chapter", "scene")
+# Whitespace, so the manuscript's word count is the sum of its segments'
+SEGMENT_SEPARATOR = "\n\n"
+
+
+def set_segment_content(segment: Segment, text: str) -> None:
+    """Replace a segment's text, keeping its hash and counts in step with it."""
+    segment.content = text
+    segment.content_hash = chunk_hash(text)
+    segment.char_count = len(text)
+    segment.word_count = run_cpu_bound(count_words, text)
+
+
+def outline_order(rows: Iterable) -> List[int]:
+    """Ids of segments in reading order: each top-level segment, then its scenes."""
+    children: Dict[Optional[int], List] = {}
+    for row in rows:
+        children.setdefault(row.parent_id, []).append(row)
+    order: List[int] = []
+    for top in sorted(children.get(None, []), key=lambda row: (row.position, row.id)):
+        order.append(top.id)
+        order.extend(child.id for child in sorted(children.get(top.id, []), key=lambda row: (row.position, row.id)))
+    return order
+
+
+def has_segments(db: Session, project_id: int) -> bool:
+    return db.exec(select(Segment.id).where(Segment.project_id == project_id).limit(1)).first() is not None
+
+
+def ordered_segments(db: Session, project_id: int, with_content: bool = False) -> List:
+    """A project's segments in reading order, as rows of metadata or full Segments."""
+    if with_content:
+        rows = db.exec(select(Segment).where(Segment.project_id == project_id)).all()
+    else:
+        rows = db.exec(select_segment_outline(project_id)).all()
+    by_id = {row.id: row for row in rows}
+    return [by_id[segment_id] for segment_id in outline_order(rows)]
+
+
+def next_position(db: Session, project_id: int, parent_id: Optional[int]) -> int:
+    last = db.exec(select_last_sibling_position(project_id, parent_id)).first()
+    return 0 if last is None else last + 1
+
+
+def mark_stale(project: Project) -> None:
+    now = datetime.now(timezone.utc)
+    project.content_stale = True
+    project.last_edited_at = now
+    project.updated_at = now
+
+
+def rebuild_manuscripts(db: Session, project_ids: Optional[Iterable[int]] = None) -> List[int]:
+    """Rebuild the single text of stale segmented projects; returns their ids.
+
+    The caller commits.
+    """
+    statement = select_stale_projects()
+    if project_ids is not None:
+        statement = statement.where(Project.id.in_(list(project_ids)))
+    rebuilt = []
+    for project in db.exec(statement).all():
+        text = SEGMENT_SEPARATOR.join(
+            segment.content for segment in ordered_segments(db, project.id, with_content=True)
+        )
+        active_content = db.exec(select_active_content(project.id)).first()
+        if active_content is None:
+            active_content = StoryContent(project_id=project.id, version=1, is_active=True)
+        if not has_content(active_content, text):
+            set_content(active_content, text)
+            active_content.auto_saved = False
+            active_content.save_reason = "segment_save"
+            active_content.updated_at = datetime.now(timezone.utc)
+            db.add(active_content)
+        project.word_count = active_content.word_count or 0
+        project.content_stale = False
+        db.add(project)
+        rebuilt.append(project.id)
+    return rebuilt
@@ -0,0 +1,95 @@
+# backend/app/core/sqlite_profile.py
+"""Connection profile for the SQLite engines.
+
+Every connection gets the journal, sync, cache and busy-timeout pragmas from
+``Settings``. Writer connections open their transactions with
+``BEGIN IMMEDIATE`` so a write lock is taken up front instead of failing on a
+read-to-write upgrade. Reader connections are ``query_only`` and, under WAL,
+never wait for the writer.
+
+Time spent waiting for the single writer connection and for SQLite's write
+lock is recorded in ``lock_waits``.
+"""
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .config import settings
+
+
+class LockWaitStats:
+    """Thread-safe count, total and maximum of lock waits by kind."""
+
+    def __init__(self):
+        self._waits: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            waits = self._waits.setdefault(kind, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            waits["count"] += 1
+            waits["total_seconds"] += seconds
+            waits["max_seconds"] = max(waits["max_seconds"], seconds)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {kind: dict(waits) for kind, waits in self._waits.items()}
+
+
+lock_waits = LockWaitStats()
+
+
+class _TimedCheckout:
+    """Pool mixin recording how long callers wait for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            lock_waits.record("writer_pool", time.perf_counter() - started)
+
+
+class WriterPool(_TimedCheckout, QueuePool):
+    pass
+
+
+class AsyncWriterPool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pragma_statements(read_only: bool):
+    yield f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}"
+    yield f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}"
+    yield f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}"
+    yield f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}"
+    yield f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT)}"
+    if read_only:
+        yield "PRAGMA query_only = ON"
+
+
+def configure_sqlite_engine(engine: Engine, read_only: bool = False) -> None:
+    """Install the pragma and transaction hooks on a (sync) SQLite engine."""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in _pragma_statements(read_only):
+            cursor.execute(statement)
+        cursor.close()
+        if not read_only:
+            # Let SQLAlchemy's begin event below emit BEGIN itself
+            dbapi_connection.isolation_level = None
+
+    if read_only:
+        return
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(connection):
+        started = time.perf_counter()
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        lock_waits.record("write_lock", time.perf_counter() - started)
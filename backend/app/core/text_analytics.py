@@ -0,0 +1,245 @@
+# backend/app/core/text_analytics.py
+"""Manuscript text analytics: sentence lengths, readability, word use, dialogue.
+
+The text is tokenised in one ``findall`` pass into words, sentence ends,
+quotation marks and line breaks, and every token is mapped to an id in its
+vocabulary. Per-token properties (kind, length, syllables, stopword) are
+computed once per distinct token and spread back with NumPy fancy indexing;
+sentence and paragraph membership and whether a word is inside quotation
+marks are running sums over the token kinds.
+
+Results are memoised by content hash in an LRU cache. Texts of
+``TEXT_ANALYTICS_POOL_MIN_CHARS`` or more are analysed in a small process
+pool, so a whole novel neither blocks the event loop nor holds a
+threadpool thread; shorter ones run in the threadpool.
+"""
+import asyncio
+import math
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+from .metrics import registry
+from .user_cache import TTLCache
+
+TOKEN = re.compile(
+    # Letters, with inner apostrophes ("don't", "O'Brien")
+    r"[^\W\d_]+(?:'[^\W\d_]+)*"
+    # Terminal punctuation, unless a word goes on ("e.g", "3.14")
+    r"|[.!?…]+(?!\w)"
+    # Double quotation marks; dialogue runs from one to the next
+    r"|[\"“”]"
+    # A line break, or a paragraph break when blank lines follow
+    r"|\n(?:[^\S\n]*\n)*"
+)
+# Token kinds
+WORD, SENTENCE_END, QUOTE, LINE_BREAK, PARAGRAPH_BREAK = range(5)
+VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+TOP_WORDS = 100
+# Upper bounds of the sentence-length histogram buckets, in words
+SENTENCE_LENGTH_BINS = (5, 10, 15, 20, 30, 40)
+# A filler word is overused from this many uses per thousand words
+OVERUSE_PER_THOUSAND = 1.0
+OVERUSE_MIN_COUNT = 3
+QUEUE_TIMEOUT = 30.0
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself let me more most
+my myself no nor not of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you
+your yours yourself yourselves i'm you're he's she's it's we're they're i've you've we've they've
+i'd you'd he'd she'd we'd they'd i'll you'll he'll she'll we'll they'll isn't aren't wasn't weren't
+hasn't haven't hadn't doesn't don't didn't won't wouldn't can't cannot couldn't shouldn't mustn't
+let's that's who's what's here's there's when's where's why's how's
+""".split())
+# Words editors most often flag as filler or telling
+OVERUSED_CANDIDATES = frozenset("""
+just really very quite rather somewhat somehow suddenly actually basically literally simply
+totally completely absolutely definitely certainly probably perhaps maybe almost nearly
+began begin begins started start starts seemed seem seems felt feel feels noticed realized
+realised thought wondered knew saw heard looked look looks turned nodded shrugged sighed smiled
+grinned glanced still even
+""".split())
+
+analysis_cache = TTLCache(settings.TEXT_ANALYTICS_CACHE_SIZE, math.inf)
+text_analysis_duration = registry.histogram(
+    "text_analysis_duration_seconds", "Time to analyse a manuscript, including queueing", ("mode",)
+)
+
+
+def count_syllables(word: str) -> int:
+    word = word.replace("'", "")
+    groups = len(VOWEL_GROUPS.findall(word))
+    # A final silent e ("stone"), but not "-le" ("table") or a lone vowel ("the")
+    if groups > 1 and word.endswith("e") and not word.endswith(("le", "ee", "ye")):
+        groups -= 1
+    return max(groups, 1)
+
+
+def _percentile(values: np.ndarray, q: float) -> float:
+    return float(np.percentile(values, q)) if values.size else 0.0
+
+
+def _word_list(words: List[str], counts: np.ndarray, order: np.ndarray, total: int) -> List[dict]:
+    return [
+        {"word": words[i], "count": int(counts[i]), "per_thousand": round(1000 * int(counts[i]) / total, 2)}
+        for i in order
+    ]
+
+
+def _token_kind(token: str) -> int:
+    if token[0] == "\n":
+        return PARAGRAPH_BREAK if token.count("\n") > 1 else LINE_BREAK
+    if token in "\"“”":
+        return QUOTE
+    return SENTENCE_END if token[0] in ".!?…" else WORD
+
+
+def analyse_text(text: str) -> Dict:
+    """Compute every metric for ``text``; returns plain data, so it can cross processes."""
+    # Curly apostrophes as straight ones, so "don’t" is the stopword "don't"
+    tokens = TOKEN.findall(text.lower().replace("’", "'"))
+    vocabulary = list(dict.fromkeys(tokens))
+    token_ids = {token: i for i, token in enumerate(vocabulary)}
+    ids = np.fromiter(map(token_ids.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+
+    # Per distinct token, then spread to every occurrence
+    size = len(vocabulary)
+    vocab_kinds = np.fromiter(map(_token_kind, vocabulary), dtype=np.int8, count=size)
+    vocab_words = vocab_kinds == WORD
+    vocab_lengths = np.fromiter(map(len, vocabulary), dtype=np.int64, count=size)
+    vocab_syllables = np.fromiter(map(count_syllables, vocabulary), dtype=np.int64, count=size)
+    vocab_stopword = np.fromiter((token in STOPWORDS for token in vocabulary), dtype=bool, count=size)
+    vocab_candidate = np.fromiter((token in OVERUSED_CANDIDATES for token in vocabulary), dtype=bool, count=size)
+    kinds = vocab_kinds[ids]
+    is_word = kinds == WORD
+    word_ids = ids[is_word]
+    total = int(word_ids.size)
+    counts = np.where(vocab_words, np.bincount(word_ids, minlength=size), 0)
+    syllables = vocab_syllables[word_ids]
+
+    # Each break starts a new sentence or paragraph; empty ones drop out
+    paragraph_breaks = kinds == PARAGRAPH_BREAK
+    sentence_lengths = np.bincount(np.cumsum((kinds == SENTENCE_END) | paragraph_breaks)[is_word])
+    sentence_lengths = sentence_lengths[sentence_lengths > 0]
+    sentence_count = int(sentence_lengths.size)
+    paragraph_count = int(np.count_nonzero(np.bincount(np.cumsum(paragraph_breaks)[is_word])))
+
+    # Inside quotation marks after an odd number of them since the last line
+    # break, so an unclosed quote ends with its paragraph
+    quotes = np.cumsum(kinds == QUOTE)
+    line_start = np.maximum.accumulate(np.where((kinds == LINE_BREAK) | paragraph_breaks, quotes, 0))
+    dialogue_words = int(np.count_nonzero(((quotes - line_start) % 2 == 1) & is_word))
+
+    words_per_sentence = total / sentence_count if sentence_count else 0.0
+    syllables_per_word = float(syllables.sum()) / total if total else 0.0
+    complex_share = float(np.count_nonzero(syllables >= 3)) / total if total else 0.0
+    if total and sentence_count:
+        flesch = 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+        grade = 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59
+        fog = 0.4 * (words_per_sentence + 100 * complex_share)
+    else:
+        flesch = grade = fog = 0.0
+
+    histogram, _ = np.histogram(sentence_lengths, bins=(1,) + tuple(b + 1 for b in SENTENCE_LENGTH_BINS) + (np.inf,))
+    bounds = [(1, SENTENCE_LENGTH_BINS[0])] + [
+        (low + 1, high) for low, high in zip(SENTENCE_LENGTH_BINS, SENTENCE_LENGTH_BINS[1:])
+    ] + [(SENTENCE_LENGTH_BINS[-1] + 1, None)]
+
+    content_counts = np.where(vocab_stopword, 0, counts)
+    top = np.argsort(-content_counts, kind="stable")[:TOP_WORDS]
+    top = top[content_counts[top] > 0]
+    overused_counts = np.where(vocab_candidate, counts, 0)
+    threshold = max(OVERUSE_MIN_COUNT, OVERUSE_PER_THOUSAND * total / 1000)
+    overused = np.argsort(-overused_counts, kind="stable")
+    overused = overused[overused_counts[overused] >= threshold]
+
+    unique_words = int(np.count_nonzero(vocab_words))
+    return {
+        "word_count": total,
+        "unique_words": unique_words,
+        "lexical_diversity": round(unique_words / total, 4) if total else 0.0,
+        "character_count": len(text),
+        "paragraph_count": paragraph_count,
+        "average_word_length": round(float(vocab_lengths[word_ids].mean()), 2) if total else 0.0,
+        "sentences": {
+            "count": sentence_count,
+            "mean": round(words_per_sentence, 2),
+            "median": _percentile(sentence_lengths, 50),
+            "p90": _percentile(sentence_lengths, 90),
+            "stdev": round(float(sentence_lengths.std()), 2) if sentence_count else 0.0,
+            "max": int(sentence_lengths.max()) if sentence_count else 0,
+            "histogram": [
+                {"min_words": low, "max_words": high, "count": int(n)}
+                for (low, high), n in zip(bounds, histogram)
+            ],
+        },
+        "readability": {
+            "flesch_reading_ease": round(flesch, 2),
+            "flesch_kincaid_grade": round(grade, 2),
+            "gunning_fog": round(fog, 2),
+        },
+        "dialogue_ratio": round(dialogue_words / total, 4) if total else 0.0,
+        "top_words": _word_list(vocabulary, counts, top, total),
+        "overused_words": _word_list(vocabulary, counts, overused, total),
+    }
+
+
+# Whole manuscripts are analysed in their own small process pool, like bcrypt
+_analysis_pool: Optional[ProcessPoolExecutor] = None
+_analysis_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_analysis_pool() -> Tuple[ProcessPoolExecutor, asyncio.Semaphore]:
+    global _analysis_pool, _analysis_slots
+    if _analysis_pool is None:
+        _analysis_pool = ProcessPoolExecutor(max_workers=settings.TEXT_ANALYTICS_WORKERS)
+        _analysis_slots = asyncio.Semaphore(settings.TEXT_ANALYTICS_WORKERS + settings.TEXT_ANALYTICS_QUEUE_SIZE)
+    return _analysis_pool, _analysis_slots
+
+
+async def _analyse_in_pool(text: str) -> Dict:
+    pool, slots = _get_analysis_pool()
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=QUEUE_TIMEOUT)
+    except asyncio.TimeoutError as e:
+        raise HTTPException(status_code=503, detail="Too many analyses in progress, try again shortly") from e
+    try:
+        with text_analysis_duration.time(mode="pool"):
+            return await asyncio.get_running_loop().run_in_executor(pool, analyse_text, text)
+    finally:
+        slots.release()
+
+
+def cached_analysis(content_hash: str) -> Optional[Dict]:
+    return analysis_cache.get(content_hash)
+
+
+async def analyse_text_async(text: str, content_hash: Optional[str]) -> Dict:
+    """Analyse ``text`` off the event loop, caching the result under its hash if it has one.
+
+    Callers look in the cache first, with ``cached_analysis``.
+    """
+    if len(text) >= settings.TEXT_ANALYTICS_POOL_MIN_CHARS:
+        analysis = await _analyse_in_pool(text)
+    else:
+        with text_analysis_duration.time(mode="thread"):
+            analysis = await run_in_threadpool(analyse_text, text)
+    if content_hash is not None:
+        analysis_cache.set(content_hash, analysis)
+    return analysis
+
+
+def shutdown_analysis_pool():
+    global _analysis_pool, _analysis_slots
+    if _analysis_pool is not None:
+        _analysis_pool.shutdown(wait=True, cancel_futures=True)
+        _analysis_pool = _analysis_slots = None
@@ -0,0 +1,254 @@
+# backend/app/core/text_diff.py
+"""Word- and paragraph-level diffs between two texts.
+
+Texts are split into tokens that keep their trailing whitespace, so the
+tokens of a text join back into it exactly, and every distinct token is
+interned to an int. The token sequences are compared with Myers' O(ND)
+algorithm in its linear-space form: the middle snake of each range is found
+by searching from both ends at once and the halves on either side of it are
+diffed in turn, with common prefixes and suffixes trimmed first. A draft
+with a few edits costs little more than the trimming.
+
+Word diffs compare paragraphs first and then the words of each changed run
+of paragraphs, so the search cost follows the edits within a paragraph
+rather than across the whole manuscript.
+
+Past ``DIFF_TIMEOUT`` seconds the ranges still left are reported as whole
+replacements. The hunks are then still a correct diff, only not a minimal
+one, and the result is marked ``approximate``.
+
+Results are cached by the two content hashes and the unit.
+"""
+import json
+import math
+import re
+import time
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import settings
+from .user_cache import TTLCache
+
+UNITS = {
+    # A word with the whitespace after it; leading whitespace is its own token
+    "word": re.compile(r"\S+\s*|\s+"),
+    # A paragraph with the blank lines after it
+    "paragraph": re.compile(r"(?:[^\n]|\n(?![^\S\n]*\n))+(?:\n[^\S\n]*)*\n?|\n+"),
+}
+# Diffs whose hunks carry more text than this are not cached
+CACHE_MAX_CHARS = 1024 * 1024
+# and from this much they are streamed rather than built as one response
+STREAM_MIN_CHARS = 256 * 1024
+# Hunks written per chunk of a streamed response
+STREAM_BATCH_SIZE = 200
+
+diff_cache = TTLCache(settings.DIFF_CACHE_SIZE, math.inf)
+
+# (from_start, from_end, to_start, to_end)
+Span = Tuple[int, int, int, int]
+
+
+def tokenize(text: str, unit: str) -> List[str]:
+    return UNITS[unit].findall(text)
+
+
+def _intern(a: Sequence[str], b: Sequence[str]) -> Tuple[List[int], List[int]]:
+    ids: Dict[str, int] = {}
+    return (
+        [ids.setdefault(token, len(ids)) for token in a],
+        [ids.setdefault(token, len(ids)) for token in b],
+    )
+
+
+def _middle_snake(a: Sequence[int], b: Sequence[int], deadline: float) -> Optional[Tuple[int, int]]:
+    """Where a shortest edit script of ``a`` into ``b`` crosses its middle diagonal.
+
+    Searches forward from the start and backward from the end, one edit
+    further each round, until the two meet; O(len(a) + len(b)) space. Returns
+    None when ``deadline`` passes first.
+    """
+    n, m = len(a), len(b)
+    max_d = (n + m + 1) // 2
+    offset = max_d
+    size = 2 * max_d + 2
+    forward = [-1] * size
+    backward = [-1] * size
+    forward[offset + 1] = backward[offset + 1] = 0
+    delta = n - m
+    # With an odd delta the forward search reaches the overlap first
+    odd = delta % 2 != 0
+    # Diagonals that ran off the edge are skipped from then on
+    k1_start = k1_end = k2_start = k2_end = 0
+    for d in range(max_d):
+        if time.monotonic() > deadline:
+            return None
+        for k1 in range(-d + k1_start, d + 1 - k1_end, 2):
+            k1_offset = offset + k1
+            if k1 == -d or (k1 != d and forward[k1_offset - 1] < forward[k1_offset + 1]):
+                x1 = forward[k1_offset + 1]
+            else:
+                x1 = forward[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[x1] == b[y1]:
+                x1 += 1
+                y1 += 1
+            forward[k1_offset] = x1
+            if x1 > n:
+                k1_end += 2
+            elif y1 > m:
+                k1_start += 2
+            elif odd:
+                k2_offset = offset + delta - k1
+                if 0 <= k2_offset < size and backward[k2_offset] != -1 and x1 >= n - backward[k2_offset]:
+                    return x1, y1
+        for k2 in range(-d + k2_start, d + 1 - k2_end, 2):
+            k2_offset = offset + k2
+            if k2 == -d or (k2 != d and backward[k2_offset - 1] < backward[k2_offset + 1]):
+                x2 = backward[k2_offset + 1]
+            else:
+                x2 = backward[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[n - x2 - 1] == b[m - y2 - 1]:
+                x2 += 1
+                y2 += 1
+            backward[k2_offset] = x2
+            if x2 > n:
+                k2_end += 2
+            elif y2 > m:
+                k2_start += 2
+            elif not odd:
+                k1_offset = offset + delta - k2
+                if 0 <= k1_offset < size and forward[k1_offset] != -1:
+                    x1 = forward[k1_offset]
+                    if x1 >= n - x2:
+                        return x1, offset + x1 - k1_offset
+    # The searches never met: nothing in common, so all of a goes and all of b comes
+    return n, 0
+
+
+def _myers(a: Sequence[int], b: Sequence[int], deadline: float) -> Tuple[List[Span], bool]:
+    """Split every range at its middle snake until only insertions and deletions are left."""
+    spans: List[Span] = []
+    approximate = False
+
+    def changed(a0: int, a1: int, b0: int, b1: int) -> None:
+        if spans and spans[-1][1] == a0 and spans[-1][3] == b0:
+            a0, b0 = spans.pop()[::2]
+        spans.append((a0, a1, b0, b1))
+
+    # Ranges still to diff, leftmost last so the spans come out in order
+    pending = [(0, len(a), 0, len(b))]
+    while pending:
+        a0, a1, b0, b1 = pending.pop()
+        while a0 < a1 and b0 < b1 and a[a0] == b[b0]:
+            a0 += 1
+            b0 += 1
+        while a0 < a1 and b0 < b1 and a[a1 - 1] == b[b1 - 1]:
+            a1 -= 1
+            b1 -= 1
+        if a0 == a1 and b0 == b1:
+            continue
+        if a0 == a1 or b0 == b1:
+            changed(a0, a1, b0, b1)
+            continue
+        split = None if approximate else _middle_snake(a[a0:a1], b[b0:b1], deadline)
+        if split is None:
+            approximate = True
+            changed(a0, a1, b0, b1)
+            continue
+        x, y = split
+        pending.append((a0 + x, a1, b0 + y, b1))
+        pending.append((a0, a0 + x, b0, b0 + y))
+    return spans, approximate
+
+
+def diff_tokens(a: Sequence[int], b: Sequence[int], deadline: float) -> Tuple[List[Span], bool]:
+    """Changed spans turning ``a`` into ``b``, in order, and whether the deadline cut the search short."""
+    # Tokens found on one side only can never match, so they are left out of
+    # the search; a rewritten paragraph then costs nothing to skip
+    common = set(a).intersection(b)
+    kept_a = [i for i, token in enumerate(a) if token in common]
+    kept_b = [j for j, token in enumerate(b) if token in common]
+    spans, approximate = _myers([a[i] for i in kept_a], [b[j] for j in kept_b], deadline)
+    # The gaps between the matched tokens, in the original positions
+    changes: List[Span] = []
+    next_a = next_b = i = j = 0
+    for a0, a1, b0, b1 in spans + [(len(kept_a), len(kept_a), len(kept_b), len(kept_b))]:
+        for x, y in zip(kept_a[i:a0], kept_b[j:b0]):
+            if next_a < x or next_b < y:
+                changes.append((next_a, x, next_b, y))
+            next_a, next_b = x + 1, y + 1
+        i, j = a1, b1
+    if next_a < len(a) or next_b < len(b):
+        changes.append((next_a, len(a), next_b, len(b)))
+    return changes, approximate
+
+
+def _changed_ranges(text_a: str, text_b: str, unit: str, deadline: float) -> Tuple[List[Span], bool]:
+    """Changed (from_start, from_end, to_start, to_end) code-point ranges, and whether they are approximate."""
+    tokens_a, tokens_b = tokenize(text_a, unit), tokenize(text_b, unit)
+    spans, approximate = diff_tokens(*_intern(tokens_a, tokens_b), deadline)
+    offsets_a = list(accumulate(map(len, tokens_a), initial=0))
+    offsets_b = list(accumulate(map(len, tokens_b), initial=0))
+    return [(offsets_a[a0], offsets_a[a1], offsets_b[b0], offsets_b[b1]) for a0, a1, b0, b1 in spans], approximate
+
+
+def diff_texts(text_a: str, text_b: str, unit: str) -> Dict:
+    """Hunks turning ``text_a`` into ``text_b``, with offsets in code points of both texts.
+
+    Applying each hunk's ``inserted`` over ``text_a[from_start:from_end]``,
+    last hunk first, gives ``text_b``.
+    """
+    deadline = time.monotonic() + settings.DIFF_TIMEOUT
+    ranges, approximate = _changed_ranges(text_a, text_b, "paragraph", deadline)
+    if unit == "word":
+        # Words only within the paragraphs that changed: far fewer tokens to
+        # search, at the price of not matching words across paragraph edits
+        words = []
+        for from_start, from_end, to_start, to_end in ranges:
+            spans, cut = _changed_ranges(text_a[from_start:from_end], text_b[to_start:to_end], unit, deadline)
+            approximate = approximate or cut
+            words.extend((from_start + a0, from_start + a1, to_start + b0, to_start + b1) for a0, a1, b0, b1 in spans)
+        ranges = words
+    hunks = [
+        {
+            "from_start": from_start,
+            "from_end": from_end,
+            "to_start": to_start,
+            "to_end": to_end,
+            "deleted": text_a[from_start:from_end],
+            "inserted": text_b[to_start:to_end],
+        }
+        for from_start, from_end, to_start, to_end in ranges
+    ]
+    return {
+        "unit": unit,
+        "approximate": approximate,
+        "words_added": sum(len(hunk["inserted"].split()) for hunk in hunks),
+        "words_removed": sum(len(hunk["deleted"].split()) for hunk in hunks),
+        "hunks": hunks,
+    }
+
+
+def hunk_chars(diff: Dict) -> int:
+    return sum(len(hunk["deleted"]) + len(hunk["inserted"]) for hunk in diff["hunks"])
+
+
+def cached_diff(hash_a: str, hash_b: str, unit: str) -> Optional[Dict]:
+    return diff_cache.get((hash_a, hash_b, unit))
+
+
+def cache_diff(hash_a: str, hash_b: str, unit: str, diff: Dict) -> None:
+    if hunk_chars(diff) <= CACHE_MAX_CHARS:
+        diff_cache.set((hash_a, hash_b, unit), diff)
+
+
+def stream_json(document: Dict, key: str) -> Iterator[bytes]:
+    """Encode ``document`` as JSON, writing the list under ``key`` a batch of items at a time."""
+    items = document[key]
+    head = json.dumps({name: value for name, value in document.items() if name != key}, ensure_ascii=False)
+    yield f'{head[:-1]}{", " if len(head) > 2 else ""}"{key}": ['.encode("utf-8")
+    for start in range(0, len(items), STREAM_BATCH_SIZE):
+        batch = ", ".join(json.dumps(item, ensure_ascii=False) for item in items[start:start + STREAM_BATCH_SIZE])
+        yield ((", " if start else "") + batch).encode("utf-8")
+    yield b"]}"
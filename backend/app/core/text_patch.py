@@ -0,0 +1,43 @@
+# backend/app/core/text_patch.py
+"""Apply editor text edits and keep word counts up to date incrementally."""
+from typing import Iterable, Protocol, Tuple
+
+
+class TextEdit(Protocol):
+    start: int
+    end: int
+    text: str
+
+
+def _word_window(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Widen [start, end) to the whitespace around it so no word is cut in half."""
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    while end < len(text) and not text[end].isspace():
+        end += 1
+    return start, end
+
+
+def apply_edit(text: str, start: int, end: int, replacement: str) -> Tuple[str, int]:
+    """Replace ``text[start:end]`` and return the new text and its word-count delta.
+
+    Only the words touching the edited span are re-counted; ``str.split``
+    semantics are preserved because everything outside the widened window is
+    separated from it by whitespace.
+    """
+    if not 0 <= start <= end <= len(text):
+        raise ValueError(f"Edit range {start}:{end} is outside the content (length {len(text)})")
+    window_start, window_end = _word_window(text, start, end)
+    before = text[window_start:window_end]
+    after = text[window_start:start] + replacement + text[end:window_end]
+    delta = len(after.split()) - len(before.split())
+    return text[:start] + replacement + text[end:], delta
+
+
+def apply_edits(text: str, edits: Iterable[TextEdit]) -> Tuple[str, int]:
+    """Apply edits in order; each edit's offsets refer to the text left by the previous one."""
+    word_delta = 0
+    for edit in edits:
+        text, delta = apply_edit(text, edit.start, edit.end, edit.text)
+        word_delta += delta
+    return text, word_delta
@@ -0,0 +1,101 @@
+# backend/app/core/user_cache.py
+"""Bounded TTL caches for decoded access tokens and authenticated users.
+
+Users are cached as plain column snapshots and rebuilt per request as detached
+instances, so no ORM object is ever shared between sessions or threads and a
+cached user can still be passed to ``db.add`` for an UPDATE.
+
+Every route that changes a user calls ``invalidate_user``. That only reaches
+this process's cache: a change made by another worker or by ``app.cli`` is
+seen here once the snapshot expires, at most ``AUTH_CACHE_TTL`` seconds later.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from .config import settings
+from ..models.user import User
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries also expire after a time-to-live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires = time.monotonic() + min(self.ttl, ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL)
+user_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL)
+
+
+def get_cached_token_subject(token: str) -> Optional[int]:
+    return token_cache.get(token)
+
+
+def cache_token_subject(token: str, user_id: int, expires_at: Optional[float]) -> None:
+    # Never keep a token past its own expiry
+    ttl = expires_at - time.time() if expires_at else None
+    if ttl is None or ttl > 0:
+        token_cache.set(token, user_id, ttl)
+
+
+def get_cached_user(user_id: int) -> Optional[User]:
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        return None
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+def cache_user(user: User) -> None:
+    user_cache.set(user.id, user.model_dump())
+
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.pop(user_id)
+
+
+def auth_cache_stats() -> Dict[str, Dict[str, int]]:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
@@ -0,0 +1,195 @@
+# backend/app/core/user_stats.py
+"""Per-user dashboard aggregates, kept in step with every project write.
+
+An ``after_flush`` hook, like the search index's, turns the projects a flush
+added, changed or deleted into per-user deltas and applies them to
+``UserStats`` in the same transaction. Requests, the autosave buffer and
+imports therefore all keep it current, and the dashboard reads a single row.
+
+Words written today are the net word-count changes of existing manuscripts;
+creating, importing or deleting a project moves the totals but not the day's
+writing, including an imported project's count set after its insert. ``rebuild_user_stats`` recomputes everything else from the project
+table; run it with ``python -m app.cli rebuild-user-stats``.
+"""
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import DateTime, event, func, inspect, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Connection
+from sqlmodel import Session
+
+from .new_projects import is_new_project
+from ..models.project import Project
+from ..models.user import User
+from ..models.user_stats import UserStats
+
+user_stats = UserStats.__table__
+REBUILD_BATCH_SIZE = 500
+# Project columns whose changes move a user's aggregates
+TRACKED = ("status", "word_count", "created_at", "updated_at", "last_edited_at")
+
+
+@dataclass
+class _Delta:
+    projects: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    words: int = 0
+    words_written: int = 0
+    activity: Optional[datetime] = None
+    # Set when a project was deleted or a flush lost an old value; the counts
+    # are then recomputed instead
+    rebuild: bool = False
+
+    def seen(self, when: Optional[datetime]) -> None:
+        if when is not None and (self.activity is None or when > self.activity):
+            self.activity = when
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; request handlers set aware ones."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _activity(values: dict) -> Optional[datetime]:
+    stamps = [_naive_utc(values.get(name)) for name in ("created_at", "updated_at", "last_edited_at")]
+    return max((stamp for stamp in stamps if stamp is not None), default=None)
+
+
+def _project_deltas(session: Session) -> Dict[int, _Delta]:
+    deltas: Dict[int, _Delta] = defaultdict(_Delta)
+    for obj in session.new:
+        if isinstance(obj, Project):
+            delta = deltas[obj.user_id]
+            delta.projects += 1
+            delta.statuses[obj.status] += 1
+            delta.words += obj.word_count or 0
+            delta.seen(_activity(inspect(obj).dict))
+    for obj in session.dirty:
+        if not isinstance(obj, Project):
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[name].history.has_changes() for name in TRACKED):
+            continue
+        delta = deltas[obj.user_id]
+        status = state.attrs.status.history
+        if status.has_changes():
+            if status.deleted:
+                delta.statuses[status.deleted[0]] -= 1
+                delta.statuses[obj.status] += 1
+            else:
+                delta.rebuild = True
+        words = state.attrs.word_count.history
+        if words.has_changes():
+            if words.deleted:
+                change = (obj.word_count or 0) - (words.deleted[0] or 0)
+                delta.words += change
+                if not is_new_project(session, obj):
+                    delta.words_written += change
+            else:
+                delta.rebuild = True
+        delta.seen(_activity(state.dict))
+    for obj in session.deleted:
+        # Rare, and may take the latest activity with it, so recount from the table
+        if isinstance(obj, Project) and (user_id := inspect(obj).dict.get("user_id")) is not None:
+            deltas[user_id].rebuild = True
+    return deltas
+
+
+def _upsert(connection: Connection, rows: list, columns: Iterable[str]) -> None:
+    statement = insert(user_stats)
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[user_stats.c.user_id],
+            set_={name: statement.excluded[name] for name in columns},
+        ),
+        rows,
+    )
+
+
+def _apply(connection: Connection, user_id: int, delta: _Delta, today: date) -> None:
+    if delta.rebuild:
+        rebuild_user_stats(connection, [user_id])
+    row = connection.execute(select(user_stats).where(user_stats.c.user_id == user_id)).mappings().first()
+    stats = dict(row) if row else {
+        "user_id": user_id, "project_count": 0, "status_counts": {}, "total_words": 0,
+        "words_today": 0, "words_today_date": None, "last_activity_at": None,
+    }
+    if not delta.rebuild:
+        counts = Counter(stats["status_counts"])
+        counts.update(delta.statuses)
+        stats["project_count"] += delta.projects
+        stats["status_counts"] = {status: n for status, n in sorted(counts.items()) if n > 0}
+        stats["total_words"] += delta.words
+    if delta.words_written:
+        if stats["words_today_date"] != today:
+            stats["words_today"], stats["words_today_date"] = 0, today
+        stats["words_today"] += delta.words_written
+    if delta.activity is not None and (
+        stats["last_activity_at"] is None or delta.activity > stats["last_activity_at"]
+    ):
+        stats["last_activity_at"] = delta.activity
+    _upsert(connection, [stats], [name for name in stats if name != "user_id"])
+
+
+@event.listens_for(Session, "after_flush")
+def _update_user_stats(session: Session, flush_context) -> None:
+    deltas = _project_deltas(session)
+    if not deltas:
+        return
+    connection = session.connection()
+    today = datetime.utcnow().date()
+    for user_id, delta in sorted(deltas.items()):
+        _apply(connection, user_id, delta, today)
+
+
+def rebuild_user_stats(connection: Connection, user_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute project counts, word totals and last activity from the projects.
+
+    Covers the given users, or every user. Words written today are kept, since
+    no other table records them. Returns the number of rows written; the
+    caller commits.
+    """
+    activity = func.max(
+        func.max(
+            Project.created_at,
+            func.coalesce(Project.updated_at, Project.created_at),
+            func.coalesce(Project.last_edited_at, Project.created_at),
+        ),
+        type_=DateTime,
+    )
+    aggregates = (
+        select(Project.user_id, Project.status, func.count(), func.coalesce(func.sum(Project.word_count), 0), activity)
+        .group_by(Project.user_id, Project.status)
+    )
+    if user_ids is None:
+        user_ids = connection.execute(select(User.id).order_by(User.id)).scalars().all()
+    else:
+        user_ids = sorted(set(user_ids))
+        aggregates = aggregates.where(Project.user_id.in_(user_ids))
+    rows = {
+        user_id: {
+            "user_id": user_id, "project_count": 0, "status_counts": {}, "total_words": 0,
+            "last_activity_at": None,
+        }
+        for user_id in user_ids
+    }
+    for user_id, status, count, words, last_activity in connection.execute(aggregates):
+        if (row := rows.get(user_id)) is None:
+            continue
+        row["project_count"] += count
+        row["status_counts"][status] = count
+        row["total_words"] += words
+        if last_activity is not None and (row["last_activity_at"] is None or last_activity > row["last_activity_at"]):
+            row["last_activity_at"] = last_activity
+    batch = list(rows.values())
+    for start in range(0, len(batch), REBUILD_BATCH_SIZE):
+        _upsert(
+            connection, batch[start:start + REBUILD_BATCH_SIZE],
+            ("project_count", "status_counts", "total_words", "last_activity_at"),
+        )
+    return len(batch)
@@ -1,10 +1,26 @@
 # backend/app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.database import create_db_and_tables
+from app.core.autosave import autosave_buffer
+from app.core.config import settings
+from app.core.database import (
+    create_db_and_tables,
+    get_async_read_session,
+    get_async_session,
+    get_read_session,
+    get_session,
+)
+from app.core.deps import get_current_user, get_current_user_async
+from app.core.http_compression import CompressionMiddleware
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, registry, stats_collector
+from app.core.query_tracking import QueryTrackingMiddleware
+from app.core.security import shutdown_hash_pool
+from app.core.sqlite_profile import lock_waits
+from app.core.text_analytics import analysis_cache, shutdown_analysis_pool
+from app.core.user_cache import auth_cache_stats
 from app.api.auth import router as auth_router
 from app.api.users import router as users_router
-from .api import projects, stories
+from .api import projects, search, segments, stories
 
 app = FastAPI(
     title="Fiction Platform API",
@@ -15,8 +31,33 @@ app = FastAPI(
 # Register routers AFTER app is created
 app.include_router(projects.router, prefix="/api/projects", tags=["projects"])
 app.include_router(stories.router, prefix="/api/stories", tags=["stories"])
+app.include_router(segments.router, prefix="/api/stories", tags=["segments"])
 app.include_router(auth_router, prefix="/api/auth", tags=["authentication"])
 app.include_router(users_router, prefix="/api/users", tags=["users"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+
+# Hand every route an AsyncSession; SessionRoute runs sync handlers on it
+if settings.ASYNC_DATABASE:
+    app.dependency_overrides[get_session] = get_async_session
+    app.dependency_overrides[get_read_session] = get_async_read_session
+    app.dependency_overrides[get_current_user] = get_current_user_async
+
+# Attribute SQL statements to requests; slow, repeated and over-budget ones are logged
+app.add_middleware(QueryTrackingMiddleware)
+
+# Per-route latency and status; close to the router, so it sees the matched route
+app.add_middleware(MetricsMiddleware)
+
+# Compress large responses and inflate compressed uploads; a backup import is
+# the largest body any route takes, so compressed bodies may inflate as far
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.HTTP_COMPRESSION_MIN_SIZE,
+    content_types=tuple(
+        item.strip().lower() for item in settings.HTTP_COMPRESSION_TYPES.split(",") if item.strip()
+    ),
+    max_request_bytes=settings.IMPORT_MAX_BYTES,
+)
 
 # Configure CORS
 app.add_middleware(
@@ -25,12 +66,48 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Expose on /metrics the stats that /health already reports
+registry.add_collector(stats_collector(
+    "sqlite_lock", "Waits for the writer connection and SQLite's write lock", lock_waits.stats, "kind",
+    {
+        "count": ("waits_total", "counter"),
+        "total_seconds": ("wait_seconds_total", "counter"),
+        "max_seconds": ("wait_seconds_max", "gauge"),
+    },
+))
+registry.add_collector(stats_collector(
+    "auth_cache", "Decoded token and user caches", auth_cache_stats, "cache",
+    {
+        "hits": ("hits_total", "counter"),
+        "misses": ("misses_total", "counter"),
+        "size": ("entries", "gauge"),
+    },
+))
+registry.add_collector(stats_collector(
+    "text_analytics_cache", "Manuscript analyses cached by content hash", lambda: {"analysis": analysis_cache.stats()},
+    "cache",
+    {
+        "hits": ("hits_total", "counter"),
+        "misses": ("misses_total", "counter"),
+        "size": ("entries", "gauge"),
+    },
+))
+
 # Create database tables on startup
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
+    autosave_buffer.start()
+
+# Write out buffered autosaves before the worker exits
+@app.on_event("shutdown")
+def on_shutdown():
+    autosave_buffer.stop()
+    shutdown_hash_pool()
+    shutdown_analysis_pool()
 
 @app.get("/")
 def read_root():
@@ -38,4 +115,14 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "message": "Fiction Platform API is running"}
+    return {
+        "status": "healthy",
+        "message": "Fiction Platform API is running",
+        "auth_cache": auth_cache_stats(),
+        "database_lock_waits": lock_waits.stats(),
+        "text_analytics_cache": analysis_cache.stats(),
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,10 @@
+# backend/app/models/content_chunk.py
+from sqlalchemy import Column
+from sqlmodel import SQLModel, Field
+
+from ..core.compression import CompressedText
+
+class ContentChunk(SQLModel, table=True):
+    hash: str = Field(primary_key=True, max_length=64)
+    data: str = Field(sa_column=Column(CompressedText, nullable=False))
+    size: int = Field(default=0)
@@ -1,5 +1,6 @@
 # backend/app/models/project.py
 from typing import Optional, List
+from sqlalchemy import Index, func
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import datetime
 
@@ -15,6 +16,16 @@ class Project(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None)
     last_edited_at: Optional[datetime] = Field(default=None)
+    # Set when segments changed after the single-text manuscript was last rebuilt
+    content_stale: bool = Field(default=False)
     user_id: int = Field(foreign_key="user.id", nullable=False)
     user: Optional["User"] = Relationship(back_populates="projects")
     story_content: List["StoryContent"] = Relationship(back_populates="project")
+
+# Projects are listed most recently edited first; never-edited ones by creation time
+PROJECT_SORT_KEY = func.coalesce(Project.last_edited_at, Project.created_at)
+
+# Serves a user's project list in PROJECT_SORT_KEY order, including cursor pages
+Index("ix_project_user_id_sort_key", Project.user_id, PROJECT_SORT_KEY, Project.id)
+# Finds segmented manuscripts whose single text still has to be rebuilt
+Index("ix_project_content_stale", Project.id, sqlite_where=Project.content_stale == True)
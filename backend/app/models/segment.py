@@ -0,0 +1,29 @@
+# backend/app/models/segment.py
+from typing import Optional
+from sqlalchemy import Column, Index
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+from ..core.compression import CompressedText
+
+class Segment(SQLModel, table=True):
+    """A chapter or scene of a segmented manuscript.
+
+    Chapters sit at the top level; scenes sit under a chapter or at the top
+    level. Siblings are ordered by ``position``.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    project_id: int = Field(foreign_key="project.id")
+    parent_id: Optional[int] = Field(default=None, foreign_key="segment.id")
+    kind: str = Field(default="scene", max_length=20)
+    title: Optional[str] = Field(default=None, max_length=255)
+    position: int = Field(default=0)
+    content: str = Field(default="", sa_column=Column(CompressedText, nullable=False))
+    content_hash: Optional[str] = Field(default=None, max_length=64)
+    char_count: int = Field(default=0)
+    word_count: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = Field(default=None)
+
+# A project's outline in sibling order
+Index("ix_segment_project_id_parent_id_position", Segment.project_id, Segment.parent_id, Segment.position)
@@ -1,13 +1,21 @@
 # backend/app/models/story_content.py
 from typing import Optional, List
+from sqlalchemy import Column, Index
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import datetime
 from .project import Project
+from ..core.compression import CompressedText
 
 class StoryContent(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     project_id: int = Field(foreign_key="project.id")
-    content: Optional[str] = Field(default=None)
+    content: Optional[str] = Field(default=None, sa_column=Column(CompressedText))
+    content_hash: Optional[str] = Field(default=None, max_length=64)
+    # Size of the text, kept so listings never have to load it
+    char_count: Optional[int] = Field(default=None)
+    word_count: Optional[int] = Field(default=None)
+    # Comma-separated ContentChunk hashes; set once a version is archived
+    chunk_refs: Optional[str] = Field(default=None)
     content_type: str = Field(default="markdown")
     version: int = Field(default=1)
     is_active: bool = Field(default=True)
@@ -16,3 +24,13 @@ class StoryContent(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default=None)
     project: Optional[Project] = Relationship(back_populates="story_content")
+
+# Version history and single-version lookups for a project
+Index("ix_storycontent_project_id_version", StoryContent.project_id, StoryContent.version)
+# At most one active version per project; also the active-content lookup
+Index(
+    "ux_storycontent_project_id_active",
+    StoryContent.project_id,
+    unique=True,
+    sqlite_where=StoryContent.is_active == True,
+)
@@ -37,4 +37,3 @@ class UserUpdate(BaseModel):
     username: Optional[str] = None
     email: Optional[str] = None
     password: Optional[str] = None
-    is_active: Optional[bool] = None
@@ -0,0 +1,21 @@
+# backend/app/models/user_stats.py
+from typing import Dict, Optional
+from sqlalchemy import JSON, Column
+from sqlmodel import SQLModel, Field
+from datetime import date, datetime
+
+class UserStats(SQLModel, table=True):
+    """Dashboard aggregates over a user's projects.
+
+    Kept in step with every project write by ``app.core.user_stats``, so the
+    dashboard reads one row instead of scanning projects and content.
+    """
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    project_count: int = Field(default=0)
+    # Number of projects per status
+    status_counts: Dict[str, int] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    total_words: int = Field(default=0)
+    # Net words added to existing manuscripts on words_today_date (UTC)
+    words_today: int = Field(default=0)
+    words_today_date: Optional[date] = Field(default=None)
+    last_activity_at: Optional[datetime] = Field(default=None)
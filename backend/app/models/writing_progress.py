@@ -0,0 +1,24 @@
+# backend/app/models/writing_progress.py
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+class WritingProgress(SQLModel, table=True):
+    """Word-count changes of one project within one hour or one day (UTC).
+
+    The primary key orders a project's buckets by time, so a chart reads one
+    index range. Maintained by ``app.core.progress``.
+    """
+    # Stored in primary-key order, so a range needs no separate index
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    project_id: int = Field(foreign_key="project.id", primary_key=True)
+    # "hour" or "day"
+    resolution: str = Field(primary_key=True, max_length=8)
+    # Start of the bucket, naive UTC
+    bucket: datetime = Field(primary_key=True)
+    words_added: int = Field(default=0)
+    words_removed: int = Field(default=0)
+    # The project's word count after the bucket's last change
+    word_count: int = Field(default=0)
+    # Saves that changed the word count
+    changes: int = Field(default=0)
@@ -0,0 +1,30 @@
+# backend/app/schemas/backup.py
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class BackupProject(BaseModel):
+    """A project record read from a backup"""
+    title: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = Field(None, max_length=1000)
+    genre: Optional[str] = Field(None, max_length=100)
+    status: str = Field(default="draft")
+    is_private: bool = Field(default=True)
+    target_word_count: Optional[int] = Field(None, ge=0)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    last_edited_at: Optional[datetime] = None
+
+
+class BackupContentVersion(BaseModel):
+    """A content version record read from a backup"""
+    version: int = Field(..., ge=0)
+    content: Optional[str] = None
+    content_file: Optional[str] = Field(None, description="Archive entry holding the text (zip backups)")
+    content_type: str = Field(default="markdown")
+    is_active: bool = Field(default=False)
+    auto_saved: bool = Field(default=False)
+    save_reason: str = Field(default="manual_save")
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
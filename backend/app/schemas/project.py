@@ -1,5 +1,5 @@
 # backend/app/schemas/project.py
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -44,10 +44,11 @@ class ProjectResponse(ProjectBase):
 class ProjectListResponse(BaseModel):
     """Schema for project list response"""
     projects: List[ProjectResponse]
-    total: int
-    page: int
+    total: Optional[int] = Field(None, description="Omitted when include_total=false")
+    page: Optional[int] = Field(None, description="Omitted in cursor mode")
     size: int
-    pages: int
+    pages: Optional[int] = Field(None, description="Omitted when include_total=false")
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to fetch the next page")
 
 
 # Story Content Schemas
@@ -69,12 +70,82 @@ class StoryContentUpdate(BaseModel):
     save_reason: Optional[str] = Field(default="manual_save")
 
 
+class TextEdit(BaseModel):
+    """Replacement of content[start:end] with text, offsets in Unicode code points"""
+    start: int = Field(..., ge=0, description="Start offset of the replaced span")
+    end: int = Field(..., ge=0, description="End offset (exclusive) of the replaced span")
+    text: str = Field(default="", description="Replacement text")
+
+
+class StoryContentPatch(BaseModel):
+    """Schema for incrementally patching story content"""
+    base_hash: str = Field(..., description="content_hash the edits were made against")
+    edits: List[TextEdit] = Field(..., max_length=1000, description="Edits applied in order")
+    auto_saved: bool = Field(default=True)
+    save_reason: str = Field(default="auto_save")
+
+
+class StoryContentPatchResponse(BaseModel):
+    """Schema for the result of a content patch"""
+    project_id: int
+    version: int
+    content_hash: str
+    word_count: int
+    updated_at: datetime
+    changed: bool = Field(default=True, description="False when the edits left the text as it was")
+
+
+class DiffHunk(BaseModel):
+    """Replacement of from_text[from_start:from_end] by to_text[to_start:to_end], offsets in code points"""
+    from_start: int
+    from_end: int
+    to_start: int
+    to_end: int
+    deleted: str
+    inserted: str
+
+
+class ContentDiffResponse(BaseModel):
+    """Schema for the changes between two content versions"""
+    project_id: int
+    from_version: int
+    to_version: int
+    from_hash: str
+    to_hash: str
+    unit: str
+    approximate: bool = Field(..., description="The diff ran out of time; hunks are correct but may be larger than needed")
+    words_added: int
+    words_removed: int
+    hunks: List[DiffHunk] = Field(..., description="In text order; applied last first to the from text they give the to text")
+
+
+class StoryContentVersionInfo(BaseModel):
+    """Schema for a content version's metadata, without its text"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    project_id: int
+    version: int
+    content_type: str
+    content_hash: Optional[str] = None
+    char_count: Optional[int] = None
+    word_count: Optional[int] = None
+    is_active: bool
+    auto_saved: bool
+    save_reason: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
 class StoryContentResponse(StoryContentBase):
     """Schema for story content response"""
     model_config = ConfigDict(from_attributes=True)
     
     id: int
     project_id: int
+    content_hash: Optional[str] = None
+    char_count: Optional[int] = None
+    word_count: Optional[int] = None
     version: int
     is_active: bool
     auto_saved: bool
@@ -83,6 +154,131 @@ class StoryContentResponse(StoryContentBase):
     updated_at: Optional[datetime]
 
 
+class StoryContentSaveResponse(StoryContentResponse):
+    """Schema for the result of a content save"""
+    changed: bool = Field(default=True, description="False when the text matched the stored text and nothing was written")
+
+
 class ProjectWithContent(ProjectResponse):
     """Extended project schema that includes content"""
-    content: Optional[StoryContentResponse] = None
\ No newline at end of file
+    content: Optional[StoryContentResponse] = None
+    content_info: Optional[StoryContentVersionInfo] = None
+
+# Writing Progress Schemas
+class ProgressPoint(BaseModel):
+    """Word-count changes within one interval"""
+    start: datetime = Field(..., description="Start of the interval, UTC")
+    words_added: int
+    words_removed: int
+    net_words: int
+    word_count: int = Field(..., description="Word count after the interval's last change")
+    changes: int = Field(..., description="Saves that changed the word count")
+
+
+class ProgressHistoryResponse(BaseModel):
+    """Schema for a project's writing progress over a range of days"""
+    project_id: int
+    interval: str
+    start: date
+    end: date
+    points: List[ProgressPoint] = Field(..., description="Intervals with changes only, oldest first")
+    words_added: int
+    words_removed: int
+    net_words: int
+    writing_days: int = Field(..., description="Days in the range on which words were added")
+    current_streak: int = Field(..., description="Consecutive writing days up to the end of the range")
+    longest_streak: int = Field(..., description="Longest run of consecutive writing days up to the end of the range")
+
+
+# Text Analytics Schemas
+class SentenceLengthBucket(BaseModel):
+    min_words: int
+    max_words: Optional[int] = Field(None, description="None for the open-ended last bucket")
+    count: int
+
+
+class SentenceLengthStats(BaseModel):
+    """Sentence lengths in words"""
+    count: int
+    mean: float
+    median: float
+    p90: float
+    stdev: float
+    max: int
+    histogram: List[SentenceLengthBucket]
+
+
+class ReadabilityScores(BaseModel):
+    flesch_reading_ease: float = Field(..., description="Higher is easier; 60-70 is plain English")
+    flesch_kincaid_grade: float = Field(..., description="US school grade")
+    gunning_fog: float = Field(..., description="Years of schooling")
+
+
+class WordFrequency(BaseModel):
+    word: str
+    count: int
+    per_thousand: float = Field(..., description="Uses per thousand words")
+
+
+class TextStatsResponse(BaseModel):
+    """Schema for the text analysis of a project's manuscript"""
+    project_id: int
+    content_hash: Optional[str] = Field(None, description="Hash of the analysed text; the same hash gives the same result")
+    word_count: int = Field(..., description="Words as the analyser tokenises them, without numbers or punctuation")
+    unique_words: int
+    lexical_diversity: float = Field(..., description="Unique words per word")
+    character_count: int
+    paragraph_count: int
+    average_word_length: float
+    sentences: SentenceLengthStats
+    readability: ReadabilityScores
+    dialogue_ratio: float = Field(..., description="Share of words inside quotation marks")
+    top_words: List[WordFrequency] = Field(..., description="Most frequent words other than stopwords")
+    overused_words: List[WordFrequency] = Field(..., description="Filler words used more than once per thousand words")
+
+
+# Segment Schemas
+class SegmentCreate(BaseModel):
+    """Schema for adding a chapter or scene"""
+    kind: str = Field(default="scene", pattern="^(chapter|scene)$")
+    title: Optional[str] = Field(None, max_length=255)
+    content: str = Field(default="")
+    parent_id: Optional[int] = Field(None, description="Chapter to add a scene to")
+    position: Optional[int] = Field(None, ge=0, description="Index among its siblings; appended when omitted")
+
+
+class SegmentUpdate(BaseModel):
+    """Schema for saving one segment"""
+    title: Optional[str] = Field(None, max_length=255)
+    content: Optional[str] = None
+    parent_id: Optional[int] = Field(None, description="Move a scene under this chapter")
+    move_to_top_level: bool = Field(default=False, description="Move a scene out of its chapter")
+
+
+class SegmentOrder(BaseModel):
+    """Schema for reordering the children of one parent"""
+    parent_id: Optional[int] = Field(None, description="Chapter whose scenes to reorder; top level when omitted")
+    segment_ids: List[int] = Field(..., description="Every child of the parent, in the new order")
+
+
+class SegmentInfo(BaseModel):
+    """Schema for a segment's metadata, without its text"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    project_id: int
+    parent_id: Optional[int] = None
+    kind: str
+    title: Optional[str] = None
+    position: int
+    content_hash: Optional[str] = None
+    char_count: int
+    word_count: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+
+class SegmentResponse(SegmentInfo):
+    """Schema for a segment with its text"""
+    content: str
+    project_word_count: Optional[int] = Field(None, description="Aggregate word count after a save")
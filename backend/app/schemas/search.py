@@ -0,0 +1,23 @@
+# backend/app/schemas/search.py
+from typing import Optional, List
+from pydantic import BaseModel, Field
+
+
+class SearchResult(BaseModel):
+    """A project matching a full-text search"""
+    project_id: int
+    title: str
+    status: str
+    genre: Optional[str] = None
+    score: float = Field(..., description="BM25 rank, lower is more relevant")
+    title_highlight: str = Field(..., description="Title with matches wrapped in <mark>")
+    snippet: str = Field(..., description="Best matching excerpt with matches wrapped in <mark>")
+
+
+class SearchResponse(BaseModel):
+    """Schema for search results"""
+    results: List[SearchResult]
+    total: int
+    page: int
+    size: int
+    pages: int
@@ -0,0 +1,309 @@
+# backend/benchmarks/load_test.py
+"""HTTP load test simulating concurrent writers.
+
+Boots the API with uvicorn against a temporary SQLite database (or targets a
+running server with --base-url), seeds one user per writer with a few
+projects, then has every writer, concurrently:
+
+* autosave its open manuscript every --autosave-interval seconds,
+* snapshot a version every --version-interval seconds,
+* list its projects every --list-interval seconds,
+* fetch project stats every --stats-interval seconds.
+
+Intervals are jittered so writers do not move in lockstep. The result is
+printed (or written to --output) as JSON: per route, the request and error
+counts, throughput and p50/p95/p99/max latency in milliseconds.
+
+Run from the backend folder, e.g.:
+
+    python benchmarks/load_test.py --writers 20 --duration 60 --output before.json
+
+Compare the JSON of two runs to judge a change.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = "benchmark-password"
+WORDS = (
+    "the rain fell on the harbour while she waited for a ship that would not come "
+    "lanterns swung above the quay and somewhere a bell counted hours nobody kept"
+).split()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def prose(rng: random.Random, words: int) -> str:
+    lines = []
+    for start in range(0, words, 12):
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(min(12, words - start))))
+    return "\n".join(lines)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.recording = False
+
+    async def call(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            if self.recording:
+                self.errors[route] += 1
+                print(f"{route}: {type(e).__name__} after {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            return None
+        elapsed = time.perf_counter() - started
+        if self.recording:
+            self.latencies[route].append(elapsed)
+            self.statuses[route][response.status_code] += 1
+            if response.status_code >= 400:
+                self.errors[route] += 1
+        return response
+
+    def report(self, duration: float) -> dict:
+        routes = {}
+        for route in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies[route])
+            routes[route] = {
+                "requests": len(values),
+                "errors": self.errors[route],
+                "statuses": {str(status): n for status, n in sorted(self.statuses[route].items())},
+                "throughput_rps": round(len(values) / duration, 2),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+            }
+        total = sum(route["requests"] for route in routes.values())
+        return {
+            "duration_seconds": round(duration, 2),
+            "requests": total,
+            "errors": sum(route["errors"] for route in routes.values()),
+            "throughput_rps": round(total / duration, 2),
+            "routes": routes,
+        }
+
+
+def new_client(args, base_url: str) -> httpx.AsyncClient:
+    # One keep-alive connection per writer, like a browser tab
+    return httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=httpx.Limits(max_connections=1))
+
+
+class Writer:
+    def __init__(self, index: int, args, recorder: Recorder, base_url: str):
+        self.index = index
+        self.args = args
+        self.recorder = recorder
+        self.base_url = base_url
+        self.client = new_client(args, base_url)
+        self.rng = random.Random(args.seed * 1000 + index)
+        self.username = f"bench{args.seed}w{index}"
+        self.project_ids: List[int] = []
+        self.text = ""
+
+    async def setup(self) -> None:
+        credentials = {"username": self.username, "password": PASSWORD}
+        await self.client.post("/api/auth/register", json={**credentials, "email": f"{self.username}@example.com"})
+        response = await self.client.post("/api/auth/login", json=credentials)
+        response.raise_for_status()
+        self.client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        for n in range(self.args.projects_per_writer):
+            response = await self.client.post("/api/projects/", json={"title": f"Benchmark novel {n}", "genre": "literary"})
+            response.raise_for_status()
+            project_id = response.json()["id"]
+            self.project_ids.append(project_id)
+            text = prose(self.rng, self.args.manuscript_words)
+            (await self.client.put(f"/api/stories/{project_id}/content", json={"content": text})).raise_for_status()
+            self.text = text
+
+    def _jitter(self, interval: float) -> float:
+        return interval * self.rng.uniform(0.8, 1.2)
+
+    async def call(self, route: str, method: str, url: str, **kwargs) -> None:
+        response = await self.recorder.call(self.client, route, method, url, **kwargs)
+        if response is None or response.status_code >= 500:
+            # A server that failed mid-request may not answer on that connection
+            # again; reconnect so one error is not followed by a string of timeouts
+            headers = self.client.headers
+            await self.client.aclose()
+            self.client = new_client(self.args, self.base_url)
+            self.client.headers.update(headers)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def run(self, deadline: float) -> None:
+        args = self.args
+        # The writer edits the last project it seeded, as an open editor would
+        project_id = self.project_ids[-1]
+        await self.call("GET /api/projects/{id}", "GET", f"/api/projects/{project_id}")
+        now = time.monotonic()
+        due = {
+            "autosave": now + self.rng.uniform(0, args.autosave_interval),
+            "version": now + self.rng.uniform(0, args.version_interval),
+            "list": now + self.rng.uniform(0, args.list_interval),
+            "stats": now + self.rng.uniform(0, args.stats_interval),
+        }
+        while True:
+            action, at = min(due.items(), key=lambda item: item[1])
+            if at >= deadline:
+                return
+            await asyncio.sleep(max(0.0, at - time.monotonic()))
+            if action == "autosave":
+                self.text += " " + prose(self.rng, args.edit_words)
+                await self.call(
+                    "POST /api/stories/{id}/auto-save", "POST",
+                    f"/api/stories/{project_id}/auto-save",
+                    json={"content": self.text, "auto_saved": True, "save_reason": "auto_save"},
+                )
+                due[action] = time.monotonic() + self._jitter(args.autosave_interval)
+            elif action == "version":
+                await self.call(
+                    "POST /api/stories/{id}/content/version", "POST",
+                    f"/api/stories/{project_id}/content/version",
+                )
+                due[action] = time.monotonic() + self._jitter(args.version_interval)
+            elif action == "list":
+                await self.call("GET /api/projects/", "GET", "/api/projects/")
+                due[action] = time.monotonic() + self._jitter(args.list_interval)
+            else:
+                await self.call("GET /api/projects/{id}/stats", "GET", f"/api/projects/{project_id}/stats")
+                due[action] = time.monotonic() + self._jitter(args.stats_interval)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, database: Path) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{database}",
+        "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        "ASYNC_DATABASE": "1" if args.async_database else "0",
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(args.port),
+        "--workers", str(args.workers), "--log-level", "warning",
+    ]
+    if args.workers == 1:
+        # One worker runs as a single process; several share the database file
+        command.remove("--workers")
+        command.remove(str(args.workers))
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout}s")
+
+
+async def benchmark(args, base_url: str) -> dict:
+    recorder = Recorder()
+    writers = [Writer(index, args, recorder, base_url) for index in range(args.writers)]
+    try:
+        # Seed a few writers at a time so setup does not queue on bcrypt
+        for start in range(0, len(writers), 4):
+            await asyncio.gather(*(writer.setup() for writer in writers[start:start + 4]))
+        recorder.recording = True
+        started = time.monotonic()
+        await asyncio.gather(*(writer.run(started + args.duration) for writer in writers))
+        elapsed = time.monotonic() - started
+    finally:
+        await asyncio.gather(*(writer.close() for writer in writers))
+    report = recorder.report(elapsed)
+    report["config"] = {
+        name: getattr(args, name)
+        for name in (
+            "writers", "duration", "autosave_interval", "version_interval", "list_interval",
+            "stats_interval", "projects_per_writer", "manuscript_words", "edit_words",
+            "workers", "async_database", "seed",
+        )
+    }
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--writers", type=int, default=10, help="Concurrent simulated writers")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of measured load")
+    parser.add_argument("--autosave-interval", type=float, default=2.0, help="Seconds between a writer's autosaves")
+    parser.add_argument("--version-interval", type=float, default=30.0, help="Seconds between version snapshots")
+    parser.add_argument("--list-interval", type=float, default=10.0, help="Seconds between project listings")
+    parser.add_argument("--stats-interval", type=float, default=15.0, help="Seconds between stats requests")
+    parser.add_argument("--projects-per-writer", type=int, default=3)
+    parser.add_argument("--manuscript-words", type=int, default=20000, help="Seeded manuscript length")
+    parser.add_argument("--edit-words", type=int, default=40, help="Words typed between autosaves")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed, for reproducible runs")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of starting one")
+    parser.add_argument("--port", type=int, default=0, help="Port for the started server (default: any free port)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--async-database", action="store_true", help="Start the server with ASYNC_DATABASE=1")
+    parser.add_argument("--bcrypt-rounds", type=int, default=4, help="BCRYPT_ROUNDS for the started server")
+    parser.add_argument("--output", help="Write the JSON report here as well as to stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    server = None
+    workdir = None
+    base_url = args.base_url
+    if base_url is None:
+        workdir = tempfile.TemporaryDirectory(prefix="fiction-bench-")
+        args.port = args.port or free_port()
+        base_url = f"http://127.0.0.1:{args.port}"
+        server = start_server(args, Path(workdir.name) / "bench.db")
+    try:
+        asyncio.run(wait_until_ready(base_url))
+        report = asyncio.run(benchmark(args, base_url))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        if workdir is not None:
+            workdir.cleanup()
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    return 0 if report["requests"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
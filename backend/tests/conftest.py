@@ -0,0 +1,39 @@
+import itertools
+import os
+import tempfile
+
+import pytest
+
+# The app binds its engines on import, so the database is chosen first
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+_usernames = (f"writer{n}" for n in itertools.count())
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def client(app_client):
+    """The app's test client, logged in as a new user."""
+    username = next(_usernames)
+    password = "password123"
+    app_client.headers.pop("Authorization", None)
+    app_client.post(
+        "/api/auth/register", json={"username": username, "email": f"{username}@example.com", "password": password}
+    )
+    token = app_client.post("/api/auth/login", json={"username": username, "password": password}).json()["access_token"]
+    app_client.headers["Authorization"] = f"Bearer {token}"
+    return app_client
+
+
+@pytest.fixture
+def project_id(client):
+    return client.post("/api/projects/", json={"title": "Draft"}).json()["id"]
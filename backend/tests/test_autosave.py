@@ -0,0 +1,70 @@
+import pytest
+
+from app.core import autosave
+from app.core.autosave import AutosaveBuffer
+from app.core.database import engine
+
+POISON = "this text cannot be saved"
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    """A buffer without its flusher thread, flushed by the tests themselves."""
+    set_content = autosave.set_content
+
+    def failing_set_content(row, text, *args):
+        if text == POISON:
+            raise ValueError("write failed")
+        set_content(row, text, *args)
+
+    monkeypatch.setattr(autosave, "set_content", failing_set_content)
+    return AutosaveBuffer(engine, flush_interval=3600, max_pending=100, max_pending_bytes=1 << 20, max_attempts=3)
+
+
+def new_project(client, text="Opening words."):
+    project_id = client.post("/api/projects/", json={"title": "Draft"}).json()["id"]
+    client.put(f"/api/stories/{project_id}/content", json={"content": text})
+    return project_id
+
+
+def stored_text(client, project_id):
+    return client.get(f"/api/stories/{project_id}/content").json()["content"]
+
+
+def test_autosaves_coalesce_to_the_latest_text(client, buffer):
+    project_id = new_project(client)
+    assert buffer.submit(project_id, "First draft.")
+    assert buffer.submit(project_id, "Second draft.")
+    assert not buffer.submit(project_id, "Second draft.")
+    assert buffer.busy(project_id)
+
+    assert buffer.flush()
+    assert not buffer.busy(project_id)
+    assert stored_text(client, project_id) == "Second draft."
+    assert not buffer.flush()
+
+
+def test_a_failing_autosave_does_not_hold_back_the_batch(client, buffer):
+    failing, fine = new_project(client), new_project(client)
+    buffer.submit(failing, POISON)
+    buffer.submit(fine, "Saved despite the other one.")
+    buffer.flush()
+    assert stored_text(client, fine) == "Saved despite the other one."
+    # Put back for the next flush
+    assert buffer.busy(failing)
+
+    buffer.submit(failing, "A newer text replaces the failed one.")
+    buffer.flush()
+    assert not buffer.busy(failing)
+    assert stored_text(client, failing) == "A newer text replaces the failed one."
+
+
+def test_an_autosave_is_dropped_after_too_many_attempts(client, buffer):
+    project_id = new_project(client)
+    buffer.submit(project_id, POISON)
+    for _ in range(2):
+        buffer.flush()
+        assert buffer.busy(project_id)
+    buffer.flush()
+    assert not buffer.busy(project_id)
+    assert stored_text(client, project_id) == "Opening words."
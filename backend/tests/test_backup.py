@@ -0,0 +1,80 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from app.core.config import settings
+
+FIRST = "The first draft, long since replaced."
+SECOND = "The second draft, still being written."
+
+
+@pytest.fixture
+def drafted(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": FIRST})
+    client.post(f"/api/stories/{project_id}/content/version")
+    client.put(f"/api/stories/{project_id}/content", json={"content": SECOND})
+    return project_id
+
+
+def import_records(client, backup: bytes):
+    response = client.post("/api/stories/import", content=backup)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def imported_versions(client, records):
+    (project_id,) = [record["project_id"] for record in records if record["type"] == "progress"]
+    versions = client.get(f"/api/stories/{project_id}/content/versions").json()
+    return {
+        version["version"]: client.get(f"/api/stories/{project_id}/content/versions/{version['version']}").json()["content"]
+        for version in versions
+    }
+
+
+@pytest.mark.parametrize("url, fmt", [
+    ("/api/stories/backup", "ndjson"),
+    ("/api/stories/backup", "zip"),
+    ("/api/stories/{project_id}/content/backup", "json"),
+    ("/api/stories/{project_id}/content/backup", "zip"),
+])
+def test_backups_round_trip(client, drafted, url, fmt):
+    backup = client.get(url.format(project_id=drafted), params={"format": fmt})
+    assert backup.status_code == 200
+    records = import_records(client, backup.content)
+    assert records[-1] == {"type": "complete", "projects_imported": 1, "versions_imported": 2}
+    assert imported_versions(client, records) == {1: FIRST, 2: SECOND}
+    assert client.get("/api/projects/").json()["total"] == 2
+
+
+def test_zip_members_past_the_entry_cap_are_refused(client, drafted, monkeypatch):
+    backup = client.get("/api/stories/backup", params={"format": "zip"}).content
+    monkeypatch.setattr(settings, "IMPORT_MAX_ENTRY_BYTES", len(FIRST) - 1)
+    (record,) = import_records(client, backup)
+    assert record["type"] == "error"
+    assert "larger than" in record["detail"]
+    assert record["projects_imported"] == 0
+    assert client.get("/api/projects/").json()["total"] == 1
+
+
+def test_zip_members_must_exist(client):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("backup.ndjson", "\n".join(json.dumps(record) for record in [
+            {"type": "backup", "format_version": 1},
+            {"type": "project", "title": "Lost"},
+            {"type": "content_version", "version": 1, "content_file": "projects/1/versions/1.md"},
+        ]))
+    (record,) = import_records(client, archive.getvalue())
+    assert record == {
+        "type": "error", "detail": "Zip backup is missing projects/1/versions/1.md",
+        "projects_imported": 0, "versions_imported": 0,
+    }
+
+
+def test_malformed_ndjson_names_the_line(client):
+    backup = b'{"type": "backup", "format_version": 1}\n{"type": "project", "title": "Half"}\n{not json\n'
+    (record,) = import_records(client, backup)
+    assert record["type"] == "error"
+    assert record["detail"].startswith("Line 3:")
@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.compression import compress_text, decompress_text
+from app.core.config import settings
+from app.core.database import engine
+
+LONG = "A sentence that repeats, as drafts do. " * 100
+
+
+@pytest.mark.parametrize("codec, marker", [("zlib", b"Z"), ("lzma", b"X")])
+def test_long_text_is_stored_behind_its_codec_marker(monkeypatch, codec, marker):
+    monkeypatch.setattr(settings, "CONTENT_COMPRESSION_CODEC", codec)
+    packed = compress_text(LONG)
+    assert isinstance(packed, bytes) and packed[:1] == marker
+    assert len(packed) < len(LONG)
+    assert decompress_text(packed) == LONG
+
+
+def test_text_under_the_threshold_stays_plain():
+    under = "a" * (settings.CONTENT_COMPRESSION_THRESHOLD - 1)
+    assert compress_text(under) == under
+    assert isinstance(compress_text(under + "a"), bytes)
+    # Rows written before compression have no marker and read back unchanged
+    assert decompress_text(under) == under
+
+
+def test_unknown_markers_are_refused():
+    with pytest.raises(ValueError, match="Unknown compression marker"):
+        decompress_text(b"Q" + LONG.encode())
+
+
+def test_stored_rows_round_trip_with_and_without_the_marker(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": LONG})
+    with Session(engine) as db:
+        stored = db.exec(
+            text("SELECT typeof(content), substr(content, 1, 1) FROM storycontent WHERE project_id = :id"),
+            params={"id": project_id},
+        ).one()
+    assert tuple(stored) == ("blob", b"Z")
+    assert client.get(f"/api/stories/{project_id}/content").json()["content"] == LONG
+
+    # An uncompressed row, as written before compression, still reads back
+    with Session(engine) as db:
+        db.exec(text("UPDATE storycontent SET content = :text WHERE project_id = :id"), params={"text": "Plain.", "id": project_id})
+        db.commit()
+    assert client.get(f"/api/stories/{project_id}/content").json()["content"] == "Plain."
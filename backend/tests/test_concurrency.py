@@ -0,0 +1,25 @@
+import asyncio
+import threading
+
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.concurrency import run_cpu_bound
+from app.core.config import settings
+
+
+def thread_of(text):
+    return threading.get_ident()
+
+
+def test_long_texts_leave_the_event_loop():
+    async def main():
+        short, long = "x", "x" * settings.CPU_OFFLOAD_MIN_CHARS
+        return await greenlet_spawn(lambda: (run_cpu_bound(thread_of, short), run_cpu_bound(thread_of, long)))
+
+    short_thread, long_thread = asyncio.run(main())
+    assert short_thread == threading.get_ident()
+    assert long_thread != threading.get_ident()
+
+
+def test_plain_calls_outside_the_event_loop():
+    assert run_cpu_bound(thread_of, "x" * settings.CPU_OFFLOAD_MIN_CHARS) == threading.get_ident()
@@ -0,0 +1,69 @@
+import uuid
+
+from sqlmodel import Session, select
+
+from app.core.content_store import CHUNK_MAX_SIZE, chunk_refs_of, split_chunks
+from app.core.database import engine
+from app.models.content_chunk import ContentChunk
+
+
+def manuscript(lines=2000, tag=None):
+    tag = tag or uuid.uuid4().hex
+    return "".join(f"Line {n} of manuscript {tag}, with a little more to say.\n" for n in range(lines))
+
+
+def archive(client, project_id, text):
+    """Save ``text`` and start a new version, which archives it into the chunk store."""
+    client.put(f"/api/stories/{project_id}/content", json={"content": text})
+    client.post(f"/api/stories/{project_id}/content/version")
+
+
+def stored_chunks(project_id):
+    with Session(engine) as db:
+        hashes = chunk_refs_of(db, project_id)
+        return hashes, set(db.exec(select(ContentChunk.hash).where(ContentChunk.hash.in_(hashes))).all())
+
+
+def test_split_chunks_cover_the_text_within_the_size_bound():
+    text = manuscript(tag="fixed") + "x" * (CHUNK_MAX_SIZE * 2 + 3)
+    chunks = split_chunks(text)
+    assert "".join(chunks) == text
+    assert len(chunks) > 1
+    assert all(len(chunk) <= CHUNK_MAX_SIZE for chunk in chunks)
+
+
+def test_an_edit_only_changes_the_chunks_around_it():
+    text = manuscript(tag="fixed")
+    edited = text.replace("Line 1500 ", "Line fifteen hundred ")
+    before, after = set(split_chunks(text)), set(split_chunks(edited))
+    assert len(before) > 10
+    assert len(before - after) == 1
+
+
+def test_archived_versions_read_back(client, project_id):
+    text = manuscript()
+    archive(client, project_id, text)
+    assert client.get(f"/api/stories/{project_id}/content/versions/1").json()["content"] == text
+    hashes, stored = stored_chunks(project_id)
+    assert hashes and stored == hashes
+
+
+def test_deleting_a_project_sweeps_only_its_own_chunks(client):
+    text = manuscript()
+    first = client.post("/api/projects/", json={"title": "First"}).json()["id"]
+    second = client.post("/api/projects/", json={"title": "Second"}).json()["id"]
+    archive(client, first, text)
+    archive(client, second, text + "A closing line.\n")
+    first_hashes, _ = stored_chunks(first)
+    second_hashes, _ = stored_chunks(second)
+    assert len(first_hashes & second_hashes) >= len(first_hashes) - 1
+
+    client.delete(f"/api/projects/{first}")
+    with Session(engine) as db:
+        left = set(db.exec(select(ContentChunk.hash).where(ContentChunk.hash.in_(first_hashes))).all())
+    assert left == first_hashes & second_hashes
+    assert client.get(f"/api/stories/{second}/content/versions/1").json()["content"] == text + "A closing line.\n"
+
+    client.delete(f"/api/projects/{second}")
+    with Session(engine) as db:
+        assert not db.exec(select(ContentChunk.hash).where(ContentChunk.hash.in_(second_hashes))).all()
@@ -0,0 +1,46 @@
+import pytest
+
+
+@pytest.fixture
+def content_url(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": "The first line."})
+    return f"/api/stories/{project_id}/content"
+
+
+def test_current_copies_are_not_sent_again(client, content_url):
+    loaded = client.get(content_url)
+    etag = loaded.headers["ETag"]
+    assert loaded.headers["Cache-Control"] == "private, no-cache"
+    for header in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+        revalidated = client.get(content_url, headers={"If-None-Match": header})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["ETag"] == etag
+        assert revalidated.content == b""
+    assert client.get(content_url, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_saves_over_a_newer_text_are_refused(client, content_url):
+    etag = client.get(content_url).headers["ETag"]
+    saved = client.put(content_url, json={"content": "The second line."}, headers={"If-Match": etag})
+    assert saved.status_code == 200
+    assert saved.headers["ETag"] != etag
+
+    # Another tab still holds the first ETag
+    refused = client.put(content_url, json={"content": "An older tab's line."}, headers={"If-Match": etag})
+    assert refused.status_code == 412
+    assert refused.headers["ETag"] == saved.headers["ETag"]
+    # If-Match uses strong comparison
+    weak = client.put(content_url, json={"content": "A weak match."}, headers={"If-Match": f"W/{saved.headers['ETag']}"})
+    assert weak.status_code == 412
+    assert client.get(content_url).json()["content"] == "The second line."
+
+
+def test_if_match_star_matches_any_text(client, content_url):
+    assert client.put(content_url, json={"content": "Any line."}, headers={"If-Match": "*"}).status_code == 200
+
+
+def test_projects_revalidate(client, project_id):
+    etag = client.get(f"/api/projects/{project_id}").headers["ETag"]
+    assert client.get(f"/api/projects/{project_id}", headers={"If-None-Match": etag}).status_code == 304
+    client.put(f"/api/projects/{project_id}", json={"title": "Renamed"})
+    assert client.get(f"/api/projects/{project_id}", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,70 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.http_compression import INFLATE_STEP, CompressionMiddleware
+
+LIMIT = 1024 * 1024
+
+
+async def body_length(request: Request):
+    return PlainTextResponse(str(len(await request.body())))
+
+
+@pytest.fixture(scope="module")
+def echo_client():
+    app = Starlette(routes=[Route("/", body_length, methods=["POST"])])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, content_types=("text/",), max_request_bytes=LIMIT)
+    with TestClient(app) as client:
+        yield client
+
+
+def post(client, body: bytes, encoding: str):
+    return client.post("/", content=body, headers={"Content-Encoding": encoding})
+
+
+def test_compressed_bodies_reach_the_route_inflated(echo_client):
+    size = 3 * INFLATE_STEP + 5
+    response = post(echo_client, gzip.compress(b"a" * size), "gzip")
+    assert response.status_code == 200
+    assert response.text == str(size)
+
+
+def test_gzip_bombs_are_refused(echo_client):
+    response = post(echo_client, gzip.compress(b"\0" * (LIMIT + 1)), "gzip")
+    assert response.status_code == 413
+
+
+def test_zstd_bombs_are_refused(echo_client):
+    zstandard = pytest.importorskip("zstandard")
+    response = post(echo_client, zstandard.ZstdCompressor().compress(b"\0" * (LIMIT + 1)), "zstd")
+    assert response.status_code == 413
+
+
+def test_malformed_bodies_are_refused(echo_client):
+    assert post(echo_client, gzip.compress(b"text")[:-4], "gzip").status_code == 400
+    assert post(echo_client, b"text", "br").status_code == 415
+
+
+def test_compressed_responses_carry_a_coded_etag(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": "All the words. " * 200})
+    plain = client.get(f"/api/stories/{project_id}/content", headers={"Accept-Encoding": "identity"})
+    compressed = client.get(f"/api/stories/{project_id}/content", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+
+    revalidated = client.get(
+        f"/api/stories/{project_id}/content", headers={"If-None-Match": compressed.headers["ETag"]}
+    )
+    assert revalidated.status_code == 304
+    saved = client.put(
+        f"/api/stories/{project_id}/content",
+        json={"content": "Fewer words."},
+        headers={"If-Match": compressed.headers["ETag"]},
+    )
+    assert saved.status_code == 200
@@ -0,0 +1,46 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from app.core.progress import rollup, streaks
+
+
+def bucket(day, added, removed, word_count):
+    return SimpleNamespace(
+        bucket=datetime(2026, 3, day), words_added=added, words_removed=removed, word_count=word_count, changes=1,
+    )
+
+
+def test_streaks():
+    days = [date(2026, 3, d) for d in (1, 2, 3, 5, 6)]
+    assert streaks(days, date(2026, 3, 6)) == (2, 3)
+    # Today's writing may still come
+    assert streaks(days, date(2026, 3, 7)) == (2, 3)
+    assert streaks(days, date(2026, 3, 8)) == (0, 3)
+    assert streaks([], date(2026, 3, 8)) == (0, 0)
+
+
+def test_rollup_by_week():
+    # 2026-03-01 is a Sunday, so it closes the week before the others
+    rows = [bucket(1, 10, 0, 10), bucket(2, 5, 2, 13), bucket(4, 0, 3, 10)]
+    points = rollup(rows, "week")
+    assert [(p["start"], p["words_added"], p["words_removed"], p["net_words"], p["word_count"], p["changes"])
+            for p in points] == [
+        (datetime(2026, 2, 23), 10, 0, 10, 10, 1),
+        (datetime(2026, 3, 2), 5, 5, 0, 10, 2),
+    ]
+
+
+def test_rollup_by_day_keeps_buckets():
+    rows = [bucket(1, 10, 0, 10), bucket(2, 5, 2, 13)]
+    assert [p["word_count"] for p in rollup(rows, "day")] == [10, 13]
+
+
+def test_imports_are_not_writing(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": "five words of the draft"})
+    backup = client.get(f"/api/stories/{project_id}/content/backup", params={"format": "ndjson"}).content
+    client.post("/api/stories/import", content=backup)
+    imported = client.get("/api/projects/").json()["projects"][0]
+    assert imported["id"] != project_id and imported["word_count"] == 5
+    history = client.get(f"/api/projects/{imported['id']}/stats/history").json()
+    assert (history["points"], history["words_added"], history["writing_days"]) == ([], 0, 0)
+    assert client.get(f"/api/projects/{project_id}/stats/history").json()["words_added"] == 5
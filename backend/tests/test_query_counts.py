@@ -0,0 +1,40 @@
+from app.core.query_tracking import assert_max_queries
+
+
+def test_auto_save(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": "one two"})
+    with assert_max_queries(3):
+        response = client.post(f"/api/stories/{project_id}/auto-save", json={"content": "one two three"})
+    assert response.json()["changed"] is True
+
+
+def test_content_get(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": "one two"})
+    with assert_max_queries(2):
+        response = client.get(f"/api/stories/{project_id}/content")
+    assert response.json()["content"] == "one two"
+
+
+def test_project_list(client):
+    for n in range(5):
+        client.post("/api/projects/", json={"title": f"Draft {n}"})
+    with assert_max_queries(2):
+        response = client.get("/api/projects/")
+    assert len(response.json()["projects"]) == 5
+
+
+def test_restore(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": "one two"})
+    client.post(f"/api/stories/{project_id}/content/version")
+    client.put(f"/api/stories/{project_id}/content", json={"content": "one two three"})
+    with assert_max_queries(16):
+        response = client.post(f"/api/stories/{project_id}/content/restore/1")
+    assert response.status_code == 200
+    assert client.get(f"/api/projects/{project_id}").json()["word_count"] == 2
+
+
+def test_unchanged_save_reads_only(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": "one two"})
+    with assert_max_queries(3):
+        response = client.put(f"/api/stories/{project_id}/content", json={"content": "one two"})
+    assert response.json()["changed"] is False
@@ -0,0 +1,28 @@
+from sqlmodel import SQLModel, create_engine
+
+from app.core.query_plans import check_query_plans, hot_queries, plan_problems
+
+
+def test_hot_queries_use_indexes():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with engine.connect() as connection:
+        assert check_query_plans(connection) == {}
+
+
+def test_every_scan_is_a_problem_unless_allowed():
+    index_scan = "SCAN project USING INDEX ix_project_user_id_sort_key"
+    assert plan_problems(["SCAN project"]) == ["scan: SCAN project"]
+    assert plan_problems([index_scan]) == [f"scan: {index_scan}"]
+    assert plan_problems([f"{index_scan.replace('INDEX', 'COVERING INDEX')}"])
+    assert plan_problems([index_scan], allowed_scans=(index_scan,)) == []
+    assert plan_problems(["SEARCH project USING INTEGER PRIMARY KEY (rowid=?)"]) == []
+
+
+def test_temp_sorts_need_allowing():
+    assert plan_problems(["USE TEMP B-TREE FOR ORDER BY"])
+    assert plan_problems(["USE TEMP B-TREE FOR ORDER BY"], allow_temp_sort=True) == []
+
+
+def test_hot_paths_are_registered():
+    assert {"content.active", "projects.list", "projects.list_cursor", "projects.content_stale"} <= set(hot_queries)
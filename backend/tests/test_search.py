@@ -0,0 +1,46 @@
+import pytest
+
+from app.core.search_index import build_match_query
+
+
+def search(client, q):
+    response = client.get("/api/search/", params={"q": q})
+    assert response.status_code == 200
+    return [result["project_id"] for result in response.json()["results"]]
+
+
+@pytest.fixture
+def lighthouse(client):
+    project_id = client.post(
+        "/api/projects/", json={"title": "The Lighthouse Keeper", "description": "A quiet café by the sea"}
+    ).json()["id"]
+    client.put(f"/api/stories/{project_id}/content", json={"content": "She kept the tide-pool's secrets."})
+    return project_id
+
+
+def test_words_are_quoted_and_the_last_is_a_prefix():
+    assert build_match_query('keeper "tide" OR NEAR(x') == '"keeper" "tide" "OR" "NEAR" "x"*'
+    assert build_match_query('* - ( ) : ^ "') is None
+
+
+@pytest.mark.parametrize("q", ['"tide', "tide-pool", "NEAR(tide", "title:keeper", "^tide", "tide AND", "(", "*"])
+def test_operator_characters_never_break_a_search(client, lighthouse, q):
+    search(client, q)
+
+
+def test_matches(client, lighthouse):
+    assert search(client, "tide-pool") == [lighthouse]
+    assert search(client, "lightho") == [lighthouse]
+    assert search(client, "cafe") == [lighthouse]
+    # Operators are plain words, and every word is required
+    assert search(client, "keeper NOT") == []
+
+
+def test_only_the_callers_projects_are_found(client, lighthouse):
+    client.headers.pop("Authorization")
+    client.post(
+        "/api/auth/register", json={"username": "searcher", "email": "searcher@example.com", "password": "password123"}
+    )
+    token = client.post("/api/auth/login", json={"username": "searcher", "password": "password123"}).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    assert search(client, "lighthouse") == []
@@ -0,0 +1,89 @@
+from sqlmodel import Session
+
+from app.core.autosave import autosave_buffer
+from app.core.database import engine
+from app.models.project import Project
+
+
+def is_stale(project_id):
+    with Session(engine) as db:
+        return db.get(Project, project_id).content_stale
+
+
+def add_scene(client, project_id, text):
+    response = client.post(f"/api/stories/{project_id}/segments", json={"kind": "scene", "content": text})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_timer_flushes_leave_the_manuscript_to_its_readers(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": "Opening words."})
+    add_scene(client, project_id, "A zebra crossing.")
+    autosave_buffer.flush()
+    assert is_stale(project_id)
+    content = client.get(f"/api/stories/{project_id}/content").json()["content"]
+    assert content == "Opening words.\n\nA zebra crossing."
+    assert not is_stale(project_id)
+
+
+def test_search_rebuilds_stale_manuscripts(client, project_id):
+    add_scene(client, project_id, "The quokka smiled.")
+    assert is_stale(project_id)
+    results = client.get("/api/search/", params={"q": "quokka"}).json()["results"]
+    assert [result["project_id"] for result in results] == [project_id]
+    listed = client.get("/api/projects/", params={"search": "quokka"}).json()["projects"]
+    assert [project["id"] for project in listed] == [project_id]
+
+
+def manuscript(client, project_id):
+    return client.get(f"/api/stories/{project_id}/content").json()["content"]
+
+
+def test_segment_crud(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": "Opening words."})
+    chapter = client.post(f"/api/stories/{project_id}/segments", json={"kind": "chapter", "content": "Chapter two."}).json()
+    scene = client.post(
+        f"/api/stories/{project_id}/segments", json={"content": "one two three", "parent_id": chapter["id"]}
+    ).json()
+    assert scene["project_word_count"] == 7
+    # The text from before segmenting becomes the first chapter
+    seed, listed_chapter, listed_scene = client.get(f"/api/stories/{project_id}/segments").json()
+    assert (seed["kind"], seed["word_count"]) == ("chapter", 2)
+    assert [listed_chapter["id"], listed_scene["id"]] == [chapter["id"], scene["id"]]
+    assert manuscript(client, project_id) == "Opening words.\n\nChapter two.\n\none two three"
+
+    url = f"/api/stories/{project_id}/segments/{scene['id']}"
+    etag = client.get(url).headers["ETag"]
+    saved = client.put(url, json={"content": "one two"}, headers={"If-Match": etag})
+    assert saved.json()["project_word_count"] == 6
+    assert client.put(url, json={"content": "lost"}, headers={"If-Match": etag}).status_code == 412
+
+    order = client.put(
+        f"/api/stories/{project_id}/segments/order", json={"segment_ids": [chapter["id"], seed["id"]]}
+    ).json()
+    assert [segment["id"] for segment in order] == [chapter["id"], scene["id"], seed["id"]]
+    assert manuscript(client, project_id) == "Chapter two.\n\none two\n\nOpening words."
+
+    deleted = client.delete(f"/api/stories/{project_id}/segments/{chapter['id']}").json()
+    assert deleted["segments_deleted"] == 2
+    assert client.get(url).status_code == 404
+    assert manuscript(client, project_id) == "Opening words."
+    assert client.get(f"/api/projects/{project_id}").json()["word_count"] == 2
+
+
+def test_whole_text_writes_are_refused_once_segmented(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": "Opening words."})
+    client.post(f"/api/stories/{project_id}/content/version")
+    add_scene(client, project_id, "A scene.")
+    content = client.get(f"/api/stories/{project_id}/content").json()
+    writes = [
+        client.put(f"/api/stories/{project_id}/content", json={"content": "Replaced."}),
+        client.post(f"/api/stories/{project_id}/auto-save", json={"content": "Replaced."}),
+        client.patch(
+            f"/api/stories/{project_id}/content",
+            json={"base_hash": content["content_hash"], "edits": [{"start": 0, "end": 0, "text": "New. "}]},
+        ),
+        client.post(f"/api/stories/{project_id}/content/restore/1"),
+    ]
+    assert [response.status_code for response in writes] == [409] * 4
+    assert manuscript(client, project_id) == "Opening words.\n\nA scene."
@@ -0,0 +1,62 @@
+import pytest
+
+from app.core.text_analytics import analyse_text, count_syllables
+
+TEXT = 'The cat sat. The cat really ran!\n\n"Stop," she said. "Really, really stop."'
+
+
+@pytest.fixture(scope="module")
+def analysis():
+    return analyse_text(TEXT)
+
+
+@pytest.mark.parametrize("word, syllables", [("the", 1), ("really", 2), ("stone", 1), ("table", 2), ("don't", 1)])
+def test_syllables(word, syllables):
+    assert count_syllables(word) == syllables
+
+
+def test_counts(analysis):
+    assert analysis["word_count"] == 13
+    assert analysis["unique_words"] == 8
+    assert analysis["lexical_diversity"] == round(8 / 13, 4)
+    assert analysis["character_count"] == len(TEXT)
+    assert analysis["paragraph_count"] == 2
+    assert analysis["average_word_length"] == round(51 / 13, 2)
+
+
+def test_sentences(analysis):
+    sentences = analysis["sentences"]
+    # "The cat sat", "The cat really ran", "Stop she said", "Really really stop"
+    assert (sentences["count"], sentences["mean"], sentences["median"], sentences["max"]) == (4, 3.25, 3.0, 4)
+    assert sentences["histogram"][0] == {"min_words": 1, "max_words": 5, "count": 4}
+    assert sum(bucket["count"] for bucket in sentences["histogram"]) == 4
+
+
+def test_readability(analysis):
+    words_per_sentence, syllables_per_word = 13 / 4, 16 / 13
+    assert analysis["readability"]["flesch_reading_ease"] == round(
+        206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 2
+    )
+
+
+def test_dialogue_and_word_lists(analysis):
+    # "Stop", then "Really, really stop"
+    assert analysis["dialogue_ratio"] == round(4 / 13, 4)
+    assert [(word["word"], word["count"]) for word in analysis["top_words"]] == [
+        ("really", 3), ("cat", 2), ("stop", 2), ("sat", 1), ("ran", 1), ("said", 1),
+    ]
+    assert analysis["overused_words"] == [{"word": "really", "count": 3, "per_thousand": round(3000 / 13, 2)}]
+
+
+def test_empty_text():
+    empty = analyse_text("")
+    assert empty["word_count"] == empty["sentences"]["count"] == 0
+    assert empty["readability"]["flesch_reading_ease"] == 0.0
+
+
+def test_endpoint(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": TEXT})
+    stats = client.get(f"/api/projects/{project_id}/stats/text", params={"top": 2}).json()
+    assert stats["word_count"] == 13
+    assert [word["word"] for word in stats["top_words"]] == ["really", "cat"]
+    assert stats["content_hash"] == client.get(f"/api/stories/{project_id}/content").json()["content_hash"]
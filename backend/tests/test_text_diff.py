@@ -0,0 +1,44 @@
+import pytest
+
+from app.core import text_diff
+from app.core.text_diff import diff_texts
+
+
+def apply(text, diff):
+    for hunk in reversed(diff["hunks"]):
+        assert text[hunk["from_start"]:hunk["from_end"]] == hunk["deleted"]
+        text = text[:hunk["from_start"]] + hunk["inserted"] + text[hunk["from_end"]:]
+    return text
+
+
+PAIRS = [
+    ("", ""),
+    ("", "new text"),
+    ("old text", ""),
+    ("the cat sat", "the cat sat"),
+    ("the cat sat on the mat", "the dog sat on a mat"),
+    ("First.\n\nSecond para here.\n\nThird.", "First.\n\nSecond paragraph here, longer.\n\nThird.\n\nFourth."),
+    ("a b c d e f", "f e d c b a"),
+]
+
+
+@pytest.mark.parametrize("unit", ["word", "paragraph"])
+@pytest.mark.parametrize("text_a, text_b", PAIRS)
+def test_hunks_give_the_new_text(text_a, text_b, unit):
+    diff = diff_texts(text_a, text_b, unit)
+    assert apply(text_a, diff) == text_b
+    assert not diff["approximate"]
+
+
+def test_word_counts():
+    diff = diff_texts("the cat sat on the mat", "the dog sat on a mat", "word")
+    assert [(hunk["deleted"], hunk["inserted"]) for hunk in diff["hunks"]] == [("cat ", "dog "), ("the ", "a ")]
+    assert diff["words_added"] == diff["words_removed"] == 2
+
+
+def test_timeout_gives_a_correct_approximate_diff(monkeypatch):
+    monkeypatch.setattr(text_diff.settings, "DIFF_TIMEOUT", -1)
+    text_a, text_b = "one two three four ", "two one four three "
+    diff = diff_texts(text_a, text_b, "word")
+    assert diff["approximate"]
+    assert apply(text_a, diff) == text_b
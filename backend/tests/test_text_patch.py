@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.text_patch import apply_edit, apply_edits
+
+
+def edit(start, end, text=""):
+    return SimpleNamespace(start=start, end=end, text=text)
+
+
+@pytest.mark.parametrize("text, start, end, replacement", [
+    ("hello brave world", 6, 11, "new"),
+    ("hello brave world", 6, 11, ""),
+    ("hello brave world", 5, 6, ""),
+    ("hello brave world", 3, 3, " "),
+    ("hello", 0, 0, "oh "),
+    ("hello", 5, 5, "\n\nmore words"),
+    ("", 0, 0, "   "),
+    ("a  b", 1, 3, "x"),
+])
+def test_delta_matches_recount(text, start, end, replacement):
+    new_text, delta = apply_edit(text, start, end, replacement)
+    assert new_text == text[:start] + replacement + text[end:]
+    assert delta == len(new_text.split()) - len(text.split())
+
+
+def test_edits_apply_in_order():
+    text, delta = apply_edits("hello brave world", [edit(6, 11, "new"), edit(0, 0, "Oh, ")])
+    assert text == "Oh, hello new world"
+    assert delta == 1
+
+
+def test_edit_outside_the_text():
+    with pytest.raises(ValueError):
+        apply_edits("short", [edit(0, 99)])
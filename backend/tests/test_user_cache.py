@@ -0,0 +1,55 @@
+from passlib.hash import bcrypt
+from sqlmodel import Session, select
+
+from app.cli import main as cli
+from app.core.config import settings
+from app.core.database import engine
+from app.models.user import User
+
+
+def current_username(client):
+    return client.get("/api/users/profile").json()["username"]
+
+
+def stored_user(username):
+    with Session(engine) as db:
+        return db.exec(select(User).where(User.username == username)).one()
+
+
+def test_profile_updates_replace_the_cached_user(client):
+    username = current_username(client)
+    client.put("/api/users/profile", json={"email": f"new-{username}@example.com"})
+    assert client.get("/api/users/profile").json()["email"] == f"new-{username}@example.com"
+
+
+def test_rehashed_passwords_are_not_overwritten_by_the_cached_user(client):
+    username = current_username(client)
+    with Session(engine) as db:
+        user = db.exec(select(User).where(User.username == username)).one()
+        user.password_hash = bcrypt.using(rounds=4 if settings.BCRYPT_ROUNDS != 4 else 5).hash("password123")
+        db.add(user)
+        db.commit()
+
+    assert client.post("/api/auth/login", json={"username": username, "password": "password123"}).status_code == 200
+    rehashed = stored_user(username).password_hash
+    assert bcrypt.from_string(rehashed).rounds == settings.BCRYPT_ROUNDS
+
+    # The update saves the user the auth cache hands it
+    client.put("/api/users/profile", json={"email": f"other-{username}@example.com"})
+    assert stored_user(username).password_hash == rehashed
+
+
+def test_deactivation_revokes_tokens_at_once(client):
+    username = current_username(client)
+    assert client.post("/api/users/deactivate").status_code == 200
+    assert client.get("/api/users/profile").status_code == 401
+    assert client.post("/api/auth/login", json={"username": username, "password": "password123"}).status_code == 403
+
+
+def test_cli_deactivation(client, capsys):
+    username = current_username(client)
+    assert cli(["deactivate-user", username]) == 0
+    assert not stored_user(username).is_active
+    assert cli(["deactivate-user", username, "--reactivate"]) == 0
+    assert stored_user(username).is_active
+    assert cli(["deactivate-user", "nobody-by-this-name"]) == 1
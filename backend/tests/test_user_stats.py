@@ -0,0 +1,45 @@
+def dashboard(client):
+    return client.get("/api/users/dashboard").json()["stats"]
+
+
+def test_new_projects_count_but_are_not_writing(client):
+    client.post("/api/projects/", json={"title": "One"})
+    client.post("/api/projects/", json={"title": "Two", "status": "in_progress"})
+    stats = dashboard(client)
+    assert stats["projects"] == 2
+    assert stats["projects_by_status"] == {"draft": 1, "in_progress": 1}
+    assert stats["words_today"] == 0
+    assert stats["last_activity_at"] is not None
+
+
+def test_saves_move_the_totals(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": "one two three"})
+    assert dashboard(client)["word_count"] == dashboard(client)["words_today"] == 3
+    client.put(f"/api/stories/{project_id}/content", json={"content": "one"})
+    stats = dashboard(client)
+    assert stats["word_count"] == 1
+    assert stats["words_today"] == 1
+
+
+def test_status_changes_and_deletes(client, project_id):
+    other = client.post("/api/projects/", json={"title": "Other"}).json()["id"]
+    client.put(f"/api/stories/{other}/content", json={"content": "four more words here"})
+    client.put(f"/api/projects/{project_id}", json={"status": "completed"})
+    assert dashboard(client)["projects_by_status"] == {"completed": 1, "draft": 1}
+    client.delete(f"/api/projects/{other}")
+    stats = dashboard(client)
+    assert stats["projects"] == 1
+    assert stats["projects_by_status"] == {"completed": 1}
+    assert stats["word_count"] == 0
+    # Deleting a project moves the total but not the day's writing
+    assert stats["words_today"] == 4
+
+
+def test_imports_are_not_writing(client, project_id):
+    client.put(f"/api/stories/{project_id}/content", json={"content": "five words of the draft"})
+    backup = client.get("/api/stories/backup").content
+    assert client.post("/api/stories/import", content=backup).status_code == 200
+    stats = dashboard(client)
+    assert stats["projects"] == 2
+    assert stats["word_count"] == 10
+    assert stats["words_today"] == 5
@@ -1,6 +1,6 @@
 // frontend/src/hooks/useStoryContent.tsx
 import { useState, useEffect, useCallback, useRef } from 'react';
-import { ProjectEditorState, StoryContent } from '../types/project-types';
+import { ProjectEditorState, StoryContent, StoryContentVersionInfo } from '../types/project-types';
 import { handleApiError, AutoSaveManager, projectAPI } from '../services/project-api';
 
 export const useStoryContent = (projectId: number, autoSaveDelay: number = 3000) => {
@@ -151,7 +151,7 @@ export const useStoryContent = (projectId: number, autoSaveDelay: number = 3000)
 };
 
 export const useContentVersions = (projectId: number) => {
-  const [versions, setVersions] = useState<StoryContent[]>([]);
+  const [versions, setVersions] = useState<StoryContentVersionInfo[]>([]);
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | undefined>();
 
@@ -17,8 +17,11 @@ interface DashboardData {
   };
   stats: {
     projects: number;
+    projects_by_status: Record<string, number>;
     characters: number;
     word_count: number;
+    words_today: number;
+    last_activity_at: string | null;
   };
 }
 
@@ -26,6 +29,7 @@ interface UserStats {
   totalProjects: number;
   totalWords: number;
   averageWordsPerProject: number;
+  wordsToday: number;
   lastUpdated: string;
 }
 
@@ -43,6 +47,7 @@ const Dashboard: React.FC = () => {
     totalProjects: 0,
     totalWords: 0,
     averageWordsPerProject: 0,
+    wordsToday: 0,
     lastUpdated: new Date().toISOString(),
   });
   const navigate = useNavigate();
@@ -72,19 +77,19 @@ const Dashboard: React.FC = () => {
     }
   };
 
-  // Calculate stats from projects (if available)
+  // Totals come from the server, which counts every project rather than the first page
   useEffect(() => {
-    if (projects.length > 0) {
-      const totalWords = projects.reduce((sum, project) => sum + (project.word_count || 0), 0);
-      const avgWords = Math.round(totalWords / projects.length);
+    if (dashboardData) {
+      const { projects: totalProjects, word_count: totalWords, words_today, last_activity_at } = dashboardData.stats;
       setStats({
-        totalProjects: projects.length,
+        totalProjects,
         totalWords,
-        averageWordsPerProject: avgWords,
-        lastUpdated: new Date().toISOString(),
+        averageWordsPerProject: totalProjects > 0 ? Math.round(totalWords / totalProjects) : 0,
+        wordsToday: words_today,
+        lastUpdated: last_activity_at ?? new Date().toISOString(),
       });
     }
-  }, [projects]);
+  }, [dashboardData]);
 
   const handleLogout = async () => {
     await logout();
@@ -129,6 +134,7 @@ const Dashboard: React.FC = () => {
             <div className="stat-card"><h3>{stats.totalProjects}</h3><p>Total Projects</p></div>
             <div className="stat-card"><h3>{stats.totalWords.toLocaleString()}</h3><p>Total Words Written</p></div>
             <div className="stat-card"><h3>{stats.averageWordsPerProject.toLocaleString()}</h3><p>Average Words per Project</p></div>
+            <div className="stat-card"><h3>{stats.wordsToday.toLocaleString()}</h3><p>Words Today</p></div>
             <div className="stat-card"><h3>{new Date(stats.lastUpdated).toLocaleDateString()}</h3><p>Last Updated</p></div>
           </div>
         </section>
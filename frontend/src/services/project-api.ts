@@ -1,15 +1,24 @@
 import axios from 'axios';
 import {
+  ContentDiff,
+  DiffUnit,
   Project,
   ProjectCreate,
   ProjectUpdate,
   ProjectWithContent,
   ProjectListResponse,
   ProjectStats,
+  ProgressHistory,
+  ProgressInterval,
   ProjectBackup,
   ProjectFilters,
+  Segment,
+  SegmentCreate,
+  SegmentUpdate,
   StoryContent,
   StoryContentUpdate,
+  StoryContentVersionInfo,
+  TextStats,
 } from '../types/project-types';
 
 // Get the API base URL from environment or default
@@ -30,6 +39,20 @@ apiClient.interceptors.request.use(config => {
   return config;
 });
 
+// Manuscript bodies at least this large are gzipped before upload
+const COMPRESS_UPLOAD_MIN_BYTES = 16 * 1024;
+
+// Gzip a JSON body when the browser can; the server inflates it transparently
+async function compressedJson(data: unknown): Promise<{ body: unknown; headers: Record<string, string> }> {
+  const json = JSON.stringify(data);
+  if (typeof CompressionStream === 'undefined' || json.length < COMPRESS_UPLOAD_MIN_BYTES) {
+    return { body: data, headers: {} };
+  }
+  const stream = new Blob([json]).stream().pipeThrough(new CompressionStream('gzip'));
+  const body = await new Response(stream).arrayBuffer();
+  return { body, headers: { 'Content-Encoding': 'gzip', 'Content-Type': 'application/json' } };
+}
+
 // Handle response errors globally
 apiClient.interceptors.response.use(
   response => response,
@@ -83,34 +106,90 @@ export const projectAPI = {
     const response = await apiClient.get<ProjectStats>(`/projects/${projectId}/stats`);
     return response.data;
   },
+  async getProjectProgress(
+    projectId: number,
+    params: { interval?: ProgressInterval; start?: string; end?: string } = {},
+  ): Promise<ProgressHistory> {
+    const response = await apiClient.get<ProgressHistory>(`/projects/${projectId}/stats/history`, { params });
+    return response.data;
+  },
+  async getProjectTextStats(projectId: number, top?: number): Promise<TextStats> {
+    const response = await apiClient.get<TextStats>(`/projects/${projectId}/stats/text`, { params: { top } });
+    return response.data;
+  },
   async getStoryContent(projectId: number): Promise<StoryContent> {
     const response = await apiClient.get<StoryContent>(`/stories/${projectId}/content`);
     return response.data;
   },
   async saveStoryContent(projectId: number, contentData: StoryContentUpdate): Promise<StoryContent> {
-    const response = await apiClient.put<StoryContent>(`/stories/${projectId}/content`, contentData);
+    const { body, headers } = await compressedJson(contentData);
+    const response = await apiClient.put<StoryContent>(`/stories/${projectId}/content`, body, { headers });
     return response.data;
   },
-  async autoSaveStoryContent(projectId: number, content: string): Promise<{ message: string }> {
-    const response = await apiClient.post<{ message: string }>(`/stories/${projectId}/auto-save`, {
+  async autoSaveStoryContent(projectId: number, content: string): Promise<{ message: string; changed: boolean }> {
+    const { body, headers } = await compressedJson({
       content,
       auto_saved: true,
       save_reason: 'auto_save',
     });
+    const response = await apiClient.post<{ message: string; changed: boolean }>(`/stories/${projectId}/auto-save`, body, { headers });
     return response.data;
   },
   async createContentVersion(projectId: number): Promise<StoryContent> {
     const response = await apiClient.post<StoryContent>(`/stories/${projectId}/content/version`);
     return response.data;
   },
-  async getContentVersions(projectId: number): Promise<StoryContent[]> {
-    const response = await apiClient.get<StoryContent[]>(`/stories/${projectId}/content/versions`);
+  async getContentVersions(projectId: number): Promise<StoryContentVersionInfo[]> {
+    const response = await apiClient.get<StoryContentVersionInfo[]>(`/stories/${projectId}/content/versions`);
+    return response.data;
+  },
+  async getContentVersion(projectId: number, version: number): Promise<StoryContent> {
+    const response = await apiClient.get<StoryContent>(`/stories/${projectId}/content/versions/${version}`);
+    return response.data;
+  },
+  async getContentDiff(
+    projectId: number,
+    fromVersion: number,
+    toVersion?: number,
+    unit: DiffUnit = 'word',
+  ): Promise<ContentDiff> {
+    const response = await apiClient.get<ContentDiff>(`/stories/${projectId}/content/diff`, {
+      params: { from: fromVersion, to: toVersion, unit },
+    });
     return response.data;
   },
   async restoreContentVersion(projectId: number, version: number): Promise<{ message: string }> {
     const response = await apiClient.post<{ message: string }>(`/stories/${projectId}/content/restore/${version}`);
     return response.data;
   },
+  async getSegments(projectId: number): Promise<Segment[]> {
+    const response = await apiClient.get<Segment[]>(`/stories/${projectId}/segments`);
+    return response.data;
+  },
+  async getSegment(projectId: number, segmentId: number): Promise<Segment> {
+    const response = await apiClient.get<Segment>(`/stories/${projectId}/segments/${segmentId}`);
+    return response.data;
+  },
+  async createSegment(projectId: number, segmentData: SegmentCreate): Promise<Segment> {
+    const response = await apiClient.post<Segment>(`/stories/${projectId}/segments`, segmentData);
+    return response.data;
+  },
+  async saveSegment(projectId: number, segmentId: number, segmentData: SegmentUpdate): Promise<Segment> {
+    const { body, headers } = await compressedJson(segmentData);
+    const response = await apiClient.put<Segment>(`/stories/${projectId}/segments/${segmentId}`, body, { headers });
+    return response.data;
+  },
+  async reorderSegments(projectId: number, segmentIds: number[], parentId?: number): Promise<Segment[]> {
+    const response = await apiClient.put<Segment[]>(`/stories/${projectId}/segments/order`, {
+      parent_id: parentId ?? null,
+      segment_ids: segmentIds,
+    });
+    return response.data;
+  },
+  async deleteSegment(projectId: number, segmentId: number): Promise<{ message: string; segments_deleted: number }> {
+    const response = await apiClient.delete<{ message: string; segments_deleted: number }>(`/stories/${projectId}/segments/${segmentId}`);
+    return response.data;
+  },
   async backupContent(projectId: number): Promise<ProjectBackup> {
     const response = await apiClient.get<ProjectBackup>(`/stories/${projectId}/content/backup`);
     return response.data;
@@ -36,11 +36,14 @@ export interface ProjectWithContent extends Project {
   content?: StoryContent;
 }
 
-export interface StoryContent {
+/** A content version's metadata, as version listings return it, without the text */
+export interface StoryContentVersionInfo {
   id: number;
   project_id: number;
-  content?: string;
   content_type: ContentType;
+  content_hash?: string;
+  char_count?: number;
+  word_count?: number;
   version: number;
   is_active: boolean;
   auto_saved: boolean;
@@ -49,12 +52,52 @@ export interface StoryContent {
   updated_at?: string;
 }
 
+export interface StoryContent extends StoryContentVersionInfo {
+  content?: string;
+  /** Set on saves; false when the text matched what was stored and nothing was written */
+  changed?: boolean;
+}
+
 export interface StoryContentUpdate {
   content?: string;
   auto_saved?: boolean;
   save_reason?: SaveReason;
 }
 
+export type SegmentKind = 'chapter' | 'scene';
+
+export interface Segment {
+  id: number;
+  project_id: number;
+  parent_id?: number | null;
+  kind: SegmentKind;
+  title?: string | null;
+  position: number;
+  content_hash?: string;
+  char_count: number;
+  word_count: number;
+  created_at: string;
+  updated_at?: string;
+  // Only returned when a single segment is fetched or saved
+  content?: string;
+  project_word_count?: number | null;
+}
+
+export interface SegmentCreate {
+  kind?: SegmentKind;
+  title?: string;
+  content?: string;
+  parent_id?: number | null;
+  position?: number;
+}
+
+export interface SegmentUpdate {
+  title?: string;
+  content?: string;
+  parent_id?: number;
+  move_to_top_level?: boolean;
+}
+
 export interface ProjectListResponse {
   projects: Project[];
   total: number;
@@ -73,6 +116,95 @@ export interface ProjectStats {
   last_edited?: string;
 }
 
+export type ProgressInterval = 'hour' | 'day' | 'week' | 'month';
+
+export interface ProgressPoint {
+  start: string;
+  words_added: number;
+  words_removed: number;
+  net_words: number;
+  word_count: number;
+  changes: number;
+}
+
+export interface ProgressHistory {
+  project_id: number;
+  interval: ProgressInterval;
+  start: string;
+  end: string;
+  points: ProgressPoint[];
+  words_added: number;
+  words_removed: number;
+  net_words: number;
+  writing_days: number;
+  current_streak: number;
+  longest_streak: number;
+}
+
+export type DiffUnit = 'word' | 'paragraph';
+
+export interface DiffHunk {
+  from_start: number;
+  from_end: number;
+  to_start: number;
+  to_end: number;
+  deleted: string;
+  inserted: string;
+}
+
+export interface ContentDiff {
+  project_id: number;
+  from_version: number;
+  to_version: number;
+  from_hash: string;
+  to_hash: string;
+  unit: DiffUnit;
+  approximate: boolean;
+  words_added: number;
+  words_removed: number;
+  hunks: DiffHunk[];
+}
+
+export interface SentenceLengthBucket {
+  min_words: number;
+  max_words: number | null;
+  count: number;
+}
+
+export interface WordFrequency {
+  word: string;
+  count: number;
+  per_thousand: number;
+}
+
+export interface TextStats {
+  project_id: number;
+  content_hash: string | null;
+  word_count: number;
+  unique_words: number;
+  lexical_diversity: number;
+  character_count: number;
+  paragraph_count: number;
+  average_word_length: number;
+  sentences: {
+    count: number;
+    mean: number;
+    median: number;
+    p90: number;
+    stdev: number;
+    max: number;
+    histogram: SentenceLengthBucket[];
+  };
+  readability: {
+    flesch_reading_ease: number;
+    flesch_kincaid_grade: number;
+    gunning_fog: number;
+  };
+  dialogue_ratio: number;
+  top_words: WordFrequency[];
+  overused_words: WordFrequency[];
+}
+
 export interface ProjectBackup {
   project: {
     id: number;
@@ -104,7 +236,8 @@ export type SaveReason =
   | 'auto_save' 
   | 'version_save' 
   | 'initial_creation' 
-  | 'version_restore';
+  | 'version_restore' 
+  | 'segment_save';
 
 // Filter and query types
 export interface ProjectFilters {